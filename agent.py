@@ -10,16 +10,20 @@ from agno.team import Team, TeamMode
 from agno.models.openai import OpenAIChat
 from agno.db.sqlite import SqliteDb
 from agno.knowledge import Knowledge
-from agno.knowledge.chunking.semantic import SemanticChunking
-from agno.knowledge.embedder.openai import OpenAIEmbedder
 from agno.knowledge.reader.pdf_reader import PDFReader
 from agno.memory.manager import MemoryManager
 from agno.tools.tavily import TavilyTools
-from agno.vectordb.chroma import ChromaDb
 from agno.os import AgentOS
 
 from dotenv import load_dotenv
 
+from chunking import criar_chunking
+from classifier import CacheClassificacao
+from dedup import IndiceLSH
+from embedding_batch import ChromaDbEmLote
+from embedding_cache import CacheEmbeddings, OpenAIEmbedderComCache
+from manifest import Manifesto
+
 load_dotenv()
 
 # ============================================================
@@ -44,13 +48,24 @@ storage = SqliteDb(
 # ============================================================
 # EMBEDDER + VECTOR DB
 # ============================================================
-embedder = OpenAIEmbedder(id="text-embedding-3-small")
+# Embeddings ja calculados ficam em cache no disco (LRU, ver
+# embedding_cache.py): reindexar conteudo igual nao chama a OpenAI
+cache_embeddings = CacheEmbeddings(DB_DIR / "embeddings.db")
+embedder = OpenAIEmbedderComCache(id="text-embedding-3-small", cache=cache_embeddings)
+
+# Quase-duplicatas entre apostilas, YouTube e transcricoes (ver dedup.py)
+indice_lsh = IndiceLSH(DB_DIR / "duplicatas.db")
 
-vector_db = ChromaDb(
+# Embeddings em lote e insercao em massa (ver embedding_batch.py).
+# Chunks quase iguais a outro ja indexado nem sao embeddados; se o
+# original sair do ChromaDB, as copias voltam para "pendente"
+vector_db = ChromaDbEmLote(
     collection="copywriter",
     path=str(DB_DIR / "chromadb"),
     embedder=embedder,
     persistent_client=True,
+    indice_lsh=indice_lsh,
+    ao_readmitir=lambda nomes: manifesto.reabrir(nomes),
 )
 
 # ============================================================
@@ -58,9 +73,25 @@ vector_db = ChromaDb(
 # ============================================================
 knowledge_base = Knowledge(
     vector_db=vector_db,
-    readers={"pdf": PDFReader(chunking_strategy=SemanticChunking())},
+    # Chunking por CHUNKING_MODE (ver chunking.py). No modo semantico o
+    # chunker usa o mesmo embedder (com cache) para comparar as frases
+    readers={"pdf": PDFReader(chunking_strategy=criar_chunking(embedder))},
 )
 
+# ============================================================
+# MANIFESTO — Arquivos ja ingeridos (pula o que nao mudou)
+# ============================================================
+# Vinculado ao ID da colecao: se o ChromaDB for recriado,
+# o manifesto volta tudo para "pendente" automaticamente.
+manifesto = Manifesto(
+    DB_DIR / "manifesto.db",
+    colecao=lambda: str(vector_db.client.get_collection(vector_db.collection_name).id),
+)
+
+# Cache das classificacoes do GPT (apostilas + YouTube). Fica fora
+# do ChromaDB: reconstruir a colecao nao paga nenhuma classificacao.
+cache_classificacao = CacheClassificacao(DB_DIR / "classificacoes.db")
+
 # ============================================================
 # AUTORES DISPONIVEIS — Lista dinamica baseada nas pastas
 # ============================================================
@@ -383,7 +414,6 @@ def health_check():
 # ============================================================
 # STARTUP — Sincroniza dados em background (nao bloqueia a porta)
 # ============================================================
-import json as _json
 import threading
 from contextlib import asynccontextmanager
 
@@ -392,25 +422,15 @@ def _sincronizar_chromadb():
     """Sincroniza o ChromaDB em background (thread separada)."""
     print("\n=== BACKGROUND: Sincronizando ChromaDB ===\n")
 
-    # 1) Transcricoes dos creators (JSONs em videos/*/)
+    # 1) Transcricoes dos creators (JSONs em videos/*/) — uma leitura
+    # em massa do ChromaDB e so o delta vira escrita (sync_plan.py)
     if VIDEOS_DIR.exists():
-        for autor_dir in sorted(p for p in VIDEOS_DIR.iterdir() if p.is_dir()):
-            autor = autor_dir.name
-            for json_path in sorted(autor_dir.glob("*.json")):
-                dados = _json.loads(json_path.read_text(encoding="utf-8"))
-                texto = dados.get("transcricao", "")
-                if texto.strip():
-                    knowledge_base.add_content(
-                        text_content=texto,
-                        name=f"{autor} - {json_path.stem}",
-                        metadata={
-                            "tipo": "transcricao",
-                            "autor": autor,
-                            "arquivo": json_path.name,
-                        },
-                        skip_if_exists=True,
-                    )
-            print(f"  [transcricoes] {autor}: OK")
+        try:
+            from transcribe import sincronizar_transcricoes
+            sincronizar_transcricoes([p for p in VIDEOS_DIR.iterdir() if p.is_dir()])
+            print(f"  [transcricoes]: OK")
+        except Exception as e:
+            print(f"  [transcricoes]: ERRO - {e}")
 
     # 2) Apostilas (PDFs)
     try:
@@ -0,0 +1,465 @@
+# ============================================================
+# audio.py — Extracao de audio com ffmpeg
+# ============================================================
+# Funcoes de ffmpeg usadas pelo transcribe.py. Ficam num modulo
+# leve (NAO importa o agent.py), como o pdf_extract.py.
+#
+# Cada extracao e um processo ffmpeg separado — o trabalho pesado
+# ja roda fora do Python. O que este modulo controla e QUANTOS
+# rodam ao mesmo tempo: um pool de no maximo FFMPEG_WORKERS
+# processos (padrao min(4, CPUs)), compartilhado por todas as
+# threads de transcricao.
+#
+# Audios longos (lives, podcasts) sao cortados nos silencios em
+# segmentos de ate SEGMENTO_MAX_S segundos, que podem ser
+# transcritos em paralelo e juntados depois (juntar_textos).
+#
+# Uso:
+#   from audio import extrair_audio
+#   mp3 = extrair_audio(Path("video.mp4"))
+#
+#   duracao, silencios = detectar_silencios(Path("live.mp4"))
+#   for inicio, fim in planejar_cortes(duracao, silencios):
+#       mp3 = extrair_audio(Path("live.mp4"), inicio, fim)
+#
+# Modo pipe (TRANSCRIBE_AUDIO_MODE=pipe, padrao): o MP3 sai pelo
+# stdout do ffmpeg direto para um buffer em memoria, entregue ao
+# cliente da OpenAI sem passar pelo disco. Acima de AUDIO_BUFFER_MB
+# o buffer vira um arquivo temporario anonimo (SpooledTemporaryFile).
+#
+#   with audio_extraido(Path("video.mp4")) as audio:
+#       ...  # Path (modo arquivo) ou buffer (modo pipe)
+#
+# CacheAudio guarda o MP3 extraido de cada video (chave: sha256 do
+# video), para uma nova tentativa nao rodar o ffmpeg de novo.
+# ============================================================
+
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+
+from manifest import hash_arquivo
+
+FFMPEG_WORKERS = int(os.getenv("FFMPEG_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+# "pipe" (stdout do ffmpeg -> buffer) ou "arquivo" (MP3 temporario)
+MODOS_AUDIO = ("pipe", "arquivo")
+MODO_AUDIO_PADRAO = os.getenv("TRANSCRIBE_AUDIO_MODE", "pipe")
+
+# Acima disso o buffer do modo pipe vai para um arquivo temporario
+BUFFER_MAX_MB = float(os.getenv("AUDIO_BUFFER_MB", "32"))
+
+# Tamanho maximo do cache de audio extraido (0 = sem cache)
+CACHE_AUDIO_MB = int(os.getenv("AUDIO_CACHE_MB", "500"))
+
+# Ao passar do limite, descarta os audios mais antigos ate 90% dele
+FOLGA_PODA = 0.9
+
+# Duracao maxima de um segmento (10 min a 64 kbps = ~5MB, bem abaixo
+# do limite de 25MB do Whisper)
+SEGMENTO_MAX_S = float(os.getenv("TRANSCRIBE_SEGMENT_SECONDS", "600"))
+
+# Quando nao ha silencio para cortar, o corte e forcado e os
+# segmentos se sobrepoem um pouco (a palavra cortada sai inteira
+# em um dos dois; a repeticao e removida no juntar_textos)
+SOBREPOSICAO_S = 2.0
+
+# Parametros do silencedetect: abaixo de -35dB por 0.5s e pausa
+SILENCIO_DB = -35
+SILENCIO_MIN_S = 0.5
+
+# Vagas do pool de processos ffmpeg
+_vagas_ffmpeg = threading.BoundedSemaphore(FFMPEG_WORKERS)
+
+
+def encontrar_ffmpeg() -> str:
+    """Encontra o executavel do ffmpeg (PATH ou winget)."""
+    ff = shutil.which("ffmpeg")
+    if ff:
+        return ff
+    # Procura na pasta do winget (Windows)
+    winget_dir = Path.home() / "AppData/Local/Microsoft/WinGet/Packages"
+    if winget_dir.exists():
+        for p in winget_dir.rglob("ffmpeg.exe"):
+            return str(p)
+    raise FileNotFoundError("ffmpeg nao encontrado")
+
+
+def rodar_ffmpeg(argumentos: list[str], **kwargs) -> subprocess.CompletedProcess:
+    """
+    Roda o ffmpeg ocupando uma vaga do pool (bloqueia se o pool
+    estiver cheio).
+
+    Args:
+        argumentos: Argumentos depois do executavel
+        **kwargs: Repassados para subprocess.run
+
+    Returns:
+        CompletedProcess (check=True: erro do ffmpeg vira CalledProcessError)
+    """
+    ffmpeg = encontrar_ffmpeg()
+    with _vagas_ffmpeg:
+        return subprocess.run(
+            [ffmpeg, *argumentos],
+            capture_output=True,
+            check=True,
+            **kwargs,
+        )
+
+
+def _argumentos_mp3(
+    caminho_video: Path,
+    inicio: float | None,
+    fim: float | None,
+) -> list[str]:
+    """Argumentos do ffmpeg para extrair o audio (ou um trecho) em MP3 de voz."""
+    trecho = []
+    if inicio:
+        trecho += ["-ss", f"{inicio:.3f}"]
+    if fim is not None:
+        trecho += ["-t", f"{fim - (inicio or 0):.3f}"]
+    return [
+        *trecho,            # -ss antes do -i: busca rapida
+        "-i", str(caminho_video),
+        "-vn",              # sem video
+        "-acodec", "libmp3lame",
+        "-ab", "64k",       # bitrate baixo (suficiente pra voz)
+        "-ar", "16000",     # sample rate 16kHz (ideal pro Whisper)
+        "-ac", "1",         # mono
+    ]
+
+
+def extrair_audio(
+    caminho_video: Path,
+    inicio: float | None = None,
+    fim: float | None = None,
+    pasta: Path | None = None,
+) -> Path:
+    """
+    Extrai o audio de um video MP4 para MP3 comprimido usando ffmpeg.
+    Retorna o caminho do arquivo MP3 temporario.
+    Um video de 100MB vira ~3-5MB de audio.
+
+    Args:
+        caminho_video: Video (ou audio) de entrada
+        inicio: Extrai a partir deste segundo (padrao: do comeco)
+        fim: Extrai ate este segundo (padrao: ate o final)
+        pasta: Onde criar o MP3 (padrao: pasta temporaria do sistema)
+    """
+    fd, nome = tempfile.mkstemp(suffix=".mp3", dir=pasta)
+    os.close(fd)
+    audio_path = Path(nome)
+    try:
+        rodar_ffmpeg(
+            [
+                *_argumentos_mp3(caminho_video, inicio, fim),
+                "-y",               # sobrescreve (o mkstemp ja criou o arquivo)
+                str(audio_path),
+            ]
+        )
+    except Exception:
+        audio_path.unlink(missing_ok=True)
+        raise
+    return audio_path
+
+
+def extrair_audio_buffer(
+    caminho_video: Path,
+    inicio: float | None = None,
+    fim: float | None = None,
+    limite_mb: float = BUFFER_MAX_MB,
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Igual ao extrair_audio, mas le o MP3 do stdout do ffmpeg para um
+    buffer, sem gravar nem reler arquivo no disco. Ate `limite_mb`
+    fica em memoria; acima disso o buffer passa para um arquivo
+    temporario anonimo (sem nome no disco, sem corrida de nomes).
+
+    Returns:
+        Buffer posicionado no inicio (feche depois de usar)
+    """
+    ffmpeg = encontrar_ffmpeg()
+    buffer = tempfile.SpooledTemporaryFile(max_size=int(limite_mb * 1024 * 1024))
+    # stderr num arquivo: se fosse PIPE, o ffmpeg poderia travar com
+    # o pipe cheio enquanto a gente so le o stdout
+    with _vagas_ffmpeg, tempfile.TemporaryFile() as erros:
+        processo = subprocess.Popen(
+            [ffmpeg, *_argumentos_mp3(caminho_video, inicio, fim), "-f", "mp3", "pipe:1"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=erros,
+        )
+        with processo:
+            shutil.copyfileobj(processo.stdout, buffer, 1024 * 1024)
+        if processo.returncode != 0:
+            buffer.close()
+            erros.seek(0)
+            raise subprocess.CalledProcessError(
+                processo.returncode, processo.args, stderr=erros.read()
+            )
+    buffer.seek(0)
+    return buffer
+
+
+@contextmanager
+def audio_extraido(
+    caminho_video: Path,
+    inicio: float | None = None,
+    fim: float | None = None,
+    modo: str | None = None,
+):
+    """
+    Extrai o audio no modo configurado e limpa no final.
+
+    Yields:
+        Path do MP3 (modo "arquivo") ou buffer binario (modo "pipe")
+    """
+    modo = modo or MODO_AUDIO_PADRAO
+    if modo not in MODOS_AUDIO:
+        raise ValueError(f"TRANSCRIBE_AUDIO_MODE invalido: {modo} (use {', '.join(MODOS_AUDIO)})")
+
+    if modo == "pipe":
+        buffer = extrair_audio_buffer(caminho_video, inicio, fim)
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+    else:
+        audio_path = extrair_audio(caminho_video, inicio, fim)
+        try:
+            yield audio_path
+        finally:
+            audio_path.unlink(missing_ok=True)
+
+
+def tamanho_audio_mb(audio) -> float:
+    """Tamanho do audio extraido (Path ou buffer), em MB."""
+    if isinstance(audio, Path):
+        return audio.stat().st_size / (1024 * 1024)
+    posicao = audio.tell()
+    tamanho = audio.seek(0, os.SEEK_END)
+    audio.seek(posicao)
+    return tamanho / (1024 * 1024)
+
+
+# ============================================================
+# CACHE — MP3 extraido por hash do video
+# ============================================================
+
+class CacheAudio:
+    """
+    Cache em disco do audio extraido, com descarte LRU (pelo mtime).
+
+    Um arquivo <sha256 do video>.mp3 por video. Se a transcricao
+    falhar (rede, 429, processo morto), a proxima tentativa pula o
+    ffmpeg. Thread-safe.
+
+    Args:
+        pasta: Pasta do cache (criada se nao existir)
+        limite_mb: Tamanho maximo (padrao: AUDIO_CACHE_MB ou 500)
+    """
+
+    def __init__(self, pasta: Path, limite_mb: int | None = None):
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self.limite_bytes = (limite_mb or CACHE_AUDIO_MB) * 1024 * 1024
+        self._trava = threading.Lock()
+        self.zerar_contadores()
+
+    def obter(self, caminho_video: Path, sha256: str | None = None) -> Path:
+        """
+        MP3 do video: do cache, ou extraido agora e guardado.
+
+        Args:
+            caminho_video: Video de origem
+            sha256: Hash do video, se ja calculado (evita reler o arquivo)
+
+        Returns:
+            Caminho do MP3 dentro do cache (nao apague)
+        """
+        destino = self.pasta / f"{sha256 or hash_arquivo(caminho_video)}.mp3"
+        if destino.exists():
+            os.utime(destino)  # marca como usado agora (LRU)
+            with self._trava:
+                self.hits += 1
+            return destino
+
+        # Extrai com nome temporario e renomeia: MP3 pela metade
+        # nunca fica com o nome final
+        temporario = extrair_audio(caminho_video, pasta=self.pasta)
+        os.replace(temporario, destino)
+        with self._trava:
+            self.misses += 1
+        self._podar(manter=destino)
+        return destino
+
+    def _podar(self, manter: Path):
+        """Apaga os MP3 usados ha mais tempo ate caber no limite."""
+        with self._trava:
+            arquivos = []
+            for arquivo in self.pasta.glob("*.mp3"):
+                try:
+                    info = arquivo.stat()
+                except FileNotFoundError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, arquivo))
+            total = sum(tamanho for _, tamanho, _ in arquivos)
+            if total <= self.limite_bytes:
+                return
+
+            alvo = int(self.limite_bytes * FOLGA_PODA)
+            descartados = 0
+            for _, tamanho, arquivo in sorted(arquivos, key=lambda a: a[0]):
+                if total <= alvo:
+                    break
+                if arquivo == manter:
+                    continue
+                try:
+                    arquivo.unlink()
+                except OSError:  # em uso (Windows) — fica para a proxima
+                    continue
+                total -= tamanho
+                descartados += 1
+        print(f"Cache de audio: {descartados} audios antigos descartados (limite LRU)")
+
+    def zerar_contadores(self):
+        self.hits = 0
+        self.misses = 0
+
+    def resumo(self) -> str:
+        return f"Cache de audio: {self.hits} hits, {self.misses} misses"
+
+
+# ============================================================
+# SEGMENTACAO — Cortes nos silencios
+# ============================================================
+
+def ler_duracao(saida_ffmpeg: str) -> float:
+    """Duracao (s) da linha "Duration: HH:MM:SS.xx" do stderr do ffmpeg (0 se nao achar)."""
+    achou = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", saida_ffmpeg)
+    if not achou:
+        return 0.0
+    h, m, s = achou.groups()
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def duracao_audio(caminho: Path) -> float:
+    """
+    Duracao (s) do arquivo so pelo cabecalho: o ffmpeg abre a entrada
+    e para sem decodificar nada (-t 0). 0 se nao achar.
+    """
+    resultado = rodar_ffmpeg(
+        ["-i", str(caminho), "-t", "0", "-f", "null", "-"],
+        text=True,
+        errors="replace",
+    )
+    return ler_duracao(resultado.stderr)
+
+
+def detectar_silencios(caminho: Path) -> tuple[float, list[tuple[float, float]]]:
+    """
+    Roda o filtro silencedetect do ffmpeg no audio do arquivo.
+    Decodifica o audio inteiro (sem gravar nada), bem mais rapido
+    que tempo real.
+
+    Returns:
+        (duracao em segundos, lista de silencios (inicio, fim))
+    """
+    resultado = rodar_ffmpeg(
+        [
+            "-i", str(caminho),
+            "-vn",
+            "-af", f"silencedetect=noise={SILENCIO_DB}dB:d={SILENCIO_MIN_S}",
+            "-f", "null", "-",
+        ],
+        text=True,
+        errors="replace",
+    )
+    saida = resultado.stderr
+
+    duracao = ler_duracao(saida)
+
+    silencios = []
+    inicio = None
+    for linha in saida.splitlines():
+        if (achou := re.search(r"silence_start: (-?[\d.]+)", linha)):
+            inicio = max(0.0, float(achou.group(1)))
+        elif (achou := re.search(r"silence_end: ([\d.]+)", linha)) and inicio is not None:
+            silencios.append((inicio, float(achou.group(1))))
+            inicio = None
+    if inicio is not None:  # silencio ate o final do arquivo
+        silencios.append((inicio, duracao))
+
+    return duracao, silencios
+
+
+def planejar_cortes(
+    duracao: float,
+    silencios: list[tuple[float, float]],
+    maximo: float = SEGMENTO_MAX_S,
+) -> list[tuple[float, float]]:
+    """
+    Divide [0, duracao] em segmentos de no maximo `maximo` segundos,
+    cortando no meio do ultimo silencio da janela. Para nao gerar
+    segmentos minusculos, so vale silencio da segunda metade da
+    janela. Sem silencio, corta em `maximo` com SOBREPOSICAO_S.
+
+    Returns:
+        Lista de (inicio, fim) em segundos, em ordem
+    """
+    if duracao <= maximo:
+        return [(0.0, duracao)]
+
+    meios = sorted((a + b) / 2 for a, b in silencios)
+    cortes = []
+    inicio = 0.0
+    while duracao - inicio > maximo:
+        limite = inicio + maximo
+        candidatos = [m for m in meios if inicio + maximo / 2 <= m <= limite]
+        if candidatos:
+            corte = candidatos[-1]
+            cortes.append((inicio, corte))
+            inicio = corte
+        else:
+            cortes.append((inicio, limite))
+            inicio = limite - SOBREPOSICAO_S
+    cortes.append((inicio, duracao))
+    return cortes
+
+
+def _normalizar_palavra(palavra: str) -> str:
+    """Minusculas, sem acento e sem pontuacao ("Você," -> "voce")."""
+    sem_acento = unicodedata.normalize("NFKD", palavra).encode("ascii", "ignore").decode()
+    return re.sub(r"[^\w]", "", sem_acento.lower())
+
+
+def juntar_textos(textos: list[str], max_palavras: int = 30) -> str:
+    """
+    Junta as transcricoes dos segmentos, em ordem, removendo a
+    repeticao nas emendas: se o comeco de um segmento repete o
+    final do anterior (sobreposicao do corte forcado), a parte
+    repetida sai do segmento seguinte.
+
+    Compara ate `max_palavras` palavras, ignorando caixa e pontuacao.
+    Repeticoes de 1-2 palavras sao mantidas (podem ser fala real).
+    """
+    palavras = []
+    for texto in textos:
+        novas = texto.split()
+        if not novas:
+            continue
+        fim = [_normalizar_palavra(p) for p in palavras[-max_palavras:]]
+        comeco = [_normalizar_palavra(p) for p in novas[:max_palavras]]
+        repetidas = 0
+        for k in range(min(len(fim), len(comeco)), 2, -1):
+            if fim[-k:] == comeco[:k]:
+                repetidas = k
+                break
+        palavras.extend(novas[repetidas:])
+    return " ".join(palavras)
@@ -0,0 +1,95 @@
+# ============================================================
+# bench_audio_io.py — Benchmark: MP3 temporario x pipe do ffmpeg
+# ============================================================
+# Extrai o audio dos videos de videos/ nos dois modos do audio.py
+# e mede o tempo ate ter os bytes prontos para o upload:
+#
+#   arquivo -> ffmpeg grava o MP3 no disco, depois le de volta
+#   pipe    -> ffmpeg escreve no stdout, direto para o buffer
+#
+# Sem chamar o Whisper: a diferenca medida e so o I/O evitado.
+# Os modos se alternam a cada repeticao (cache de disco justo
+# para os dois). Precisa do ffmpeg instalado.
+#
+# Uso:
+#   uv run python benchmarks/bench_audio_io.py [pasta] [--max 5] [--repeticoes 3]
+# ============================================================
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from audio import audio_extraido, encontrar_ffmpeg, tamanho_audio_mb  # noqa: E402
+
+
+def medir(video: Path, modo: str) -> tuple[float, float]:
+    """Extrai e le todos os bytes, como o upload faria. Retorna (segundos, MB)."""
+    inicio = time.perf_counter()
+    with audio_extraido(video, modo=modo) as audio:
+        if isinstance(audio, Path):
+            with open(audio, "rb") as f:
+                while f.read(1024 * 1024):
+                    pass
+        else:
+            while audio.read(1024 * 1024):
+                pass
+        megabytes = tamanho_audio_mb(audio)
+    return time.perf_counter() - inicio, megabytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MP3 temporario x pipe do ffmpeg")
+    parser.add_argument("pasta", nargs="?", default=str(BASE_DIR / "videos"))
+    parser.add_argument("--max", type=int, default=5, help="Maximo de videos")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--json", help="Grava o resultado neste arquivo")
+    args = parser.parse_args()
+
+    try:
+        encontrar_ffmpeg()
+    except FileNotFoundError:
+        print("ffmpeg nao encontrado — instale para rodar este benchmark")
+        return
+
+    videos = sorted(Path(args.pasta).rglob("*.mp4"))[: args.max]
+    if not videos:
+        print(f"Nenhum video encontrado em {args.pasta}")
+        return
+
+    resultados = []
+    for video in videos:
+        tempos = {"arquivo": [], "pipe": []}
+        megabytes = 0.0
+        for _ in range(args.repeticoes):
+            for modo in tempos:
+                segundos, megabytes = medir(video, modo)
+                tempos[modo].append(segundos)
+        arquivo = statistics.median(tempos["arquivo"])
+        pipe = statistics.median(tempos["pipe"])
+        resultados.append({
+            "video": video.name,
+            "audio_mb": round(megabytes, 2),
+            "arquivo_s": round(arquivo, 3),
+            "pipe_s": round(pipe, 3),
+            "economia_s": round(arquivo - pipe, 3),
+        })
+        print(f"{video.name}: arquivo {arquivo:.3f}s, pipe {pipe:.3f}s ({megabytes:.1f}MB)")
+
+    total_arquivo = sum(r["arquivo_s"] for r in resultados)
+    total_pipe = sum(r["pipe_s"] for r in resultados)
+    print(f"\nTotal: arquivo {total_arquivo:.2f}s, pipe {total_pipe:.2f}s "
+          f"(economia de {total_arquivo - total_pipe:.2f}s, "
+          f"{(1 - total_pipe / total_arquivo) * 100:.1f}%)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
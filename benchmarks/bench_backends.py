@@ -0,0 +1,143 @@
+# ============================================================
+# bench_backends.py — Benchmark: backends de transcricao lado a lado
+# ============================================================
+# Transcreve os mesmos audios com cada backend (whisper_backends.py)
+# e mede o fator de tempo real (RTF = segundos de processamento /
+# segundos de audio; abaixo de 1 e mais rapido que tempo real):
+#
+# - rtf_medio: media do RTF de cada arquivo (latencia de 1 video)
+# - rtf_vazao: tempo de parede / audio total, com o backend rodando
+#   na concorrencia dele (TRANSCRIBE_WORKERS ou 1 processo por nucleo)
+#
+# O primeiro arquivo e transcrito uma vez antes de medir (carga do
+# modelo, conexao), reportado em segundos_aquecimento.
+#
+# ATENCAO: o backend openai usa a API de verdade (custa por minuto)
+# a menos que --fake suba o servidor local (fake_openai.py). O
+# backend local precisa do faster-whisper.
+#
+# Uso:
+#   uv run python benchmarks/bench_backends.py [pasta] [--backends openai,local] [--max 5]
+#   uv run python benchmarks/bench_backends.py --fake --latencia-ms 300 --backends openai
+#   uv run python benchmarks/bench_backends.py --sinteticos 4 --segundos-audio 60
+# ============================================================
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from audio import detectar_silencios  # noqa: E402
+from bench_ingestao import gerar_audio  # noqa: E402
+from whisper_backends import BACKENDS, criar_backend  # noqa: E402
+
+load_dotenv(BASE_DIR / ".env")
+
+
+def duracao_audio(caminho: Path) -> float:
+    """Duracao em segundos (WAV direto; outros formatos via ffmpeg)."""
+    try:
+        with wave.open(str(caminho), "rb") as arquivo:
+            return arquivo.getnframes() / arquivo.getframerate()
+    except (wave.Error, EOFError):
+        return detectar_silencios(caminho)[0]
+
+
+def _transcrever_medindo(backend, caminho: Path) -> float:
+    inicio = time.perf_counter()
+    backend.transcrever(caminho)
+    return time.perf_counter() - inicio
+
+
+def rodar(nome: str, arquivos: list[tuple[Path, float]]) -> dict:
+    """Aquece, depois transcreve tudo na concorrencia do backend."""
+    try:
+        backend = criar_backend(nome)
+    except Exception as e:
+        return {"backend": nome, "erro": str(e)}
+
+    try:
+        aquecimento = _transcrever_medindo(backend, arquivos[0][0])
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=backend.concorrencia) as pool:
+            tempos = list(pool.map(lambda a: _transcrever_medindo(backend, a[0]), arquivos))
+        parede = time.perf_counter() - inicio
+    finally:
+        backend.fechar()
+
+    total_audio = sum(duracao for _, duracao in arquivos)
+    return {
+        "backend": nome,
+        "concorrencia": backend.concorrencia,
+        "arquivos": len(arquivos),
+        "audio_s": round(total_audio, 1),
+        "segundos_aquecimento": round(aquecimento, 2),
+        "segundos": round(parede, 2),
+        "rtf_medio": round(statistics.mean(t / d for t, (_, d) in zip(tempos, arquivos)), 3),
+        "rtf_vazao": round(parede / total_audio, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backends de transcricao lado a lado")
+    parser.add_argument("pasta", nargs="?", default=str(BASE_DIR / "videos"))
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--max", type=int, default=5, help="Maximo de arquivos")
+    parser.add_argument("--sinteticos", type=int, default=0, help="Usa N audios sinteticos no lugar da pasta")
+    parser.add_argument("--segundos-audio", type=float, default=30)
+    parser.add_argument("--fake", action="store_true", help="Backend openai contra o servidor fake")
+    parser.add_argument("--latencia-ms", type=float, default=300)
+    parser.add_argument("--json", help="Grava o resultado neste arquivo")
+    args = parser.parse_args()
+
+    servidor = None
+    if args.fake:
+        from fake_openai import ServidorFake
+
+        servidor = ServidorFake(latencia_ms=args.latencia_ms).iniciar()
+        os.environ["OPENAI_BASE_URL"] = servidor.url
+        os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+    with tempfile.TemporaryDirectory(prefix="bench_backends_") as pasta:
+        if args.sinteticos:
+            caminhos = []
+            for i in range(args.sinteticos):
+                caminho = Path(pasta) / f"sintetico_{i:02d}.wav"
+                gerar_audio(caminho, args.segundos_audio)
+                caminhos.append(caminho)
+        else:
+            caminhos = sorted(Path(args.pasta).rglob("*.mp4"))[: args.max]
+        if not caminhos:
+            print(f"Nenhum video encontrado em {args.pasta} (use --sinteticos N)")
+            return
+
+        arquivos = [(c, duracao_audio(c)) for c in caminhos]
+        print(f"{len(arquivos)} arquivos, {sum(d for _, d in arquivos):.0f}s de audio\n")
+
+        resultados = []
+        for nome in args.backends.split(","):
+            print(f"--- {nome.strip()} ---")
+            resultados.append(rodar(nome.strip(), arquivos))
+
+    if servidor:
+        servidor.parar()
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# ============================================================
+# bench_chunking.py — Benchmark: SemanticChunking x janela de tokens
+# ============================================================
+# Ingere os PDFs de apostilas/ com cada estrategia de chunking
+# (chunking.py) em uma colecao ChromaDB temporaria e mede:
+#
+# - tempo de ingestao (chunking + embeddings + insercao)
+# - chamadas a API de embeddings (do chunker + do vector_db)
+# - numero de chunks
+# - recall@k em consultas fixas (consultas_apostilas.json): a
+#   consulta acerta se algum dos k chunks devolvidos contem o
+#   trecho esperado
+#
+# As paginas sao extraidas antes (fora do tempo medido) e o cache
+# de embeddings fica DESLIGADO — cada estrategia paga tudo.
+#
+# ATENCAO: usa a API de embeddings da OpenAI (custa centavos para
+# os 5 modulos). Com OPENAI_BASE_URL apontando para um servidor
+# fake, tempo e chamadas continuam validos, mas o recall nao.
+#
+# Uso:
+#   uv run python benchmarks/bench_chunking.py [--estrategias semantico,janela] [--k 5]
+# ============================================================
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+from agno.knowledge import Knowledge  # noqa: E402
+
+from chunking import MODOS, criar_chunking  # noqa: E402
+from embedding_batch import ChromaDbEmLote  # noqa: E402
+from embedding_cache import OpenAIEmbedderComCache  # noqa: E402
+from pdf_extract import extrair_paginas_pdf  # noqa: E402
+from readers import PaginasPDFReader  # noqa: E402
+
+load_dotenv(BASE_DIR / ".env")
+
+CONSULTAS = Path(__file__).parent / "consultas_apostilas.json"
+
+
+class EmbedderContador(OpenAIEmbedderComCache):
+    """Sem cache; conta as chamadas unitarias (as do SemanticChunking)."""
+
+    chamadas: int = 0
+
+    def get_embedding_and_usage(self, text: str):
+        self.chamadas += 1
+        return super().get_embedding_and_usage(text)
+
+
+def _normalizar(texto: str) -> str:
+    return re.sub(r"\s+", " ", texto).lower()
+
+
+def rodar(modo: str, pdfs: dict[Path, list[str]], consultas: list[dict], k: int, pasta: Path) -> dict:
+    """Ingere tudo com uma estrategia e mede tempo, chamadas, chunks e recall."""
+    embedder = EmbedderContador(id="text-embedding-3-small")
+    vector_db = ChromaDbEmLote(
+        collection=f"bench_{modo}",
+        path=str(pasta / modo),
+        embedder=embedder,
+        persistent_client=True,
+    )
+    knowledge = Knowledge(vector_db=vector_db)
+
+    inicio = time.perf_counter()
+    for pdf, paginas in pdfs.items():
+        knowledge.add_content(
+            path=str(pdf),
+            reader=PaginasPDFReader(paginas, chunking_strategy=criar_chunking(embedder, modo)),
+        )
+    segundos = time.perf_counter() - inicio
+    # Antes das consultas: cada busca tambem embedda a pergunta
+    chamadas = embedder.chamadas + vector_db.estatisticas.requisicoes
+
+    acertos = 0
+    for consulta in consultas:
+        resultados = vector_db.search(consulta["consulta"], limit=k)
+        trecho = _normalizar(consulta["trecho"])
+        if any(trecho in _normalizar(doc.content) for doc in resultados):
+            acertos += 1
+
+    return {
+        "estrategia": modo,
+        "segundos": round(segundos, 2),
+        "chamadas_embedding": chamadas,
+        "chunks": vector_db.get_count(),
+        f"recall@{k}": round(acertos / len(consultas), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SemanticChunking x janela de tokens")
+    parser.add_argument("pasta", nargs="?", default=str(BASE_DIR / "apostilas"))
+    parser.add_argument("--estrategias", default=",".join(MODOS))
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", help="Grava o resultado neste arquivo")
+    args = parser.parse_args()
+
+    pdfs = {pdf: extrair_paginas_pdf(pdf) for pdf in sorted(Path(args.pasta).rglob("*.pdf"))}
+    if not pdfs:
+        print(f"Nenhum PDF encontrado em {args.pasta}")
+        return
+    consultas = json.loads(CONSULTAS.read_text(encoding="utf-8"))
+    print(f"{len(pdfs)} PDFs, {len(consultas)} consultas\n")
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for modo in args.estrategias.split(","):
+            print(f"--- {modo} ---")
+            resultados.append(rodar(modo.strip(), pdfs, consultas, args.k, Path(pasta)))
+
+    colunas = list(resultados[0])
+    print()
+    print("  ".join(f"{c:>18}" for c in colunas))
+    for r in resultados:
+        print("  ".join(f"{r[c]!s:>18}" for c in colunas))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
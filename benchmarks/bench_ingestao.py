@@ -0,0 +1,279 @@
+# ============================================================
+# bench_ingestao.py — Benchmark offline do pipeline de ingestao
+# ============================================================
+# Roda as 4 etapas do pipeline contra o servidor fake da OpenAI
+# (fake_openai.py), sem rede e sem custo:
+#
+#   apostilas   -> ingest.ingerir_apostilas()
+#   transcricao -> transcribe.main()      (audios de fixture)
+#   youtube     -> youtube_ingest.main()  (transcricoes stub + linhas que nao sao
+#                                          URL, conferidas como url_invalida)
+#   perfis      -> profiles.main(force=True)
+#
+# Cada etapa roda em um subprocesso proprio, com DB_DIR e videos/
+# numa pasta temporaria (RENDER_DISK_PATH) — o data/ e o videos/
+# do projeto nao sao tocados. Assim o pico de RSS e por etapa.
+#
+# Saida (JSON): por etapa, tempo de parede, chamadas feitas ao
+# servidor (chat, embeddings, audio, 429) e pico de RSS do
+# processo e dos filhos (pool de extracao de PDF).
+#
+# Uso:
+#   uv run python benchmarks/bench_ingestao.py
+#   uv run python benchmarks/bench_ingestao.py --latencia-ms 80 --a-cada-429 25 --saida resultado.json
+#   uv run python benchmarks/bench_ingestao.py --etapas apostilas --apostilas /caminho/poucos_pdfs
+#   uv run python benchmarks/bench_ingestao.py --videos /caminho/gravacoes  (autor/arquivo.mp4)
+# ============================================================
+
+import argparse
+import json
+import math
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+ETAPAS = ("apostilas", "transcricao", "youtube", "perfis")
+
+AUTOR_FIXTURE = "Creator Benchmark"
+
+
+# ============================================================
+# FIXTURES — Audios e transcricoes do YouTube
+# ============================================================
+
+def gerar_audio(caminho: Path, segundos: float, taxa: int = 16000):
+    """
+    Grava um audio sintetico (WAV 16 kHz mono): rajadas de tom
+    intercaladas com silencio, como fala com pausas.
+
+    O arquivo leva extensao .mp4 porque o transcribe.py procura
+    *.mp4 — ffmpeg e Whisper identificam o formato pelo conteudo.
+    """
+    amostras = bytearray()
+    for n in range(int(segundos * taxa)):
+        t = n / taxa
+        falando = (t % 3.0) < 2.2  # 2.2 s de "fala", 0.8 s de pausa
+        valor = int(8000 * math.sin(2 * math.pi * 220 * t)) if falando else 0
+        amostras += struct.pack("<h", valor)
+    with wave.open(str(caminho), "wb") as arquivo:
+        arquivo.setnchannels(1)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(taxa)
+        arquivo.writeframes(bytes(amostras))
+
+
+def preparar_videos(destino: Path, origem: Path | None, quantidade: int, segundos: float):
+    """Copia as gravacoes de `origem` ou gera audios sinteticos."""
+    if origem:
+        shutil.copytree(origem, destino, dirs_exist_ok=True)
+        return
+    pasta = destino / AUTOR_FIXTURE
+    pasta.mkdir(parents=True, exist_ok=True)
+    for i in range(1, quantidade + 1):
+        gerar_audio(pasta / f"aula_{i:02d}.mp4", segundos)
+
+
+def transcricao_stub(video_id: str) -> dict:
+    """Substitui baixar_transcricao: texto fixo por video, sem rede."""
+    frase = f"Neste video {video_id} eu explico como a familia influencia suas escolhas"
+    snippets = [{"text": f"{frase} ({i}).", "start": i * 4.0, "duration": 4.0} for i in range(200)]
+    return {
+        "texto": " ".join(s["text"] for s in snippets),
+        "idioma": "Portuguese (stub)",
+        "idioma_codigo": "pt",
+        "snippets": snippets,
+    }
+
+
+# ============================================================
+# ETAPA — Roda dentro do subprocesso
+# ============================================================
+
+def _pico_rss_mb(filhos: bool = False) -> float | None:
+    """Pico de memoria residente do processo (ou dos filhos ja encerrados)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    quem = resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF
+    pico = resource.getrusage(quem).ru_maxrss
+    # Linux reporta KB, macOS reporta bytes
+    return round(pico / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def rodar_etapa(etapa: str, trabalho: Path, apostilas: str | None, urls: int) -> dict:
+    """Importa o modulo da etapa, aponta para a pasta temporaria e roda."""
+    inicio = time.perf_counter()
+
+    if etapa == "apostilas":
+        import ingest
+
+        if apostilas:
+            ingest.APOSTILAS_DIR = Path(apostilas)
+        funcao = ingest.ingerir_apostilas
+
+    elif etapa == "transcricao":
+        import transcribe
+
+        transcribe.VIDEOS_DIR = trabalho / "videos"
+        funcao = transcribe.main
+
+    elif etapa == "youtube":
+        import youtube_ingest
+        from ratelimit import LimiteAdaptativo
+
+        # Linhas que nao sao URL no meio: viram url_invalida no cache
+        # negativo e a rodada segue
+        invalidas = ["nao e url", "www.youtube.com/watch?v=bench000000"]
+        arquivo_urls = trabalho / "youtube_urls.txt"
+        arquivo_urls.write_text(
+            "\n".join([invalidas[0]] + [f"https://youtu.be/bench{i:06d}" for i in range(urls)] + invalidas[1:]),
+            encoding="utf-8",
+        )
+        youtube_ingest.URLS_FILE = arquivo_urls
+        youtube_ingest.baixar_transcricao = transcricao_stub
+        # O limitador anti-bloqueio do YouTube nao faz sentido contra o stub
+        youtube_ingest.limite_youtube = LimiteAdaptativo(por_minuto=1e9)
+
+        def funcao():
+            youtube_ingest.main()
+            for linha in invalidas:
+                falha = youtube_ingest.cache_negativo.consultar(linha)
+                if not falha or falha["motivo"] != youtube_ingest.URL_INVALIDA:
+                    raise RuntimeError(f"Linha invalida sem url_invalida no cache negativo: {linha!r}")
+
+    elif etapa == "perfis":
+        import profiles
+
+        profiles.VIDEOS_DIR = trabalho / "videos"
+        funcao = lambda: profiles.main(force=True)  # noqa: E731
+
+    else:
+        raise ValueError(f"Etapa desconhecida: {etapa}")
+
+    segundos_import = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    funcao()
+    segundos = time.perf_counter() - inicio
+
+    return {
+        "etapa": etapa,
+        "segundos": round(segundos, 2),
+        "segundos_import": round(segundos_import, 2),
+    }
+
+
+# ============================================================
+# ORQUESTRADOR — Sobe o servidor fake e chama uma etapa por vez
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline da ingestao")
+    parser.add_argument("--etapas", default=",".join(ETAPAS))
+    parser.add_argument("--latencia-ms", type=float, default=30)
+    parser.add_argument("--a-cada-429", type=int, default=0)
+    parser.add_argument("--retry-after-ms", type=int, default=200)
+    parser.add_argument("--apostilas", help="Pasta de PDFs (padrao: apostilas/ do projeto)")
+    parser.add_argument("--videos", help="Pasta com gravacoes (autor/arquivo.mp4)")
+    parser.add_argument("--audios", type=int, default=3, help="Audios sinteticos (sem --videos)")
+    parser.add_argument("--segundos-audio", type=float, default=20)
+    parser.add_argument("--urls", type=int, default=5, help="URLs stub do YouTube")
+    parser.add_argument("--saida", help="Grava o JSON neste arquivo")
+    # Uso interno: roda uma etapa no subprocesso
+    parser.add_argument("--etapa", help=argparse.SUPPRESS)
+    parser.add_argument("--trabalho", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.etapa:
+        resultado = rodar_etapa(args.etapa, Path(args.trabalho), args.apostilas, args.urls)
+        resultado["pico_rss_mb"] = _pico_rss_mb()
+        resultado["pico_rss_filhos_mb"] = _pico_rss_mb(filhos=True)
+        print("RESULTADO " + json.dumps(resultado))
+        return
+
+    from fake_openai import ServidorFake
+
+    servidor = ServidorFake(
+        latencia_ms=args.latencia_ms,
+        a_cada_429=args.a_cada_429,
+        retry_after_ms=args.retry_after_ms,
+    ).iniciar()
+
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="bench_ingestao_") as pasta:
+        trabalho = Path(pasta)
+        preparar_videos(
+            trabalho / "videos",
+            Path(args.videos) if args.videos else None,
+            args.audios,
+            args.segundos_audio,
+        )
+
+        ambiente = {
+            **os.environ,
+            "RENDER_DISK_PATH": str(trabalho / "disco"),
+            "OPENAI_API_KEY": "fake",
+            "OPENAI_BASE_URL": servidor.url,
+        }
+
+        for etapa in args.etapas.split(","):
+            etapa = etapa.strip()
+            print(f"--- {etapa} ---", file=sys.stderr)
+            servidor.zerar()
+
+            comando = [
+                sys.executable, __file__,
+                "--etapa", etapa,
+                "--trabalho", str(trabalho),
+                "--urls", str(args.urls),
+            ]
+            if args.apostilas:
+                comando += ["--apostilas", args.apostilas]
+
+            inicio = time.perf_counter()
+            processo = subprocess.run(comando, env=ambiente, capture_output=True, text=True)
+            parede = time.perf_counter() - inicio
+
+            linha = next(
+                (l for l in processo.stdout.splitlines() if l.startswith("RESULTADO ")),
+                None,
+            )
+            if processo.returncode != 0 or linha is None:
+                print(processo.stdout[-2000:], processo.stderr[-2000:], file=sys.stderr)
+                resultado = {"etapa": etapa, "erro": f"saiu com codigo {processo.returncode}"}
+            else:
+                resultado = json.loads(linha.removeprefix("RESULTADO "))
+            resultado["segundos_processo"] = round(parede, 2)
+            resultado["chamadas"] = servidor.estatisticas()
+            resultados.append(resultado)
+
+    servidor.parar()
+
+    saida = {
+        "config": {
+            "latencia_ms": args.latencia_ms,
+            "a_cada_429": args.a_cada_429,
+            "retry_after_ms": args.retry_after_ms,
+            "audios": 0 if args.videos else args.audios,
+            "segundos_audio": args.segundos_audio,
+            "urls": args.urls,
+        },
+        "etapas": resultados,
+    }
+    texto = json.dumps(saida, indent=2, ensure_ascii=False)
+    print(texto)
+    if args.saida:
+        Path(args.saida).write_text(texto, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# ============================================================
+# bench_pdf_parse.py — Benchmark: 1 parse por PDF vs 2 parses
+# ============================================================
+# Compara o caminho antigo da ingestao de PDFs (extrair_texto_pdf
+# para o classificador + PDFReader relendo o arquivo para o
+# chunker) com o caminho novo (paginas extraidas uma vez e
+# reaproveitadas pelo PaginasPDFReader).
+#
+# O chunking fica desligado (chunk=False) para medir so o parse —
+# o SemanticChunking chamaria a API de embeddings.
+#
+# Uso:
+#   uv run python benchmarks/bench_pdf_parse.py [pasta] [--repeticoes N]
+#
+# Padrao: os PDFs dos cursos em apostilas/
+# ============================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from agno.knowledge.reader.pdf_reader import PDFReader  # noqa: E402
+
+from pdf_extract import extrair_paginas_pdf, juntar_paginas  # noqa: E402
+from readers import PaginasPDFReader  # noqa: E402
+
+
+def _caminho_antigo(pdf: Path) -> tuple[str, list]:
+    """Como era: pypdf para o classificador + PDFReader de novo."""
+    from pypdf import PdfReader
+
+    texto = ""
+    for pagina in PdfReader(str(pdf)).pages:
+        texto += pagina.extract_text() or ""
+    documentos = PDFReader(chunk=False).read(pdf, name=pdf.name)
+    return texto, documentos
+
+
+def _caminho_novo(pdf: Path) -> tuple[str, list]:
+    """Como ficou: paginas extraidas uma vez, reaproveitadas no reader."""
+    paginas = extrair_paginas_pdf(pdf)
+    texto = juntar_paginas(paginas)
+    documentos = PaginasPDFReader(paginas, chunk=False).read(pdf, name=pdf.name)
+    return texto, documentos
+
+
+def _medir(funcao, pdf: Path, repeticoes: int) -> tuple[float, tuple]:
+    """Melhor tempo de N repeticoes (menos ruido que a media)."""
+    melhor = float("inf")
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(pdf)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pasta", nargs="?", default=str(BASE_DIR / "apostilas"))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    pdfs = sorted(Path(args.pasta).rglob("*.pdf"))
+    if not pdfs:
+        print(f"Nenhum PDF encontrado em {args.pasta}")
+        return
+
+    print(f"{'PDF':<24} {'antes (s)':>10} {'depois (s)':>11} {'ganho':>7}  docs iguais")
+    total_antes = total_depois = 0.0
+
+    for pdf in pdfs:
+        t_antes, (texto_a, docs_a) = _medir(_caminho_antigo, pdf, args.repeticoes)
+        t_depois, (texto_d, docs_d) = _medir(_caminho_novo, pdf, args.repeticoes)
+        total_antes += t_antes
+        total_depois += t_depois
+
+        iguais = texto_a == texto_d and [d.content for d in docs_a] == [d.content for d in docs_d]
+        print(
+            f"{pdf.name[:24]:<24} {t_antes:>10.2f} {t_depois:>11.2f} "
+            f"{t_antes / t_depois:>6.2f}x  {'sim' if iguais else 'NAO'}"
+        )
+
+    print(
+        f"{'TOTAL':<24} {total_antes:>10.2f} {total_depois:>11.2f} "
+        f"{total_antes / total_depois:>6.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
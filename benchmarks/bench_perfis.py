@@ -0,0 +1,115 @@
+# ============================================================
+# bench_perfis.py — Benchmark: perfil unico x mapreduce
+# ============================================================
+# Gera o perfil dos mesmos creators em cada modo do profiles.py e
+# mede tempo de parede, chamadas, tokens (usage das respostas) e o
+# maior prompt de uma chamada so:
+#
+# - unico: todas as transcricoes num prompt so
+# - mapreduce: notas por video em paralelo + consolidacao, com o
+#   cache de notas vazio
+# - mapreduce_cache: de novo, com as notas ja em cache (o caso de
+#   regenerar um perfil depois de um video novo, no limite)
+#
+# Os perfis NAO sao salvos nem ingeridos; caches e ChromaDB ficam
+# num diretorio temporario.
+#
+# ATENCAO: usa a API da OpenAI de verdade (gpt-4.1-mini) a menos
+# que --fake suba o servidor local (fake_openai.py) — no fake os
+# tokens sao estimados pelo tamanho do texto.
+#
+# Uso:
+#   uv run python benchmarks/bench_perfis.py --fake --latencia-ms 800
+#   uv run python benchmarks/bench_perfis.py --autores "Thamires Hauch" --orcamento 4000
+# ============================================================
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(BASE_DIR / ".env")
+
+
+def medir(profiles, autor: str, videos: list, modo: str) -> dict:
+    from classifier import UsoLLM
+
+    uso = UsoLLM()
+    inicio = time.perf_counter()
+    try:
+        profiles.gerar_perfil_creator(autor, videos, modo, uso)
+    except Exception as e:
+        return {"erro": str(e)}
+    return {
+        "segundos": round(time.perf_counter() - inicio, 2),
+        "chamadas": uso.chamadas,
+        "tokens_entrada": uso.tokens_entrada,
+        "tokens_saida": uso.tokens_saida,
+        "maior_prompt_tokens": uso.maior_entrada,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil unico x mapreduce")
+    parser.add_argument("pasta", nargs="?", default=str(BASE_DIR / "videos"))
+    parser.add_argument("--autores", help="Nomes separados por virgula (padrao: todos)")
+    parser.add_argument("--orcamento", type=int, help="PROFILE_TOKEN_BUDGET do teste")
+    parser.add_argument("--fake", action="store_true", help="Contra o servidor fake")
+    parser.add_argument("--latencia-ms", type=float, default=800)
+    parser.add_argument("--json", help="Grava o resultado neste arquivo")
+    args = parser.parse_args()
+
+    servidor = None
+    if args.fake:
+        from fake_openai import ServidorFake
+
+        servidor = ServidorFake(latencia_ms=args.latencia_ms).iniciar()
+        os.environ["OPENAI_BASE_URL"] = servidor.url
+        os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+    with tempfile.TemporaryDirectory(prefix="bench_perfis_") as pasta:
+        # Caches de notas e ChromaDB descartaveis (agent.py le no import)
+        os.environ["RENDER_DISK_PATH"] = pasta
+        import profiles
+
+        if args.orcamento:
+            profiles.ORCAMENTO_TOKENS = args.orcamento
+
+        autores = sorted(p for p in Path(args.pasta).iterdir() if p.is_dir())
+        if args.autores:
+            nomes = {nome.strip() for nome in args.autores.split(",")}
+            autores = [p for p in autores if p.name in nomes]
+
+        resultados = []
+        for autor_dir in autores:
+            videos = profiles.listar_transcricoes(autor_dir)
+            if not videos:
+                continue
+            print(f"--- {autor_dir.name} ({len(videos)} videos) ---")
+            resultados.append({
+                "autor": autor_dir.name,
+                "videos": len(videos),
+                "tokens_transcricoes": profiles.contar_tokens(profiles.juntar_transcricoes(videos)),
+                "unico": medir(profiles, autor_dir.name, videos, "unico"),
+                "mapreduce": medir(profiles, autor_dir.name, videos, "mapreduce"),
+                "mapreduce_cache": medir(profiles, autor_dir.name, videos, "mapreduce"),
+            })
+
+    if servidor:
+        servidor.parar()
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
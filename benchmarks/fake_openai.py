@@ -0,0 +1,258 @@
+# ============================================================
+# fake_openai.py — Servidor local que imita a API da OpenAI
+# ============================================================
+# Para medir a ingestao sem gastar dinheiro e sem rede. Atende:
+#
+# - POST /v1/chat/completions      -> JSON fixo (classificador e perfis)
+# - POST /v1/embeddings            -> vetores deterministicos
+# - POST /v1/audio/transcriptions  -> texto fixo (Whisper)
+# - GET  /stats                    -> contadores de chamadas
+# - POST /reset                    -> zera os contadores
+#
+# Os vetores usam "feature hashing" das palavras: textos com
+# palavras em comum ficam proximos, entao a busca no ChromaDB
+# devolve algo coerente (mas nao compare recall com o modelo real).
+#
+# Latencia e 429 configuraveis, para exercitar paralelismo e
+# retry-after dos clientes.
+#
+# Uso (standalone):
+#   uv run python benchmarks/fake_openai.py --porta 8765 --latencia-ms 50 --a-cada-429 20
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake uv run python ingest.py
+#
+# Uso (em codigo):
+#   servidor = ServidorFake(latencia_ms=50).iniciar()
+#   ... servidor.url ... servidor.estatisticas() ...
+#   servidor.parar()
+# ============================================================
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Resposta fixa do chat: serve tanto para o classificador
+# (tema/autor/palavras_chave) quanto para o gerador de perfis
+_CAMPO_PERFIL = {
+    "descricao": "Fala direta, de igual pra igual.",
+    "exemplos": ["trecho de exemplo 1", "trecho de exemplo 2"],
+    "regras": ["Comece com uma pergunta", "Use frases curtas"],
+}
+RESPOSTA_CHAT = {
+    "tema": "constelacao familiar",
+    "autor": "desconhecido",
+    "palavras_chave": ["familia", "sistemica", "consciencia"],
+    "resumo_estilo": "Creator de exemplo gerado pelo servidor fake.",
+    **{
+        campo: dict(_CAMPO_PERFIL)
+        for campo in (
+            "tom_de_voz", "energia", "linguajar", "bordoes", "estrutura",
+            "ritmo", "analogias", "emocao", "hooks", "cta",
+        )
+    },
+}
+
+TEXTO_TRANSCRICAO = (
+    "Olha so, hoje eu quero falar com voce sobre familia e sobre o lugar "
+    "que cada um ocupa no sistema. Quando a gente entende isso, muda tudo. "
+)
+
+
+def vetor_fake(texto: str, dimensoes: int) -> list[float]:
+    """Vetor unitario por feature hashing das palavras (deterministico)."""
+    vetor = [0.0] * dimensoes
+    for palavra in re.findall(r"\w+", texto.lower()):
+        h = hashlib.md5(palavra.encode()).digest()
+        indice = int.from_bytes(h[:4], "little") % dimensoes
+        vetor[indice] += 1.0 if h[4] & 1 else -1.0
+    if not any(vetor):
+        vetor[0] = 1.0  # texto sem palavras
+    norma = math.sqrt(sum(v * v for v in vetor))
+    return [v / norma for v in vetor]
+
+
+class ServidorFake:
+    """
+    Servidor HTTP compativel com o SDK da OpenAI, rodando numa thread.
+
+    Args:
+        porta: Porta local (0 = escolhe uma livre)
+        latencia_ms: Atraso artificial em cada resposta
+        a_cada_429: Responde 429 a cada N requisicoes (0 = nunca)
+        retry_after_ms: Valor do header retry-after-ms nos 429
+    """
+
+    def __init__(
+        self,
+        porta: int = 0,
+        latencia_ms: float = 0,
+        a_cada_429: int = 0,
+        retry_after_ms: int = 200,
+    ):
+        self.latencia_ms = latencia_ms
+        self.a_cada_429 = a_cada_429
+        self.retry_after_ms = retry_after_ms
+        self._trava = threading.Lock()
+        self._total = 0
+        self.zerar()
+
+        servidor = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _responder(self, status: int, corpo: dict, headers: dict | None = None):
+                dados = json.dumps(corpo).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(dados)))
+                for nome, valor in (headers or {}).items():
+                    self.send_header(nome, valor)
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    self._responder(200, servidor.estatisticas())
+                else:
+                    self._responder(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, resposta, headers = servidor._atender(self.path, self.headers, corpo)
+                self._responder(status, resposta, headers)
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", porta), _Handler)
+        self._http.daemon_threads = True
+        self.porta = self._http.server_address[1]
+        self.url = f"http://127.0.0.1:{self.porta}/v1"
+
+    # ---- Ciclo de vida ----
+
+    def iniciar(self) -> "ServidorFake":
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def parar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+    # ---- Contadores ----
+
+    def zerar(self):
+        with self._trava:
+            self._contadores = {
+                "chat": 0,
+                "embeddings": 0,
+                "embeddings_entradas": 0,
+                "audio": 0,
+                "audio_bytes": 0,
+                "erros_429": 0,
+            }
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            return dict(self._contadores)
+
+    def _contar(self, chave: str, quantidade: int = 1):
+        with self._trava:
+            self._contadores[chave] += quantidade
+
+    # ---- Rotas ----
+
+    def _atender(self, caminho: str, headers, corpo: bytes) -> tuple[int, dict, dict]:
+        if caminho.rstrip("/") == "/reset":
+            self.zerar()
+            return 200, {"ok": True}, {}
+
+        if self.latencia_ms:
+            time.sleep(self.latencia_ms / 1000)
+
+        with self._trava:
+            self._total += 1
+            rejeitar = self.a_cada_429 and self._total % self.a_cada_429 == 0
+        if rejeitar:
+            self._contar("erros_429")
+            return (
+                429,
+                {"error": {"message": "Rate limit (fake)", "type": "rate_limit_exceeded"}},
+                {"retry-after-ms": str(self.retry_after_ms)},
+            )
+
+        if caminho.endswith("/chat/completions"):
+            self._contar("chat")
+            return 200, self._chat(json.loads(corpo)), {}
+        if caminho.endswith("/embeddings"):
+            return 200, self._embeddings(json.loads(corpo)), {}
+        if caminho.endswith("/audio/transcriptions"):
+            self._contar("audio")
+            self._contar("audio_bytes", len(corpo))
+            # Texto proporcional ao tamanho do audio (~1 frase por 16 KB)
+            return 200, {"text": TEXTO_TRANSCRICAO * max(1, len(corpo) // 16384)}, {}
+        return 404, {"error": {"message": f"rota fake inexistente: {caminho}"}}, {}
+
+    def _chat(self, pedido: dict) -> dict:
+        resposta = json.dumps(RESPOSTA_CHAT, ensure_ascii=False)
+        # usage estimado (~3 caracteres por token) para comparar o
+        # tamanho dos prompts entre estrategias
+        entrada = sum(len(m.get("content") or "") for m in pedido.get("messages", [])) // 3
+        saida = len(resposta) // 3
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": pedido.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {
+                        "role": "assistant",
+                        "content": resposta,
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": entrada, "completion_tokens": saida, "total_tokens": entrada + saida},
+        }
+
+    def _embeddings(self, pedido: dict) -> dict:
+        entradas = pedido["input"]
+        if isinstance(entradas, str):
+            entradas = [entradas]
+        self._contar("embeddings")
+        self._contar("embeddings_entradas", len(entradas))
+        dimensoes = pedido.get("dimensions") or 1536
+        return {
+            "object": "list",
+            "model": pedido.get("model", "fake"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": vetor_fake(texto, dimensoes)}
+                for i, texto in enumerate(entradas)
+            ],
+            "usage": {"prompt_tokens": len(entradas), "total_tokens": len(entradas)},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor fake da API da OpenAI")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia-ms", type=float, default=0)
+    parser.add_argument("--a-cada-429", type=int, default=0)
+    parser.add_argument("--retry-after-ms", type=int, default=200)
+    args = parser.parse_args()
+
+    servidor = ServidorFake(args.porta, args.latencia_ms, args.a_cada_429, args.retry_after_ms)
+    print(f"Servidor fake em {servidor.url} (Ctrl+C para parar)")
+    try:
+        servidor._http.serve_forever()
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
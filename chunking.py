@@ -0,0 +1,229 @@
+# ============================================================
+# chunking.py — Estrategias de chunking dos PDFs
+# ============================================================
+# Dois modos, escolhidos por CHUNKING_MODE:
+#
+# - "semantico" (padrao): SemanticChunking do agno. Embedda as
+#   frases para decidir onde cortar — melhor coesao, mas quase
+#   dobra o custo e o tempo de embeddings na ingestao.
+#
+# - "janela": JanelaTokensChunking. Divide recursivamente por
+#   paragrafo -> linha -> frase -> clausula -> palavra e monta
+#   janelas de ~400 tokens com sobreposicao. Nenhuma chamada a
+#   API para decidir os cortes.
+#
+# Trocar o modo so afeta o que for ingerido depois: para
+# re-chunkar o que ja esta no ChromaDB, apague data/chromadb
+# (os embeddings que nao mudaram saem do cache).
+#
+# Comparacao de tempo, custo e recall: benchmarks/bench_chunking.py
+#
+# Transcricoes do YouTube nao passam por aqui como texto corrido:
+# janelas_de_snippets() agrupa as legendas (com tempo de inicio e
+# duracao) em janelas de ate YOUTUBE_CHUNK_TOKENS tokens e
+# YOUTUBE_CHUNK_SECONDS segundos — cada chunk sabe de que trecho
+# do video veio (ver readers.SnippetsReader).
+#
+# Uso:
+#   from chunking import criar_chunking
+#   reader = PDFReader(chunking_strategy=criar_chunking(embedder))
+# ============================================================
+
+import os
+import re
+
+from agno.knowledge.chunking.semantic import SemanticChunking
+from agno.knowledge.chunking.strategy import ChunkingStrategy
+from agno.knowledge.document.base import Document
+
+from embedding_batch import contar_tokens
+
+MODOS = ("semantico", "janela")
+MODO_PADRAO = os.getenv("CHUNKING_MODE", "semantico")
+
+TOKENS_POR_CHUNK = int(os.getenv("CHUNK_TOKENS", "400"))
+# ~15% de sobreposicao: a frase cortada na borda aparece inteira
+# em um dos dois chunks vizinhos
+TOKENS_SOBREPOSICAO = int(os.getenv("CHUNK_OVERLAP_TOKENS", "60"))
+
+# YouTube: legenda nao tem pontuacao — o limite de tempo segura o
+# assunto de cada chunk, o de tokens o tamanho
+TOKENS_POR_JANELA_YOUTUBE = int(os.getenv("YOUTUBE_CHUNK_TOKENS", "300"))
+SEGUNDOS_POR_JANELA_YOUTUBE = float(os.getenv("YOUTUBE_CHUNK_SECONDS", "120"))
+
+# Pontos de corte, do mais forte para o mais fraco. O corte fica
+# DEPOIS do separador, para o texto se recompor sem perdas.
+SEPARADORES = [
+    re.compile(r"\n\s*\n"),                      # paragrafo
+    re.compile(r"\n"),                           # linha
+    re.compile(r"(?<=[.!?…])[\"'”»)]*\s+"),      # fim de frase
+    re.compile(r"(?<=[;:—–])\s+"),               # clausula
+    re.compile(r"(?<=,)\s+"),                    # virgula
+    re.compile(r"\s+"),                          # palavra
+]
+
+# Abreviacoes comuns em portugues — o ponto delas nao fecha a frase
+ABREVIACOES = {
+    "sr", "sra", "srta", "dr", "dra", "prof", "profa", "pe", "sto", "sta",
+    "ex", "obs", "pp", "pag", "pág", "cap", "vol", "art", "fig", "nº", "tel", "av",
+}
+
+
+def _termina_em_abreviacao(trecho: str) -> bool:
+    trecho = trecho.rstrip()
+    palavras = trecho[:-1].split()
+    return trecho.endswith(".") and bool(palavras) and palavras[-1].lower() in ABREVIACOES
+
+
+def _cortar(texto: str, separador: re.Pattern) -> list[str]:
+    """Divide mantendo o separador no fim de cada pedaco ("".join == texto)."""
+    pedacos = []
+    inicio = 0
+    for marca in separador.finditer(texto):
+        if marca.end() <= inicio or marca.end() == len(texto):
+            continue
+        pedaco = texto[inicio:marca.end()]
+        # "Dr. Fulano": nao corta depois de abreviacao
+        if separador is SEPARADORES[2] and _termina_em_abreviacao(pedaco):
+            continue
+        pedacos.append(pedaco)
+        inicio = marca.end()
+    pedacos.append(texto[inicio:])
+    return [p for p in pedacos if p]
+
+
+class JanelaTokensChunking(ChunkingStrategy):
+    """
+    Chunking recursivo por janelas de tokens, ajustado para prosa
+    em portugues (frases, abreviacoes, aspas e travessoes).
+
+    Args:
+        tokens_por_chunk: Tamanho maximo de cada chunk em tokens
+        tokens_sobreposicao: Tokens repetidos do fim do chunk anterior
+    """
+
+    def __init__(
+        self,
+        tokens_por_chunk: int = TOKENS_POR_CHUNK,
+        tokens_sobreposicao: int = TOKENS_SOBREPOSICAO,
+    ):
+        if tokens_sobreposicao >= tokens_por_chunk:
+            raise ValueError(
+                f"Sobreposicao ({tokens_sobreposicao}) deve ser menor que o chunk ({tokens_por_chunk})"
+            )
+        self.tokens_por_chunk = tokens_por_chunk
+        self.tokens_sobreposicao = tokens_sobreposicao
+
+    def _pedacos(self, texto: str, nivel: int = 0) -> list[tuple[str, int]]:
+        """Quebra o texto ate cada pedaco caber em um chunk: [(pedaco, tokens)]."""
+        tokens = contar_tokens(texto)
+        if tokens <= self.tokens_por_chunk or nivel == len(SEPARADORES):
+            return [(texto, tokens)]
+
+        pedacos = []
+        for pedaco in _cortar(texto, SEPARADORES[nivel]):
+            pedacos.extend(self._pedacos(pedaco, nivel + 1))
+        return pedacos
+
+    def _janelas(self, pedacos: list[tuple[str, int]]) -> list[str]:
+        """Junta pedacos em janelas, repetindo o fim da anterior."""
+        janelas = []
+        atual, tokens_atual = [], 0
+        for pedaco, tokens in pedacos:
+            if atual and tokens_atual + tokens > self.tokens_por_chunk:
+                janelas.append("".join(p for p, _ in atual))
+                # Sobreposicao: os ultimos pedacos que cabem na folga
+                while atual and (
+                    tokens_atual > self.tokens_sobreposicao
+                    or tokens_atual + tokens > self.tokens_por_chunk
+                ):
+                    tokens_atual -= atual.pop(0)[1]
+            atual.append((pedaco, tokens))
+            tokens_atual += tokens
+        if atual:
+            janelas.append("".join(p for p, _ in atual))
+        return janelas
+
+    def chunk(self, document: Document) -> list[Document]:
+        if contar_tokens(document.content) <= self.tokens_por_chunk:
+            return [document]
+
+        chunks = []
+        for numero, janela in enumerate(self._janelas(self._pedacos(document.content)), 1):
+            conteudo = self.clean_text(janela).strip()
+            if not conteudo:
+                continue
+            meta_data = document.meta_data.copy()
+            meta_data["chunk"] = numero
+            meta_data["chunk_size"] = len(conteudo)
+            chunks.append(
+                Document(
+                    id=self._generate_chunk_id(document, numero, conteudo),
+                    name=document.name,
+                    meta_data=meta_data,
+                    content=conteudo,
+                )
+            )
+        return chunks
+
+
+def janelas_de_snippets(
+    snippets: list[dict],
+    tokens_max: int = TOKENS_POR_JANELA_YOUTUBE,
+    segundos_max: float = SEGUNDOS_POR_JANELA_YOUTUBE,
+) -> list[dict]:
+    """
+    Agrupa as legendas de um video em janelas de tempo.
+
+    Uma janela fecha quando o proximo snippet passaria de tokens_max
+    tokens ou de segundos_max segundos desde o inicio dela. Um
+    snippet nunca e cortado ao meio.
+
+    Args:
+        snippets: Legendas na ordem, como o youtube-transcript-api
+            devolve (to_raw_data): [{text, start, duration}]
+
+    Returns:
+        [{texto, start_s, end_s}] — end_s e o fim do ultimo snippet
+    """
+    janelas = []
+    textos, tokens_atual, inicio, fim = [], 0, 0.0, 0.0
+    for snippet in snippets:
+        texto = snippet["text"].replace("\n", " ").strip()
+        if not texto:
+            continue
+        tokens = contar_tokens(texto)
+        if textos and (
+            tokens_atual + tokens > tokens_max
+            or snippet["start"] + snippet["duration"] - inicio > segundos_max
+        ):
+            janelas.append({"texto": " ".join(textos), "start_s": inicio, "end_s": fim})
+            textos, tokens_atual = [], 0
+        if not textos:
+            inicio, fim = snippet["start"], 0.0
+        textos.append(texto)
+        tokens_atual += tokens
+        fim = max(fim, snippet["start"] + snippet["duration"])
+    if textos:
+        janelas.append({"texto": " ".join(textos), "start_s": inicio, "end_s": fim})
+    return janelas
+
+
+def criar_chunking(embedder=None, modo: str | None = None) -> ChunkingStrategy:
+    """
+    Cria a estrategia de chunking configurada.
+
+    Args:
+        embedder: Embedder usado pelo modo "semantico" (use o mesmo
+            do vector_db, com cache)
+        modo: "semantico" ou "janela" (padrao: CHUNKING_MODE)
+
+    Returns:
+        Instancia de ChunkingStrategy do agno
+    """
+    modo = (modo or MODO_PADRAO).lower()
+    if modo == "semantico":
+        return SemanticChunking(embedder=embedder)
+    if modo == "janela":
+        return JanelaTokensChunking()
+    raise ValueError(f"CHUNKING_MODE invalido: {modo!r} (use um de {', '.join(MODOS)})")
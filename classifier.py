@@ -0,0 +1,357 @@
+# ============================================================
+# classifier.py — Classificador LLM em lote (assincrono)
+# ============================================================
+# Motor compartilhado por ingest.py (apostilas),
+# youtube_ingest.py (transcricoes do YouTube) e profiles.py (notas
+# de estilo por video, com modelo e texto inteiro).
+#
+# Recebe um LOTE de textos e dispara as chamadas ao GPT-4o-mini
+# em paralelo (AsyncOpenAI), limitadas por um semaforo. Um lote
+# de 30 transcricoes custa ~ a latencia da chamada mais lenta,
+# nao a soma de todas.
+#
+# - Concorrencia configuravel (CLASSIFIER_CONCURRENCY, padrao 8)
+# - Erro 429: respeita o header retry-after da OpenAI
+# - 5xx, timeout e falha de conexao: backoff exponencial
+# - Resultados sempre na ordem de entrada
+# - Cache persistente (SQLite): a classificacao e funcao pura do
+#   trecho de 2000 caracteres + modelo + prompt, entao uma
+#   reindexacao completa nao gasta nenhum token
+# - Tokens gastos (usage das respostas) somados num UsoLLM opcional
+#
+# Uso:
+#   from classifier import classificar_lote
+#   resultados = classificar_lote(textos, PROMPT, "Classifique:", cache=cache)
+# ============================================================
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+MODELO = "gpt-4o-mini"
+
+# Pega so os primeiros 2000 caracteres — suficiente para o LLM
+# entender do que se trata o texto, sem gastar tokens demais
+TAMANHO_TRECHO = 2000
+
+CONCORRENCIA_PADRAO = int(os.getenv("CLASSIFIER_CONCURRENCY", "8"))
+MAX_TENTATIVAS = 5
+
+# Falhas passageiras fora o 429 (o cliente roda com max_retries=0 e
+# as tentativas sao todas feitas aqui, no mesmo backoff)
+ERROS_TRANSITORIOS = (APIConnectionError, APITimeoutError, InternalServerError)
+
+
+# ============================================================
+# CACHE — Classificacoes ja feitas (SQLite em DB_DIR)
+# ============================================================
+
+def versao_prompt(prompt_sistema: str, instrucao: str) -> str:
+    """Versao do prompt = hash do texto. Mudou o prompt, muda a chave."""
+    return hashlib.sha256(f"{prompt_sistema}\n{instrucao}".encode()).hexdigest()[:16]
+
+
+class CacheClassificacao:
+    """
+    Cache persistente das classificacoes do LLM.
+
+    Chave: (modelo, versao do prompt, sha256 do trecho enviado).
+    Fica fora do ChromaDB de proposito — apagar ou reconstruir
+    data/chromadb nao perde as classificacoes ja pagas.
+
+    Args:
+        db_path: Caminho do arquivo SQLite
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.hits = 0
+        self.misses = 0
+
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS classificacoes (
+                    modelo TEXT NOT NULL,
+                    versao_prompt TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    resultado TEXT NOT NULL,
+                    criado_em REAL NOT NULL,
+                    PRIMARY KEY (modelo, versao_prompt, sha256)
+                )
+                """
+            )
+
+    @contextmanager
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def chave_trecho(trecho: str) -> str:
+        return hashlib.sha256(trecho.encode("utf-8")).hexdigest()
+
+    def buscar(self, modelo: str, versao: str, trechos: list[str]) -> list[dict | None]:
+        """Busca varios trechos de uma vez. None = nao esta no cache."""
+        chaves = [self.chave_trecho(t) for t in trechos]
+        with self._conectar() as conn:
+            encontrados = {}
+            # Lotes de 500 para ficar abaixo do limite de variaveis do SQLite
+            for inicio in range(0, len(chaves), 500):
+                lote = chaves[inicio:inicio + 500]
+                marcadores = ",".join("?" * len(lote))
+                for sha256, resultado in conn.execute(
+                    f"SELECT sha256, resultado FROM classificacoes "
+                    f"WHERE modelo = ? AND versao_prompt = ? AND sha256 IN ({marcadores})",
+                    (modelo, versao, *lote),
+                ):
+                    encontrados[sha256] = json.loads(resultado)
+
+        resultados = [encontrados.get(chave) for chave in chaves]
+        acertos = sum(1 for r in resultados if r is not None)
+        self.hits += acertos
+        self.misses += len(resultados) - acertos
+        return resultados
+
+    def salvar(self, modelo: str, versao: str, trecho: str, resultado: dict):
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO classificacoes VALUES (?, ?, ?, ?, ?)",
+                (
+                    modelo,
+                    versao,
+                    self.chave_trecho(trecho),
+                    json.dumps(resultado, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+
+    def zerar_contadores(self):
+        self.hits = 0
+        self.misses = 0
+
+    def resumo(self) -> str:
+        return f"Cache de classificacao: {self.hits} hits, {self.misses} misses"
+
+
+class UsoLLM:
+    """
+    Chamadas e tokens gastos, somados do `usage` de cada resposta
+    (maior_entrada: o maior prompt de uma chamada so).
+    """
+
+    def __init__(self):
+        self.zerar_contadores()
+
+    def zerar_contadores(self):
+        self.chamadas = 0
+        self.tokens_entrada = 0
+        self.tokens_saida = 0
+        self.maior_entrada = 0
+
+    def registrar(self, usage):
+        self.chamadas += 1
+        if usage is not None:
+            self.tokens_entrada += usage.prompt_tokens or 0
+            self.tokens_saida += usage.completion_tokens or 0
+            self.maior_entrada = max(self.maior_entrada, usage.prompt_tokens or 0)
+
+    def somar(self, outro: "UsoLLM"):
+        """Acumula o uso de outro contador (ex: um por thread)."""
+        self.chamadas += outro.chamadas
+        self.tokens_entrada += outro.tokens_entrada
+        self.tokens_saida += outro.tokens_saida
+        self.maior_entrada = max(self.maior_entrada, outro.maior_entrada)
+
+    def resumo(self) -> str:
+        return (
+            f"LLM: {self.chamadas} chamadas, {self.tokens_entrada} tokens de entrada, "
+            f"{self.tokens_saida} de saida"
+        )
+
+
+def segundos_retry_after(response) -> float | None:
+    """
+    Le quanto esperar a partir dos headers da resposta 429.
+
+    A OpenAI manda `retry-after-ms` (milissegundos) e/ou `retry-after`
+    (segundos ou data HTTP).
+    """
+    if response is None:
+        return None
+    headers = response.headers
+
+    valor_ms = headers.get("retry-after-ms")
+    if valor_ms:
+        try:
+            return float(valor_ms) / 1000
+        except ValueError:
+            pass
+
+    valor = headers.get("retry-after")
+    if not valor:
+        return None
+    try:
+        return float(valor)
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+        return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================
+# MOTOR ASSINCRONO — Chamadas em paralelo com semaforo
+# ============================================================
+
+async def _classificar_um(
+    client: AsyncOpenAI,
+    semaforo: asyncio.Semaphore,
+    prompt_sistema: str,
+    instrucao: str,
+    trecho: str,
+    modelo: str = MODELO,
+    uso: UsoLLM | None = None,
+) -> dict:
+    """Classifica um trecho, tentando de novo em caso de 429 ou falha passageira."""
+
+    for tentativa in range(MAX_TENTATIVAS):
+        async with semaforo:
+            try:
+                response = await client.chat.completions.create(
+                    model=modelo,
+                    response_format={"type": "json_object"},
+                    messages=[
+                        {"role": "system", "content": prompt_sistema},
+                        {"role": "user", "content": f"{instrucao}\n\n{trecho}"},
+                    ],
+                )
+                if uso:
+                    uso.registrar(response.usage)
+                return json.loads(response.choices[0].message.content)
+            except RateLimitError as e:
+                if tentativa == MAX_TENTATIVAS - 1:
+                    raise
+                espera = segundos_retry_after(e.response)
+                if espera is None:
+                    espera = 2 ** tentativa  # backoff exponencial: 1, 2, 4, 8s
+                motivo = "Rate limit (429)"
+            except ERROS_TRANSITORIOS as e:
+                if tentativa == MAX_TENTATIVAS - 1:
+                    raise
+                espera = 2 ** tentativa
+                motivo = f"Falha passageira ({type(e).__name__})"
+
+        # Espera FORA do semaforo — a vaga fica livre para outro texto
+        print(f"  {motivo} — aguardando {espera:.1f}s...")
+        await asyncio.sleep(espera)
+
+
+async def classificar_lote_async(
+    textos: list[str],
+    prompt_sistema: str,
+    instrucao: str,
+    concorrencia: int | None = None,
+    cache: CacheClassificacao | None = None,
+    modelo: str = MODELO,
+    tamanho_trecho: int | None = TAMANHO_TRECHO,
+    uso: UsoLLM | None = None,
+) -> list[dict | None]:
+    """Versao async de classificar_lote (para quem ja esta num event loop)."""
+    trechos = [texto[:tamanho_trecho] if tamanho_trecho else texto for texto in textos]
+    versao = versao_prompt(prompt_sistema, instrucao)
+
+    # Cache primeiro — so vai pra OpenAI o que nunca foi classificado
+    saida = cache.buscar(modelo, versao, trechos) if cache else [None] * len(trechos)
+    faltando = [i for i, resultado in enumerate(saida) if resultado is None]
+    if not faltando:
+        return saida
+
+    semaforo = asyncio.Semaphore(concorrencia or CONCORRENCIA_PADRAO)
+
+    # max_retries=0: 429 (respeitando o retry-after), 5xx, timeout e
+    # conexao sao tentados de novo em _classificar_um
+    async with AsyncOpenAI(max_retries=0) as client:
+        resultados = await asyncio.gather(
+            *(
+                _classificar_um(client, semaforo, prompt_sistema, instrucao, trechos[i], modelo, uso)
+                for i in faltando
+            ),
+            return_exceptions=True,
+        )
+
+    # Uma falha nao derruba o lote: vira None e o chamador decide
+    for i, resultado in zip(faltando, resultados):
+        if isinstance(resultado, BaseException):
+            print(f"  ERRO ao classificar item {i + 1}/{len(textos)}: {resultado}")
+            continue
+        saida[i] = resultado
+        if cache:
+            cache.salvar(modelo, versao, trechos[i], resultado)
+    return saida
+
+
+def classificar_lote(
+    textos: list[str],
+    prompt_sistema: str,
+    instrucao: str,
+    concorrencia: int | None = None,
+    cache: CacheClassificacao | None = None,
+    modelo: str = MODELO,
+    tamanho_trecho: int | None = TAMANHO_TRECHO,
+    uso: UsoLLM | None = None,
+) -> list[dict | None]:
+    """
+    Classifica varios textos em paralelo com o GPT-4o-mini.
+
+    Args:
+        textos: Textos completos (so os primeiros `tamanho_trecho`
+            caracteres sao enviados)
+        prompt_sistema: Prompt de sistema do classificador
+        instrucao: Frase antes do trecho na mensagem do usuario
+        concorrencia: Maximo de chamadas simultaneas
+        cache: Cache persistente (consultado antes de chamar a OpenAI)
+        modelo: Modelo do chat (padrao: gpt-4o-mini)
+        tamanho_trecho: Caracteres enviados de cada texto (None = inteiro)
+        uso: Soma chamadas e tokens gastos
+
+    Returns:
+        Lista de dicts na MESMA ordem de `textos` (None se aquele item falhou)
+    """
+    if not textos:
+        return []
+
+    coro = classificar_lote_async(
+        textos, prompt_sistema, instrucao, concorrencia, cache, modelo, tamanho_trecho, uso,
+    )
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Ja existe um event loop nesta thread — roda em uma thread separada
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
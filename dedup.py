@@ -0,0 +1,763 @@
+# ============================================================
+# dedup.py — Deteccao de videos e transcricoes duplicados
+# ============================================================
+# A pasta videos/ tem muitas copias do mesmo video (encaminhado no
+# WhatsApp, baixado duas vezes, "(1)", "(2)"...). Sem dedup, cada
+# copia e transcrita, embeddada no ChromaDB e entra duplicada no
+# prompt do profiles.py.
+#
+# Tres niveis, sempre dentro do mesmo creator:
+#
+# 1. Video identico (sha256 do arquivo) — antes do Whisper
+# 2. Mesmo audio, arquivo diferente (re-encode, corte no final):
+#    impressao dos primeiros IMPRESSAO_S segundos de audio — a
+#    curva de energia, 1 bit por decimo de segundo (subiu/desceu)
+#    — mais a duracao. Precisa do ffmpeg. Antes do Whisper.
+# 3. Transcricao igual ou quase igual (Jaccard de shingles de 5
+#    palavras >= DEDUP_THRESHOLD) — nos JSONs ja transcritos
+#
+# A copia duplicada ganha o campo "duplicata_de" no JSON (com o
+# nome do JSON canonico) e nao e indexada nem vai para o perfil.
+# Para desfazer, basta remover o campo.
+#
+# Entre fontes (apostilas, YouTube, transcricoes), um indice
+# MinHash-LSH (IndiceLSH) acha quase-duplicatas sem comparar todos
+# os pares: documentos inteiros (ingest.py, youtube_ingest.py) e
+# chunks (ChromaDbEmLote, antes do embedding). Fica o primeiro
+# visto; as copias nao entram no ChromaDB e aparecem no relatorio
+# de grupos (python dedup.py --grupos).
+#
+# Uso (relatorio, sem alterar nada):
+#   python dedup.py [pasta_videos]
+#   python dedup.py --grupos
+# ============================================================
+
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+
+from audio import ler_duracao, rodar_ffmpeg
+
+# Jaccard minimo entre transcricoes para considerar duplicata
+LIMIAR_TEXTO = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+
+# Fracao minima de bits iguais entre impressoes de audio
+LIMIAR_AUDIO = float(os.getenv("DEDUP_AUDIO_THRESHOLD", "0.85"))
+
+# Tamanho do shingle (palavras seguidas)
+TAMANHO_SHINGLE = 5
+
+# Impressao de audio: primeiros 30 s, 8 kHz, quadros de 0.1 s
+IMPRESSAO_S = 30
+TAXA_IMPRESSAO = 8000
+AMOSTRAS_POR_QUADRO = TAXA_IMPRESSAO // 10
+
+# Desalinhamento tolerado entre duas impressoes (em quadros de 0.1 s)
+DESLOCAMENTO_MAX = 5
+
+# Sufixo que o sistema poe em copias: "video (1).mp4"
+MARCA_COPIA = re.compile(r"\(\d+\)$")
+
+# Velocidade media de fala, para estimar minutos a partir do texto
+PALAVRAS_POR_MINUTO = 150
+
+# MinHash-LSH: Jaccard estimado minimo entre documentos ou chunks
+# de fontes diferentes para considerar quase-duplicata
+LIMIAR_LSH = float(os.getenv("DEDUP_LSH_THRESHOLD", "0.8"))
+
+# 128 permutacoes em 32 bandas de 4: pares com Jaccard 0.8 viram
+# candidatos em ~100% das vezes, 0.5 em ~87%, 0.2 em ~5% — o limiar
+# e conferido depois, na assinatura inteira
+NUM_PERMUTACOES = 128
+BANDAS = 32
+
+
+# ============================================================
+# TEXTO — Shingles e similaridade de Jaccard
+# ============================================================
+
+def normalizar_palavras(texto: str) -> list[str]:
+    """Palavras em minusculas, sem acento e sem pontuacao."""
+    sem_acento = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return re.findall(r"\w+", sem_acento.lower())
+
+
+def shingles(texto: str, tamanho: int = TAMANHO_SHINGLE) -> set[int]:
+    """
+    Conjunto de shingles (sequencias de `tamanho` palavras) do texto,
+    cada um reduzido a um hash de 64 bits.
+    """
+    palavras = normalizar_palavras(texto)
+    if len(palavras) < tamanho:
+        return {_hash64(" ".join(palavras))} if palavras else set()
+    return {
+        _hash64(" ".join(palavras[i:i + tamanho]))
+        for i in range(len(palavras) - tamanho + 1)
+    }
+
+
+def _hash64(texto: str) -> int:
+    # blake2b e estavel entre processos (o hash() do Python nao e)
+    return int.from_bytes(blake2b(texto.encode(), digest_size=8).digest(), "little")
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def agrupar_similares(
+    conjuntos: dict[str, set],
+    limiar: float = LIMIAR_TEXTO,
+) -> list[list[str]]:
+    """
+    Agrupa as chaves cujos conjuntos tem Jaccard >= limiar (transitivo:
+    se A~B e B~C, os tres ficam no mesmo grupo). Compara todos os pares
+    — serve para as dezenas de videos de um creator.
+
+    Returns:
+        Grupos com 2 ou mais chaves
+    """
+    chaves = sorted(conjuntos)
+    pai = {c: c for c in chaves}
+
+    def raiz(c):
+        while pai[c] != c:
+            pai[c] = pai[pai[c]]
+            c = pai[c]
+        return c
+
+    for i, a in enumerate(chaves):
+        for b in chaves[i + 1:]:
+            if jaccard(conjuntos[a], conjuntos[b]) >= limiar:
+                pai[raiz(b)] = raiz(a)
+
+    grupos = {}
+    for c in chaves:
+        grupos.setdefault(raiz(c), []).append(c)
+    return [g for g in grupos.values() if len(g) > 1]
+
+
+def parece_copia(nome: str) -> bool:
+    """True para "video (1).mp4", "video (2).json"..."""
+    return bool(MARCA_COPIA.search(Path(nome).stem))
+
+
+def duplicatas_transcricoes(
+    autor_dir: Path,
+    limiar: float = LIMIAR_TEXTO,
+) -> list[tuple[Path, Path, float]]:
+    """
+    Transcricoes iguais ou quase iguais na pasta de um creator.
+
+    Em cada grupo, a canonica e a que nao tem cara de copia ("(1)",
+    "(2)" no nome); depois, a mais longa em palavras (a transcricao
+    mais completa); depois, o nome mais curto. JSONs ja marcados como
+    duplicata ficam de fora.
+
+    Returns:
+        Lista de (duplicata, canonica, similaridade)
+    """
+    textos = {}
+    for json_path in sorted(autor_dir.glob("*.json")):
+        dados = json.loads(json_path.read_text(encoding="utf-8"))
+        if dados.get("duplicata_de") or not dados.get("transcricao", "").strip():
+            continue
+        textos[json_path.name] = dados["transcricao"]
+
+    conjuntos = {nome: shingles(texto) for nome, texto in textos.items()}
+    resultado = []
+    for grupo in agrupar_similares(conjuntos, limiar):
+        canonica = max(
+            grupo,
+            key=lambda n: (
+                not parece_copia(n),
+                len(textos[n].split()),
+                -len(n),
+            ),
+        )
+        for nome in grupo:
+            if nome != canonica:
+                resultado.append((
+                    autor_dir / nome,
+                    autor_dir / canonica,
+                    jaccard(conjuntos[nome], conjuntos[canonica]),
+                ))
+    return resultado
+
+
+# ============================================================
+# AUDIO — Impressao da curva de energia
+# ============================================================
+
+def impressao_audio(caminho: Path, segundos: float = IMPRESSAO_S) -> tuple[bytes, float]:
+    """
+    Impressao dos primeiros `segundos` de audio: para cada quadro de
+    0.1 s, 1 se a energia subiu em relacao ao quadro anterior, 0 se
+    nao. Resiste a re-encode, bitrate e volume diferentes.
+
+    Returns:
+        (impressao — um byte 0/1 por quadro, duracao total em segundos)
+
+    Raises:
+        FileNotFoundError: ffmpeg nao instalado
+        subprocess.CalledProcessError: arquivo sem audio legivel
+    """
+    resultado = rodar_ffmpeg([
+        "-t", str(segundos),
+        "-i", str(caminho),
+        "-vn", "-ac", "1", "-ar", str(TAXA_IMPRESSAO),
+        "-f", "s16le", "pipe:1",
+    ])
+    amostras = array("h")
+    amostras.frombytes(resultado.stdout[: len(resultado.stdout) // 2 * 2])
+    if sys.byteorder == "big":
+        amostras.byteswap()
+
+    energias = []
+    for inicio in range(0, len(amostras) - AMOSTRAS_POR_QUADRO + 1, AMOSTRAS_POR_QUADRO):
+        quadro = amostras[inicio:inicio + AMOSTRAS_POR_QUADRO]
+        energias.append(sum(x * x for x in quadro) / AMOSTRAS_POR_QUADRO)
+
+    bits = bytes(int(b > a) for a, b in zip(energias, energias[1:]))
+    duracao = ler_duracao(resultado.stderr.decode("utf-8", errors="replace"))
+    return bits, duracao
+
+
+def similaridade_impressoes(a: bytes, b: bytes, deslocamento_max: int = DESLOCAMENTO_MAX) -> float:
+    """
+    Fracao de bits iguais no melhor alinhamento (ate `deslocamento_max`
+    quadros de diferenca no inicio). Audios sem relacao ficam perto de 0.5.
+    """
+    melhor = 0.0
+    for deslocamento in range(-deslocamento_max, deslocamento_max + 1):
+        x = a[max(0, deslocamento):]
+        y = b[max(0, -deslocamento):]
+        tamanho = min(len(x), len(y))
+        if tamanho < 50:  # menos de 5 s em comum: nao da para afirmar
+            continue
+        iguais = sum(1 for i in range(tamanho) if x[i] == y[i])
+        melhor = max(melhor, iguais / tamanho)
+    return melhor
+
+
+def impressao_informativa(bits: bytes) -> bool:
+    """
+    Silencio (ou audio constante) da uma impressao quase toda igual,
+    que "bate" com qualquer outro silencio — essa nao serve.
+    """
+    if len(bits) < 50:
+        return False
+    return 0.1 <= sum(bits) / len(bits) <= 0.9
+
+
+def mesmo_audio(
+    a: tuple[bytes, float],
+    b: tuple[bytes, float],
+    limiar: float = LIMIAR_AUDIO,
+) -> float | None:
+    """
+    Compara duas (impressao, duracao). Duplicata exige impressoes
+    informativas, duracao parecida (2% ou 1 s) e impressao acima do
+    limiar.
+
+    Returns:
+        Similaridade, ou None se nao for o mesmo audio
+    """
+    (imp_a, dur_a), (imp_b, dur_b) = a, b
+    if not impressao_informativa(imp_a) or not impressao_informativa(imp_b):
+        return None
+    if dur_a and dur_b and abs(dur_a - dur_b) > max(1.0, 0.02 * max(dur_a, dur_b)):
+        return None
+    similaridade = similaridade_impressoes(imp_a, imp_b)
+    return similaridade if similaridade >= limiar else None
+
+
+class IndiceImpressoes:
+    """
+    Impressoes de audio dos videos ja vistos, por creator. Guarda entre
+    rodadas — a copia que chega amanha e comparada com o video de hoje.
+
+    Args:
+        db_path: Caminho do arquivo SQLite
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS impressoes (
+                    sha256 TEXT PRIMARY KEY,
+                    autor TEXT NOT NULL,
+                    caminho TEXT NOT NULL,
+                    duracao REAL NOT NULL,
+                    impressao BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_impressoes_autor ON impressoes (autor)")
+
+    @contextmanager
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def salvar(self, sha256: str, autor: str, caminho: Path, impressao: tuple[bytes, float]):
+        bits, duracao = impressao
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO impressoes (sha256, autor, caminho, duracao, impressao) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (sha256, autor, str(caminho), duracao, bits),
+            )
+
+    def procurar(
+        self,
+        autor: str,
+        impressao: tuple[bytes, float],
+        ignorar_sha256: str | None = None,
+    ) -> tuple[Path, float, str] | None:
+        """
+        Video do mesmo creator com o mesmo audio (o mais parecido).
+
+        Returns:
+            (caminho do video, similaridade, sha256 do video) ou None
+        """
+        with self._conectar() as conn:
+            rows = conn.execute(
+                "SELECT sha256, caminho, duracao, impressao FROM impressoes WHERE autor = ?",
+                (autor,),
+            ).fetchall()
+
+        melhor = None
+        for sha256, caminho, duracao, bits in rows:
+            if sha256 == ignorar_sha256 or not Path(caminho).exists():
+                continue
+            similaridade = mesmo_audio(impressao, (bits, duracao))
+            if similaridade and (melhor is None or similaridade > melhor[1]):
+                melhor = (Path(caminho), similaridade, sha256)
+        return melhor
+
+
+# ============================================================
+# MINHASH-LSH — Quase-duplicatas entre fontes de texto
+# ============================================================
+
+# Funcoes de hash (a*x + b) mod p. Semente fixa: as assinaturas
+# gravadas no indice continuam comparaveis entre rodadas
+_PRIMO = (1 << 61) - 1
+_aleatorio = random.Random(20240501)
+_COEFICIENTES = [
+    (_aleatorio.randrange(1, _PRIMO), _aleatorio.randrange(0, _PRIMO))
+    for _ in range(NUM_PERMUTACOES)
+]
+_LINHAS_POR_BANDA = NUM_PERMUTACOES // BANDAS
+
+
+def assinatura_minhash(conjunto: set[int]) -> tuple[int, ...]:
+    """
+    Assinatura MinHash de um conjunto de shingles: o menor hash do
+    conjunto em cada uma das NUM_PERMUTACOES funcoes. A fracao de
+    posicoes iguais entre duas assinaturas estima o Jaccard.
+
+    Returns:
+        Tupla com NUM_PERMUTACOES inteiros (vazia se o conjunto for vazio)
+    """
+    if not conjunto:
+        return ()
+    return tuple(min((a * x + b) % _PRIMO for x in conjunto) for a, b in _COEFICIENTES)
+
+
+def similaridade_minhash(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Jaccard estimado: fracao de posicoes iguais nas assinaturas."""
+    if not a or not b:
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def baldes_lsh(assinatura: tuple[int, ...]) -> list[str]:
+    """Um balde por banda — assinaturas com uma banda inteira igual caem juntas."""
+    baldes = []
+    for banda in range(BANDAS):
+        linhas = assinatura[banda * _LINHAS_POR_BANDA:(banda + 1) * _LINHAS_POR_BANDA]
+        dados = array("Q", linhas).tobytes()
+        baldes.append(f"{banda}:{blake2b(dados, digest_size=8).hexdigest()}")
+    return baldes
+
+
+class IndiceLSH:
+    """
+    Indice MinHash-LSH persistente de documentos e chunks ja ingeridos.
+
+    Cada texto novo e comparado so com os candidatos que dividem um
+    balde com ele (nao com o corpus todo). Se algum, de outra fonte,
+    passa do limiar, o texto e marcado como copia dele e fica fora do
+    indice — o representante e sempre o primeiro que entrou. Textos
+    da mesma fonte nao se comparam (re-ingerir um arquivo nao o
+    transforma em copia de si mesmo).
+
+    Args:
+        db_path: Caminho do arquivo SQLite
+        limiar: Jaccard estimado minimo (padrao: DEDUP_LSH_THRESHOLD ou 0.8)
+    """
+
+    DOCUMENTO = "documento"
+    CHUNK = "chunk"
+
+    def __init__(self, db_path: Path, limiar: float | None = None):
+        self.db_path = Path(db_path)
+        self.limiar = limiar or LIMIAR_LSH
+        self._lock = threading.Lock()
+        self.zerar_contadores()
+
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS lsh_textos (
+                    chave TEXT PRIMARY KEY,
+                    tipo TEXT NOT NULL,
+                    fonte TEXT NOT NULL,
+                    assinatura BLOB NOT NULL,
+                    representante TEXT,
+                    similaridade REAL,
+                    palavras INTEGER NOT NULL,
+                    criado_em REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS lsh_baldes (balde TEXT NOT NULL, chave TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_baldes ON lsh_baldes (balde)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_lsh_representante ON lsh_textos (representante)"
+            )
+
+    @contextmanager
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def zerar_contadores(self):
+        self.documentos = 0
+        self.chunks = 0
+        self.palavras = 0
+
+    def resumo(self) -> str:
+        return (
+            f"Quase-duplicatas (MinHash-LSH): {self.documentos} documentos e "
+            f"{self.chunks} chunks fora do ChromaDB ({self.palavras} palavras)"
+        )
+
+    # ---- Consulta e registro ----
+
+    def _procurar(self, conn, tipo: str, fonte: str, assinatura: tuple[int, ...]):
+        """Melhor candidato de outra fonte acima do limiar: (chave, similaridade) ou None."""
+        baldes = baldes_lsh(assinatura)
+        rows = conn.execute(
+            f"SELECT DISTINCT t.chave, t.assinatura FROM lsh_baldes b "
+            f"JOIN lsh_textos t ON t.chave = b.chave "
+            f"WHERE b.balde IN ({','.join('?' * len(baldes))}) AND t.tipo = ? AND t.fonte != ?",
+            (*baldes, tipo, fonte),
+        ).fetchall()
+
+        melhor = None
+        for chave, dados in rows:
+            outra = array("Q")
+            outra.frombytes(dados)
+            similaridade = similaridade_minhash(assinatura, tuple(outra))
+            if similaridade >= self.limiar and (melhor is None or similaridade > melhor[1]):
+                melhor = (chave, similaridade)
+        return melhor
+
+    def _avaliar(self, conn, chave: str, tipo: str, fonte: str, texto: str) -> dict | None:
+        """
+        Assinatura e representante de um texto, sem gravar nada.
+
+        Returns:
+            Registro para o _gravar_registro (representante None se for
+            novo), ou None se o texto nao tem palavras
+        """
+        palavras = normalizar_palavras(texto)
+        assinatura = assinatura_minhash(shingles(texto))
+        if not assinatura:
+            return None
+
+        achado = self._procurar(conn, tipo, fonte, assinatura)
+        representante, similaridade = achado if achado else (None, None)
+        return {
+            "chave": chave,
+            "tipo": tipo,
+            "fonte": fonte,
+            "assinatura": assinatura,
+            "representante": representante,
+            "similaridade": similaridade,
+            "palavras": len(palavras),
+        }
+
+    def _gravar_registro(self, conn, registro: dict):
+        conn.execute("DELETE FROM lsh_baldes WHERE chave = ?", (registro["chave"],))
+        conn.execute(
+            "INSERT OR REPLACE INTO lsh_textos "
+            "(chave, tipo, fonte, assinatura, representante, similaridade, palavras, criado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                registro["chave"], registro["tipo"], registro["fonte"],
+                array("Q", registro["assinatura"]).tobytes(),
+                registro["representante"], registro["similaridade"],
+                registro["palavras"], time.time(),
+            ),
+        )
+        if registro["representante"]:
+            with self._lock:
+                if registro["tipo"] == self.DOCUMENTO:
+                    self.documentos += 1
+                else:
+                    self.chunks += 1
+                self.palavras += registro["palavras"]
+            return
+
+        # So os representantes entram nos baldes: cada grupo e uma
+        # estrela em volta do primeiro texto visto
+        conn.executemany(
+            "INSERT INTO lsh_baldes (balde, chave) VALUES (?, ?)",
+            [(balde, registro["chave"]) for balde in baldes_lsh(registro["assinatura"])],
+        )
+
+    def verificar_documento(self, fonte: str, texto: str) -> tuple[str, float] | None:
+        """
+        Registra um documento inteiro antes da ingestao.
+
+        Args:
+            fonte: Nome do documento no ChromaDB (ex: "apostila-x", "youtube-id")
+            texto: Texto completo
+
+        Returns:
+            (fonte do representante, similaridade) se for quase-duplicata,
+            None se for novo (passa a ser representante)
+        """
+        with self._conectar() as conn:
+            registro = self._avaliar(conn, fonte, self.DOCUMENTO, fonte, texto)
+            if registro is None:
+                return None
+            self._gravar_registro(conn, registro)
+        if registro["representante"]:
+            return registro["representante"], registro["similaridade"]
+        return None
+
+    @contextmanager
+    def filtrar_chunks(self, chunks: list[tuple[str, str, str]]):
+        """
+        Decide quais chunks de um lote sao copia de um chunk de OUTRA
+        fonte ja indexado. Chunks da mesma fonte nao se comparam — dois
+        iguais no mesmo lote ficam os dois (o ChromaDbEmLote ja tira os
+        de texto identico).
+
+        O registro no indice so e gravado se o bloco do `with` terminar
+        sem erro: um embedding ou um add que falhe nao deixa
+        representantes que nao estao no ChromaDB.
+
+        Args:
+            chunks: Lista de (id do chunk, fonte, texto)
+
+        Yields:
+            Um bool por chunk: True se deve ser indexado
+        """
+        with self._conectar() as conn:
+            registros = [
+                self._avaliar(conn, f"{fonte}#{id_chunk}", self.CHUNK, fonte, texto)
+                for id_chunk, fonte, texto in chunks
+            ]
+
+        yield [registro is None or registro["representante"] is None for registro in registros]
+
+        with self._conectar() as conn:
+            for registro in registros:
+                if registro is not None:
+                    self._gravar_registro(conn, registro)
+
+    def remover_fonte(self, fonte: str) -> list[str]:
+        """
+        Esquece os textos de uma fonte que saiu do ChromaDB (apagada ou
+        reindexada): os chunks e o documento, se era representante. O
+        registro de um documento marcado como copia fica (relatorio).
+
+        As copias que apontavam para ela perdem o representante: os
+        registros delas saem do indice e as fontes voltam para quem
+        chamou, para serem ingeridas de novo (senao o conteudo sumiria
+        ate o arquivo mudar).
+
+        Returns:
+            Fontes (de outros documentos) que tinham copias dela
+        """
+        with self._conectar() as conn:
+            copias = [
+                row[0] for row in conn.execute(
+                    "SELECT DISTINCT c.fonte FROM lsh_textos c "
+                    "JOIN lsh_textos r ON r.chave = c.representante "
+                    "WHERE r.fonte = ? AND c.fonte != ? ORDER BY c.fonte",
+                    (fonte, fonte),
+                ).fetchall()
+            ]
+            conn.execute(
+                "DELETE FROM lsh_textos WHERE representante IN "
+                "(SELECT chave FROM lsh_textos WHERE fonte = ?)",
+                (fonte,),
+            )
+            conn.execute(
+                "DELETE FROM lsh_baldes WHERE chave IN "
+                "(SELECT chave FROM lsh_textos WHERE fonte = ? AND representante IS NULL)",
+                (fonte,),
+            )
+            conn.execute(
+                "DELETE FROM lsh_textos WHERE fonte = ? AND (tipo = ? OR representante IS NULL)",
+                (fonte, self.CHUNK),
+            )
+        return copias
+
+    # ---- Relatorio ----
+
+    def grupos(self, tipo: str | None = None) -> list[dict]:
+        """
+        Grupos de quase-duplicatas: o representante e as copias.
+
+        Returns:
+            Lista de {tipo, representante, copias: [(chave, similaridade, palavras)]},
+            maiores grupos primeiro
+        """
+        with self._conectar() as conn:
+            rows = conn.execute(
+                "SELECT t.tipo, r.fonte, t.chave, t.similaridade, t.palavras "
+                "FROM lsh_textos t JOIN lsh_textos r ON r.chave = t.representante "
+                "WHERE (? IS NULL OR t.tipo = ?) ORDER BY t.tipo, r.fonte, t.similaridade DESC",
+                (tipo, tipo),
+            ).fetchall()
+
+        grupos = {}
+        for tipo_texto, representante, chave, similaridade, palavras in rows:
+            grupo = grupos.setdefault(
+                (tipo_texto, representante),
+                {"tipo": tipo_texto, "representante": representante, "copias": []},
+            )
+            grupo["copias"].append((chave, similaridade, palavras))
+        return sorted(grupos.values(), key=lambda g: (g["tipo"], -len(g["copias"])))
+
+    def relatorio(self) -> str:
+        """Grupos de documentos e, por par de fontes, os chunks repetidos."""
+        linhas = []
+        documentos = self.grupos(self.DOCUMENTO)
+        linhas.append(f"Documentos quase-duplicados: {sum(len(g['copias']) for g in documentos)}")
+        for grupo in documentos:
+            linhas.append(f"  {grupo['representante']}")
+            for chave, similaridade, palavras in grupo["copias"]:
+                linhas.append(f"    = {chave} ({similaridade:.0%}, {palavras} palavras)")
+
+        # Chunks: agrupados por (fonte da copia -> fonte do representante)
+        pares = {}
+        for grupo in self.grupos(self.CHUNK):
+            for chave, _, palavras in grupo["copias"]:
+                par = pares.setdefault((chave.rsplit("#", 1)[0], grupo["representante"]), [0, 0])
+                par[0] += 1
+                par[1] += palavras
+        linhas.append(f"\nChunks quase-duplicados: {sum(n for n, _ in pares.values())}")
+        for (fonte, representante), (quantidade, palavras) in sorted(
+            pares.items(), key=lambda item: -item[1][0]
+        ):
+            linhas.append(f"  {fonte}\n    -> {representante}: {quantidade} chunks ({palavras} palavras)")
+        return "\n".join(linhas)
+
+
+# ============================================================
+# RELATORIO — O que a dedup economizou
+# ============================================================
+
+class EconomiaDedup:
+    """Duplicatas encontradas e o custo evitado (Whisper, embeddings, prompt)."""
+
+    def __init__(self):
+        self.zerar()
+
+    def zerar(self):
+        self.videos = 0
+        self.minutos_whisper = 0.0
+        self.transcricoes = 0
+        self.tokens = 0
+
+    def registrar_video(self, minutos: float):
+        """Video duplicado que nao foi para o Whisper."""
+        self.videos += 1
+        self.minutos_whisper += minutos
+
+    def registrar_transcricao(self, texto: str):
+        """Transcricao duplicada que nao sera embeddada nem ira para o perfil."""
+        from embedding_batch import contar_tokens
+
+        self.transcricoes += 1
+        self.tokens += contar_tokens(texto)
+
+    def resumo(self) -> str:
+        return (
+            f"Duplicatas: {self.videos} videos ({self.minutos_whisper:.1f} min de Whisper evitados), "
+            f"{self.transcricoes} transcricoes ({self.tokens} tokens de transcricao nao reprocessados "
+            f"— nem embedding, nem prompt de perfil)"
+        )
+
+
+def minutos_estimados(texto: str) -> float:
+    """Duracao aproximada da fala a partir do numero de palavras."""
+    return len(texto.split()) / PALAVRAS_POR_MINUTO
+
+
+# ============================================================
+# CLI — Relatorio das transcricoes duplicadas (nao altera nada)
+# ============================================================
+
+def main():
+    if "--grupos" in sys.argv:
+        # Mesmo lugar que o agent.py usa (DB_DIR), sem importar o agent
+        disco = os.getenv("RENDER_DISK_PATH")
+        db_dir = Path(disco) / "data" if disco else Path(__file__).parent / "data"
+        if not (db_dir / "duplicatas.db").exists():
+            print(f"Indice nao encontrado em {db_dir} — rode a ingestao primeiro")
+            return
+        print(IndiceLSH(db_dir / "duplicatas.db").relatorio())
+        return
+
+    pasta = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "videos"
+    economia = EconomiaDedup()
+
+    for autor_dir in sorted(p for p in pasta.iterdir() if p.is_dir()):
+        duplicatas = duplicatas_transcricoes(autor_dir)
+        if not duplicatas:
+            continue
+        print(f"\n--- {autor_dir.name} ---")
+        for duplicata, canonica, similaridade in duplicatas:
+            print(f"  {duplicata.name}\n    = {canonica.name} ({similaridade:.0%})")
+            dados = json.loads(duplicata.read_text(encoding="utf-8"))
+            economia.registrar_transcricao(dados["transcricao"])
+
+    print(f"\n{economia.resumo()}")
+
+
+if __name__ == "__main__":
+    main()
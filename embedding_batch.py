@@ -0,0 +1,373 @@
+# ============================================================
+# embedding_batch.py — Embeddings em lote + insercao em massa
+# ============================================================
+# O caminho padrao do agno faz UMA requisicao de embedding por
+# chunk (document.embed) e um upsert no ChromaDB por documento.
+# Em PDFs e transcricoes longas, o tempo do add_content e quase
+# todo ida e volta HTTP.
+#
+# Aqui os chunks sao empacotados em requisicoes ate os limites
+# da API (2048 entradas / 300k tokens por requisicao), varias
+# requisicoes rodam em paralelo (AsyncOpenAI + semaforo) e o
+# resultado vai para o ChromaDB em um unico add/upsert.
+#
+# - Concorrencia configuravel (EMBEDDING_CONCURRENCY, padrao 4)
+# - Erro 429: respeita o header retry-after (como o classifier.py);
+#   5xx, timeout e falha de conexao: backoff exponencial
+# - Estatisticas por rodada: chunks, requisicoes, chunks/s
+#
+# Uso:
+#   vector_db = ChromaDbEmLote(collection="copywriter", embedder=embedder, ...)
+#   ... knowledge_base.add_content(...)
+#   print(vector_db.estatisticas.resumo())
+# ============================================================
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from hashlib import md5
+
+from agno.knowledge.document.base import Document
+from agno.vectordb.chroma import ChromaDb
+from openai import AsyncOpenAI, RateLimitError
+
+from classifier import ERROS_TRANSITORIOS, segundos_retry_after
+
+# Limites da API de embeddings da OpenAI (text-embedding-3-*)
+MAX_ENTRADAS_REQUISICAO = 2048
+MAX_TOKENS_REQUISICAO = 300_000
+
+CONCORRENCIA_PADRAO = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+MAX_TENTATIVAS = 5
+
+
+# ============================================================
+# CONTAGEM DE TOKENS — tiktoken se disponivel, senao estimativa
+# ============================================================
+
+_codificador = None
+
+
+def contar_tokens(texto: str) -> int:
+    """
+    Tokens de um texto no tokenizer dos modelos de embedding.
+
+    Sem tiktoken (ou sem rede para baixar o vocabulario), estima
+    com folga: ~3 caracteres por token em portugues.
+    """
+    global _codificador
+    if _codificador is None:
+        try:
+            import tiktoken
+
+            _codificador = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _codificador = False
+    if _codificador:
+        return len(_codificador.encode(texto, disallowed_special=()))
+    return len(texto) // 3 + 1
+
+
+def montar_lotes(textos: list[str]) -> list[list[int]]:
+    """
+    Agrupa os textos (por indice) em requisicoes que respeitam os
+    limites de entradas e de tokens da API, mantendo a ordem.
+    """
+    lotes = []
+    atual, tokens_atual = [], 0
+    for i, texto in enumerate(textos):
+        tokens = contar_tokens(texto)
+        if atual and (
+            len(atual) >= MAX_ENTRADAS_REQUISICAO
+            or tokens_atual + tokens > MAX_TOKENS_REQUISICAO
+        ):
+            lotes.append(atual)
+            atual, tokens_atual = [], 0
+        atual.append(i)
+        tokens_atual += tokens
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+
+# ============================================================
+# ESTATISTICAS — O que cada rodada de ingestao gastou
+# ============================================================
+
+class EstatisticasEmbedding:
+    """Contadores de chunks embeddados, requisicoes e tempo gasto."""
+
+    def __init__(self):
+        self.zerar()
+
+    def zerar(self):
+        self.chunks = 0
+        self.requisicoes = 0
+        self.segundos = 0.0
+
+    def resumo(self) -> str:
+        taxa = self.chunks / self.segundos if self.segundos else 0.0
+        return (
+            f"Embeddings: {self.chunks} chunks em {self.requisicoes} requisicoes "
+            f"({taxa:.1f} chunks/s)"
+        )
+
+
+# ============================================================
+# MOTOR ASSINCRONO — Requisicoes em paralelo com semaforo
+# ============================================================
+
+async def _embeddar_requisicao(
+    client: AsyncOpenAI,
+    semaforo: asyncio.Semaphore,
+    parametros: dict,
+    textos: list[str],
+    estatisticas: EstatisticasEmbedding | None,
+) -> list[list[float]]:
+    """Uma requisicao de embeddings, tentando de novo em caso de 429 ou falha passageira."""
+
+    for tentativa in range(MAX_TENTATIVAS):
+        async with semaforo:
+            try:
+                if estatisticas:
+                    estatisticas.requisicoes += 1
+                response = await client.embeddings.create(input=textos, **parametros)
+                # A API devolve cada vetor com o indice da entrada
+                return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+            except RateLimitError as e:
+                if tentativa == MAX_TENTATIVAS - 1:
+                    raise
+                espera = segundos_retry_after(e.response)
+                if espera is None:
+                    espera = 2 ** tentativa  # backoff exponencial: 1, 2, 4, 8s
+                motivo = "Rate limit (429)"
+            except ERROS_TRANSITORIOS as e:
+                if tentativa == MAX_TENTATIVAS - 1:
+                    raise
+                espera = 2 ** tentativa
+                motivo = f"Falha passageira ({type(e).__name__})"
+
+        # Espera FORA do semaforo — a vaga fica livre para outro lote
+        print(f"  {motivo} nos embeddings — aguardando {espera:.1f}s...")
+        await asyncio.sleep(espera)
+
+
+async def embeddar_textos_async(
+    embedder,
+    textos: list[str],
+    concorrencia: int | None = None,
+    estatisticas: EstatisticasEmbedding | None = None,
+) -> list[list[float]]:
+    """Versao async de embeddar_textos (para quem ja esta num event loop)."""
+    parametros = {"model": embedder.id, "encoding_format": "float"}
+    # Mesma regra do OpenAIEmbedder para mandar `dimensions`
+    if embedder.id.startswith("text-embedding-3") or embedder.base_url is not None:
+        parametros["dimensions"] = embedder.dimensions
+    if embedder.user is not None:
+        parametros["user"] = embedder.user
+    if embedder.request_params:
+        parametros.update(embedder.request_params)
+
+    semaforo = asyncio.Semaphore(concorrencia or CONCORRENCIA_PADRAO)
+    lotes = montar_lotes(textos)
+
+    # Cliente proprio (nao o embedder.aclient): cada asyncio.run tem
+    # seu event loop. max_retries=0: 429, 5xx, timeout e conexao sao
+    # tentados de novo em _embeddar_requisicao (um max_retries do
+    # client_params ficaria duplicado — sai daqui)
+    client_params = {k: v for k, v in (embedder.client_params or {}).items() if k != "max_retries"}
+    async with AsyncOpenAI(
+        api_key=embedder.api_key,
+        organization=embedder.organization,
+        base_url=embedder.base_url,
+        max_retries=0,
+        **client_params,
+    ) as client:
+        resultados = await asyncio.gather(
+            *(
+                _embeddar_requisicao(
+                    client, semaforo, parametros, [textos[i] for i in lote], estatisticas
+                )
+                for lote in lotes
+            )
+        )
+
+    vetores = [None] * len(textos)
+    for lote, vetores_lote in zip(lotes, resultados):
+        for i, vetor in zip(lote, vetores_lote):
+            vetores[i] = vetor
+    return vetores
+
+
+def embeddar_textos(
+    embedder,
+    textos: list[str],
+    concorrencia: int | None = None,
+    estatisticas: EstatisticasEmbedding | None = None,
+) -> list[list[float]]:
+    """
+    Gera os embeddings de varios textos em poucas requisicoes.
+
+    Args:
+        embedder: OpenAIEmbedder (modelo, dimensoes e credenciais)
+        textos: Textos a embeddar
+        concorrencia: Maximo de requisicoes simultaneas
+        estatisticas: Contadores a atualizar (opcional)
+
+    Returns:
+        Lista de vetores na MESMA ordem de `textos`
+
+    Raises:
+        openai.OpenAIError: se uma requisicao falhar (depois das
+            tentativas no caso de 429, 5xx, timeout ou falha de
+            conexao) — o add_content falha e o
+            arquivo fica pendente no manifesto
+    """
+    if not textos:
+        return []
+
+    coro = embeddar_textos_async(embedder, textos, concorrencia, estatisticas)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Ja existe um event loop nesta thread — roda em uma thread separada
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+# ============================================================
+# CHROMADB — insert/upsert com embeddings em lote
+# ============================================================
+
+class ChromaDbEmLote(ChromaDb):
+    """
+    ChromaDb que embedda todos os chunks de um add_content em lote
+    e grava tudo em um unico add/upsert (em vez de um embed por chunk).
+
+    Se o embedder tiver cache (embedding_cache.OpenAIEmbedderComCache),
+    so os textos que faltam no cache vao para a API.
+
+    Com um indice_lsh (dedup.IndiceLSH), chunks quase iguais a um
+    chunk ja indexado de outra fonte saem antes do embedding. Quando
+    uma fonte sai do ChromaDB, as que tinham copias dela tambem saem
+    e voltam para a fila (ao_readmitir), para entrarem inteiras.
+
+    Atributos:
+        estatisticas: Contadores da rodada (zere com estatisticas.zerar())
+        indice_lsh: Indice de quase-duplicatas (None = indexa tudo)
+        ao_readmitir: Recebe os nomes das fontes que voltam para a
+            fila (ex: manifesto.reabrir)
+    """
+
+    def __init__(self, *args, indice_lsh=None, ao_readmitir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estatisticas = EstatisticasEmbedding()
+        self.indice_lsh = indice_lsh
+        self.ao_readmitir = ao_readmitir
+
+    @contextmanager
+    def _sem_quase_duplicatas(self, content_hash: str, documents: list[Document]):
+        """
+        Tira os chunks que o indice LSH marcou como copia de outra
+        fonte. O indice so grava o lote se o bloco terminar sem erro
+        (chunks ja no ChromaDB).
+        """
+        if self.indice_lsh is None or not documents:
+            yield documents
+            return
+        with self.indice_lsh.filtrar_chunks([
+            (md5(doc.content.encode()).hexdigest(), doc.name or content_hash, doc.content)
+            for doc in documents
+        ]) as manter:
+            yield [doc for doc, fica in zip(documents, manter) if fica]
+
+    def _embeddar_documentos(self, documents: list[Document]):
+        """Preenche document.embedding de todos os documentos."""
+        textos = [doc.content for doc in documents]
+        inicio = time.perf_counter()
+
+        if hasattr(self.embedder, "embeddar_em_lote"):
+            vetores = self.embedder.embeddar_em_lote(textos, estatisticas=self.estatisticas)
+        else:
+            vetores = embeddar_textos(self.embedder, textos, estatisticas=self.estatisticas)
+
+        self.estatisticas.chunks += len(textos)
+        self.estatisticas.segundos += time.perf_counter() - inicio
+        for doc, vetor in zip(documents, vetores):
+            doc.embedding = vetor
+
+    def _preparar(self, content_hash: str, documents: list[Document], filters: dict | None):
+        """Mesmo formato de ids/metadados do ChromaDb.insert do agno."""
+        self._embeddar_documentos(documents)
+
+        ids, docs, embeddings, metadatas = [], [], [], []
+        for document in documents:
+            conteudo = document.content.replace("\x00", "\ufffd")
+
+            metadata = document.meta_data or {}
+            if filters:
+                metadata.update(filters)
+            if document.name is not None:
+                metadata["name"] = document.name
+            if document.content_id is not None:
+                metadata["content_id"] = document.content_id
+            metadata["content_hash"] = content_hash
+
+            ids.append(md5(conteudo.encode()).hexdigest())
+            docs.append(conteudo)
+            embeddings.append(document.embedding)
+            metadatas.append(self._flatten_metadata(metadata))
+        return ids, docs, embeddings, metadatas
+
+    def _gravar(self, operacao: str, content_hash: str, documents: list[Document], filters: dict | None):
+        # O id do chunk e o md5 do texto: dois chunks iguais no mesmo
+        # lote (ex: janelas de legenda so com "[Musica]") derrubariam o
+        # upsert inteiro — fica o primeiro
+        unicos = {}
+        for doc in documents:
+            unicos.setdefault(doc.content, doc)
+        with self._sem_quase_duplicatas(content_hash, list(unicos.values())) as documents:
+            if not documents:
+                return
+            if not self._collection:
+                self._collection = self.client.get_collection(name=self.collection_name)
+
+            ids, docs, embeddings, metadatas = self._preparar(content_hash, documents, filters)
+            gravar = getattr(self._collection, operacao)
+
+            # O ChromaDB tem limite de itens por chamada (~5000 no SQLite)
+            passo = self.client.get_max_batch_size()
+            for inicio in range(0, len(ids), passo):
+                fim = inicio + passo
+                gravar(
+                    ids=ids[inicio:fim],
+                    embeddings=embeddings[inicio:fim],
+                    documents=docs[inicio:fim],
+                    metadatas=metadatas[inicio:fim],
+                )
+
+    def delete_by_name(self, name: str) -> bool:
+        # Os chunks apagados deixam de ser "o original" no indice LSH.
+        # As fontes que tinham copias deles saem tambem (os chunks que
+        # ja estavam indexados) e voltam para a fila: na proxima
+        # ingestao entram inteiras — ou viram copia de novo
+        if self.indice_lsh is not None:
+            copias = self.indice_lsh.remover_fonte(name)
+            for copia in copias:
+                self.delete_by_name(copia)
+            if copias:
+                print(f"  {len(copias)} fontes com copias de {name} voltam para a fila: {', '.join(copias)}")
+                if self.ao_readmitir is not None:
+                    self.ao_readmitir(copias)
+        return super().delete_by_name(name)
+
+    def insert(self, content_hash: str, documents: list[Document], filters: dict | None = None) -> None:
+        self._gravar("add", content_hash, documents, filters)
+
+    def _upsert(self, content_hash: str, documents: list[Document], filters: dict | None = None) -> None:
+        self._gravar("upsert", content_hash, documents, filters)
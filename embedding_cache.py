@@ -0,0 +1,270 @@
+# ============================================================
+# embedding_cache.py — Cache de embeddings em disco (SQLite)
+# ============================================================
+# O embedding de um chunk e funcao pura de (modelo, dimensoes,
+# texto). Reindexar o mesmo conteudo — ChromaDB apagado, colecao
+# nova, perfil regerado com force=True — nao precisa pagar a
+# OpenAI de novo pelo texto que nao mudou.
+#
+# - Chave: (modelo, dimensoes, sha256 do texto)
+# - Vetor guardado como BLOB float32 (1536 dims = 6 KB por chunk)
+# - Limite de tamanho com descarte LRU (EMBEDDING_CACHE_MB,
+#   padrao 200 MB — cabe folgado no disco de 1 GB do Render)
+#
+# Vale tambem para o SemanticChunking: passando o mesmo embedder
+# para o chunker, os embeddings das frases tambem saem do cache.
+#
+# Uso:
+#   cache = CacheEmbeddings(DB_DIR / "embeddings.db")
+#   embedder = OpenAIEmbedderComCache(id="text-embedding-3-small", cache=cache)
+# ============================================================
+
+import hashlib
+import os
+import sqlite3
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from agno.knowledge.embedder.openai import OpenAIEmbedder
+
+from embedding_batch import EstatisticasEmbedding, embeddar_textos
+
+LIMITE_MB_PADRAO = int(os.getenv("EMBEDDING_CACHE_MB", "200"))
+
+# Ao passar do limite, descarta ate ficar em 90% dele — assim a
+# poda nao roda de novo a cada insercao
+FOLGA_PODA = 0.9
+
+
+# ============================================================
+# CACHE — Vetores ja calculados (SQLite em DB_DIR)
+# ============================================================
+
+class CacheEmbeddings:
+    """
+    Cache persistente de embeddings com descarte LRU.
+
+    Fica fora do ChromaDB de proposito — apagar ou reconstruir
+    data/chromadb nao perde os embeddings ja pagos.
+
+    Args:
+        db_path: Caminho do arquivo SQLite
+        limite_mb: Tamanho maximo dos vetores guardados (padrao:
+            EMBEDDING_CACHE_MB ou 200)
+    """
+
+    def __init__(self, db_path: Path, limite_mb: int | None = None):
+        self.db_path = Path(db_path)
+        self.limite_bytes = (limite_mb or LIMITE_MB_PADRAO) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    modelo TEXT NOT NULL,
+                    dimensoes INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    vetor BLOB NOT NULL,
+                    usado_em REAL NOT NULL,
+                    PRIMARY KEY (modelo, dimensoes, sha256)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_usado_em ON embeddings (usado_em)")
+            self._tamanho = conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vetor)), 0) FROM embeddings"
+            ).fetchone()[0]
+
+    @contextmanager
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def chave_texto(texto: str) -> str:
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def buscar(self, modelo: str, dimensoes: int, textos: list[str]) -> list[list[float] | None]:
+        """Busca varios textos de uma vez. None = nao esta no cache."""
+        chaves = [self.chave_texto(t) for t in textos]
+        encontrados = {}
+        with self._conectar() as conn:
+            # Lotes de 500 para ficar abaixo do limite de variaveis do SQLite
+            for inicio in range(0, len(chaves), 500):
+                lote = list(set(chaves[inicio:inicio + 500]))
+                marcadores = ",".join("?" * len(lote))
+                filtro = f"modelo = ? AND dimensoes = ? AND sha256 IN ({marcadores})"
+                for sha256, vetor in conn.execute(
+                    f"SELECT sha256, vetor FROM embeddings WHERE {filtro}",
+                    (modelo, dimensoes, *lote),
+                ):
+                    encontrados[sha256] = array("f", vetor).tolist()
+                # Marca como usado agora (e o que define o LRU)
+                conn.execute(
+                    f"UPDATE embeddings SET usado_em = ? WHERE {filtro}",
+                    (time.time(), modelo, dimensoes, *lote),
+                )
+
+        resultados = [encontrados.get(chave) for chave in chaves]
+        acertos = sum(1 for r in resultados if r is not None)
+        self.hits += acertos
+        self.misses += len(resultados) - acertos
+        return resultados
+
+    def salvar(self, modelo: str, dimensoes: int, textos: list[str], vetores: list[list[float]]):
+        """Guarda os vetores (vetores vazios = erro na API, nao sao guardados)."""
+        # Por chave: texto repetido no lote e gravado (e contado) uma vez
+        por_chave = {}
+        for texto, vetor in zip(textos, vetores):
+            if vetor:
+                chave = self.chave_texto(texto)
+                por_chave[chave] = (modelo, dimensoes, chave, array("f", vetor).tobytes(), time.time())
+        linhas = list(por_chave.values())
+        if not linhas:
+            return
+        substituidos = 0
+        with self._conectar() as conn:
+            # INSERT OR REPLACE de chave existente: o vetor antigo sai da conta
+            for inicio in range(0, len(linhas), 500):
+                lote = [linha[2] for linha in linhas[inicio:inicio + 500]]
+                marcadores = ",".join("?" * len(lote))
+                substituidos += conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(vetor)), 0) FROM embeddings "
+                    f"WHERE modelo = ? AND dimensoes = ? AND sha256 IN ({marcadores})",
+                    (modelo, dimensoes, *lote),
+                ).fetchone()[0]
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", linhas)
+        self._tamanho += sum(len(linha[3]) for linha in linhas) - substituidos
+
+        if self._tamanho > self.limite_bytes:
+            self._podar()
+
+    def _podar(self):
+        """Descarta os vetores usados ha mais tempo ate caber no limite."""
+        with self._conectar() as conn:
+            # Recalcula: outro processo (servidor x ingest.py) pode ter gravado
+            self._tamanho, quantidade = conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vetor)), 0), COUNT(*) FROM embeddings"
+            ).fetchone()
+            excesso = self._tamanho - int(self.limite_bytes * FOLGA_PODA)
+            if excesso <= 0 or not quantidade:
+                return
+
+            tamanho_medio = self._tamanho / quantidade
+            descartar = int(excesso / tamanho_medio) + 1
+            conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY usado_em LIMIT ?)",
+                (descartar,),
+            )
+            self._tamanho = conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vetor)), 0) FROM embeddings"
+            ).fetchone()[0]
+        print(f"Cache de embeddings: {descartar} vetores antigos descartados (limite LRU)")
+
+    def zerar_contadores(self):
+        self.hits = 0
+        self.misses = 0
+
+    def resumo(self) -> str:
+        return (
+            f"Cache de embeddings: {self.hits} hits, {self.misses} misses "
+            f"({self._tamanho / 1024 / 1024:.1f} MB)"
+        )
+
+
+# ============================================================
+# EMBEDDER — OpenAIEmbedder que consulta o cache antes da API
+# ============================================================
+
+@dataclass
+class OpenAIEmbedderComCache(OpenAIEmbedder):
+    """
+    OpenAIEmbedder com cache em disco.
+
+    Mesmo comportamento do OpenAIEmbedder (mesmo modelo, mesmas
+    dimensoes), so que texto ja visto nao vai para a OpenAI. Em
+    hit, o usage volta None — nenhum token foi gasto.
+
+    Args:
+        cache: CacheEmbeddings compartilhado (None = sem cache)
+    """
+
+    cache: CacheEmbeddings | None = None
+
+    def _do_cache(self, texto: str) -> list[float] | None:
+        if self.cache is None:
+            return None
+        return self.cache.buscar(self.id, self.dimensions, [texto])[0]
+
+    def _guardar(self, textos: list[str], vetores: list[list[float]]):
+        if self.cache is not None:
+            self.cache.salvar(self.id, self.dimensions, textos, vetores)
+
+    def get_embedding(self, text: str) -> list[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    def get_embedding_and_usage(self, text: str):
+        vetor = self._do_cache(text)
+        if vetor is not None:
+            return vetor, None
+        vetor, usage = super().get_embedding_and_usage(text)
+        self._guardar([text], [vetor])
+        return vetor, usage
+
+    def embeddar_em_lote(
+        self,
+        textos: list[str],
+        estatisticas: EstatisticasEmbedding | None = None,
+    ) -> list[list[float]]:
+        """
+        Embeddings de varios textos: cache primeiro, o resto em lote
+        (embedding_batch.embeddar_textos). Usado pelo ChromaDbEmLote.
+        """
+        if self.cache is None:
+            return embeddar_textos(self, textos, estatisticas=estatisticas)
+
+        vetores = self.cache.buscar(self.id, self.dimensions, textos)
+        faltando = [i for i, vetor in enumerate(vetores) if vetor is None]
+        if faltando:
+            novos = embeddar_textos(self, [textos[i] for i in faltando], estatisticas=estatisticas)
+            for i, vetor in zip(faltando, novos):
+                vetores[i] = vetor
+            self._guardar([textos[i] for i in faltando], novos)
+        return vetores
+
+    async def async_get_embedding(self, text: str) -> list[float]:
+        return (await self.async_get_embedding_and_usage(text))[0]
+
+    async def async_get_embedding_and_usage(self, text: str):
+        vetor = self._do_cache(text)
+        if vetor is not None:
+            return vetor, None
+        vetor, usage = await super().async_get_embedding_and_usage(text)
+        self._guardar([text], [vetor])
+        return vetor, usage
+
+    async def async_get_embeddings_batch_and_usage(self, texts: list[str]):
+        if self.cache is None:
+            return await super().async_get_embeddings_batch_and_usage(texts)
+
+        vetores = self.cache.buscar(self.id, self.dimensions, texts)
+        usos = [None] * len(texts)
+        faltando = [i for i, vetor in enumerate(vetores) if vetor is None]
+        if faltando:
+            novos, novos_usos = await super().async_get_embeddings_batch_and_usage(
+                [texts[i] for i in faltando]
+            )
+            for i, vetor, uso in zip(faltando, novos, novos_usos):
+                vetores[i], usos[i] = vetor, uso
+            self._guardar([texts[i] for i in faltando], novos)
+        return vetores, usos
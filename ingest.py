@@ -26,17 +26,24 @@
 #   └── Thamires Hauch/
 # ============================================================
 
-import json
+import hashlib
+import time
 from pathlib import Path
 
-from openai import OpenAI
 from dotenv import load_dotenv
 
-from agno.knowledge.chunking.semantic import SemanticChunking
-from agno.knowledge.reader.pdf_reader import PDFReader
-
 # Importa os componentes configurados no agent.py
-from agent import knowledge_base, APOSTILAS_DIR, BASE_DIR
+from agent import (
+    knowledge_base, vector_db, manifesto, cache_classificacao, cache_embeddings, embedder,
+    indice_lsh, APOSTILAS_DIR, BASE_DIR,
+)
+from manifest import PENDENTE, STATUS_CONCLUIDOS, VAZIO
+from chunking import criar_chunking
+from classifier import TAMANHO_TRECHO, classificar_lote
+# Extracao de PDF fica num modulo leve (sem importar o agent.py)
+# para poder rodar em um pool de processos
+from pdf_extract import extrair_paginas_pdfs, extrair_trecho_pdf
+from readers import PaginasPDFReader
 
 load_dotenv()
 
@@ -48,6 +55,36 @@ load_dotenv()
 #
 # Retorna um dict com: tema, autor, palavras_chave
 # Isso complementa os metadados extraidos das pastas.
+#
+# As chamadas rodam em lote e em paralelo (ver classifier.py).
+
+PROMPT_CLASSIFICADOR = (
+    "Voce e um classificador de documentos. "
+    "Analise o trecho e retorne um JSON com:\n"
+    '- "tema": tema principal do documento (ex: "funil de vendas")\n'
+    '- "autor": autor se identificavel, senao "desconhecido"\n'
+    '- "palavras_chave": lista com 3-5 palavras-chave relevantes\n'
+    "Responda APENAS com o JSON, sem explicacoes."
+)
+
+INSTRUCAO_CLASSIFICADOR = "Classifique este documento:"
+
+
+def classificar_documentos(textos: list[str]) -> list[dict | None]:
+    """
+    Classifica varios documentos de uma vez (chamadas em paralelo).
+
+    Args:
+        textos: Conteudos extraidos (PDF ou TXT)
+
+    Returns:
+        Lista de dicts {tema, autor, palavras_chave} na mesma ordem
+        dos textos — None para os que falharam
+    """
+    return classificar_lote(
+        textos, PROMPT_CLASSIFICADOR, INSTRUCAO_CLASSIFICADOR, cache=cache_classificacao
+    )
+
 
 def classificar_documento(texto: str) -> dict:
     """
@@ -62,37 +99,10 @@ def classificar_documento(texto: str) -> dict:
     Returns:
         dict com chaves: tema, autor, palavras_chave
     """
-    # Cliente criado aqui (nao no topo) para evitar erro
-    # se a API key nao estiver configurada ainda
-    client = OpenAI()
-
-    # Pega so os primeiros 2000 caracteres — suficiente para o LLM
-    # entender do que se trata o documento, sem gastar tokens demais
-    trecho = texto[:2000]
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        response_format={"type": "json_object"},
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "Voce e um classificador de documentos. "
-                    "Analise o trecho e retorne um JSON com:\n"
-                    '- "tema": tema principal do documento (ex: "funil de vendas")\n'
-                    '- "autor": autor se identificavel, senao "desconhecido"\n'
-                    '- "palavras_chave": lista com 3-5 palavras-chave relevantes\n'
-                    "Responda APENAS com o JSON, sem explicacoes."
-                ),
-            },
-            {
-                "role": "user",
-                "content": f"Classifique este documento:\n\n{trecho}",
-            },
-        ],
-    )
-
-    return json.loads(response.choices[0].message.content)
+    resultado = classificar_documentos([texto])[0]
+    if resultado is None:
+        raise RuntimeError("Falha ao classificar o documento")
+    return resultado
 
 
 # ============================================================
@@ -143,114 +153,111 @@ def extrair_metadata_pasta(caminho_pdf: Path) -> dict:
     return metadata
 
 
-# ============================================================
-# EXTRAIR TEXTO DO PDF — Para enviar ao classificador LLM
-# ============================================================
-
-def extrair_texto_pdf(caminho_pdf: Path) -> str:
-    """
-    Extrai o texto bruto de um PDF usando pypdf.
-
-    Args:
-        caminho_pdf: Path do arquivo PDF
-
-    Returns:
-        Texto extraido do PDF
-    """
-    from pypdf import PdfReader
-
-    reader = PdfReader(str(caminho_pdf))
-    texto = ""
-    for pagina in reader.pages:
-        texto += pagina.extract_text() or ""
-    return texto
-
-
 # ============================================================
 # INGERIR APOSTILAS — Percorre a pasta e processa cada PDF
 # ============================================================
 
-def _ingerir_pdf(pdf_path: Path, i: int, total: int):
-    """Ingere um PDF no knowledge base."""
-    nome = pdf_path.name
-    print(f"[{i}/{total}] Processando PDF: {nome}")
-
-    metadata_pasta = extrair_metadata_pasta(pdf_path)
-    print(f"  Pasta -> {metadata_pasta}")
-
-    texto = extrair_texto_pdf(pdf_path)
-
-    if not texto.strip():
-        print(f"  AVISO: PDF sem texto extraivel (pode ser escaneado)")
-        metadata_llm = {"tema": "nao identificado", "autor": "desconhecido", "palavras_chave": []}
-    else:
-        print(f"  Classificando com LLM...")
-        metadata_llm = classificar_documento(texto)
-        print(f"  LLM -> tema: {metadata_llm.get('tema')}, autor: {metadata_llm.get('autor')}")
-
-    metadata_final = {
+def _montar_metadata(caminho: Path, metadata_llm: dict) -> dict:
+    """Junta metadados da pasta + classificacao do LLM."""
+    return {
         "tipo": "apostila",
-        **metadata_pasta,
+        **extrair_metadata_pasta(caminho),
         "tema": metadata_llm.get("tema", ""),
         "autor": metadata_llm.get("autor", "desconhecido"),
         "palavras_chave": ", ".join(metadata_llm.get("palavras_chave", [])),
-        "arquivo": nome,
+        "arquivo": caminho.name,
     }
 
-    print(f"  Adicionando ao ChromaDB...")
+
+def _quase_duplicata(caminho: Path, nome: str, texto: str, metadata_final: dict) -> bool:
+    """
+    O documento e quase igual a outro ja ingerido (dedup.IndiceLSH)?
+    Se for, nao entra no ChromaDB e fica como VAZIO no manifesto
+    (o representante fica no indice: python dedup.py --grupos).
+
+    Args:
+        nome: Nome do documento no ChromaDB (o mesmo dos chunks)
+    """
+    achado = indice_lsh.verificar_documento(nome, texto)
+    if not achado:
+        return False
+    representante, similaridade = achado
+    print(f"  Quase duplicata de {representante} ({similaridade:.0%}) — nao indexado\n")
+    # Chunks de uma ingestao anterior, antes do indice existir
+    vector_db.delete_by_name(nome)
+    manifesto.registrar(caminho, metadata_final, status=VAZIO, nome=nome)
+    return True
+
+
+def _ingerir_pdf(pdf_path: Path, i: int, total: int, metadata_final: dict, paginas: list[str]):
+    """
+    Ingere um PDF (ja classificado) no knowledge base.
+
+    Usa as paginas ja extraidas — o PDF nao e decodificado de novo.
+    O `path` continua sendo passado para manter o mesmo content_hash.
+    """
+    print(f"[{i}/{total}] Adicionando PDF ao ChromaDB: {pdf_path.name}")
+    # O agno nomeia os chunks de add_content(path=...) com o nome do arquivo
+    if _quase_duplicata(pdf_path, pdf_path.name, "\n".join(paginas), metadata_final):
+        return
     knowledge_base.add_content(
         path=str(pdf_path),
-        reader=PDFReader(chunking_strategy=SemanticChunking()),
+        reader=PaginasPDFReader(paginas, chunking_strategy=criar_chunking(embedder)),
         metadata=metadata_final,
         skip_if_exists=True,
     )
+    manifesto.registrar(pdf_path, metadata_final, nome=pdf_path.name)
     print(f"  OK!\n")
 
 
-def _ingerir_txt(txt_path: Path, i: int, total: int):
-    """Ingere um TXT no knowledge base."""
-    nome = txt_path.name
-    print(f"[{i}/{total}] Processando TXT: {nome}")
-
-    metadata_pasta = extrair_metadata_pasta(txt_path)
-    print(f"  Pasta -> {metadata_pasta}")
-
-    texto = txt_path.read_text(encoding="utf-8")
-
-    if not texto.strip():
-        print(f"  AVISO: TXT vazio — pulando")
+def _ingerir_txt(txt_path: Path, i: int, total: int, metadata_final: dict, texto: str):
+    """Ingere um TXT (ja classificado) no knowledge base."""
+    print(f"[{i}/{total}] Adicionando TXT ao ChromaDB: {txt_path.name}")
+    nome = f"apostila-{txt_path.stem}"
+    if _quase_duplicata(txt_path, nome, texto, metadata_final):
         return
-
-    print(f"  Classificando com LLM...")
-    metadata_llm = classificar_documento(texto)
-    print(f"  LLM -> tema: {metadata_llm.get('tema')}, autor: {metadata_llm.get('autor')}")
-
-    metadata_final = {
-        "tipo": "apostila",
-        **metadata_pasta,
-        "tema": metadata_llm.get("tema", ""),
-        "autor": metadata_llm.get("autor", "desconhecido"),
-        "palavras_chave": ", ".join(metadata_llm.get("palavras_chave", [])),
-        "arquivo": nome,
-    }
-
-    print(f"  Adicionando ao ChromaDB...")
     knowledge_base.add_content(
         text_content=texto,
-        name=f"apostila-{txt_path.stem}",
+        name=nome,
         metadata=metadata_final,
         skip_if_exists=True,
     )
+    manifesto.registrar(txt_path, metadata_final, nome=nome)
     print(f"  OK!\n")
 
 
-def ingerir_apostilas():
+def _ja_no_chromadb(caminho: Path) -> bool:
+    """
+    O arquivo ja esta na colecao? Mesmo hash que o add_content(path=...)
+    usa no skip_if_exists — sha256 do caminho.
+    """
+    content_hash = hashlib.sha256(str(caminho).encode()).hexdigest()
+    return vector_db.content_hash_exists(content_hash)
+
+
+def ingerir_apostilas(workers: int | None = None):
     """
     Percorre todos os PDFs e TXTs em apostilas/ (incluindo subpastas),
     extrai metadados (pastas + LLM) e adiciona ao knowledge base.
+
+    Etapas:
+    1. Manifesto — pula os arquivos que nao mudaram
+    2. Classificacao — so o trecho inicial de cada PDF novo e lido
+       (para na pagina que completa 2000 caracteres) e tudo vai em
+       um lote para o LLM (classifier.py)
+    3. Extracao completa — so dos PDFs que ainda nao estao no
+       ChromaDB, em paralelo, UM parse por PDF (as paginas vao
+       direto para o chunker)
+    4. Ingestao — add_content na ordem dos arquivos; quase-duplicatas
+       de um documento ja ingerido (dedup.IndiceLSH) ficam de fora
+
+    Args:
+        workers: Processos para extrair PDFs (padrao: INGEST_WORKERS
+            ou min(4, CPUs))
     """
-    pdfs = list(APOSTILAS_DIR.rglob("*.pdf"))
-    txts = list(APOSTILAS_DIR.rglob("*.txt"))
+    # Ordenados: logs e ordem de ingestao iguais em toda maquina
+    pdfs = sorted(APOSTILAS_DIR.rglob("*.pdf"))
+    txts = sorted(APOSTILAS_DIR.rglob("*.txt"))
     arquivos = pdfs + txts
 
     if not arquivos:
@@ -259,13 +266,120 @@ def ingerir_apostilas():
         return
 
     print(f"Encontrados {len(pdfs)} PDFs e {len(txts)} TXTs para processar\n")
+    cache_classificacao.zerar_contadores()
+    cache_embeddings.zerar_contadores()
+    vector_db.estatisticas.zerar()
+    indice_lsh.zerar_contadores()
+
+    # ---- 1. Manifesto: o que mudou desde a ultima ingestao ----
+    registros = {path: manifesto.consultar(path) for path in arquivos}
+    pendentes = [
+        path for path in arquivos
+        if not (registros[path] and registros[path]["status"] in STATUS_CONCLUIDOS)
+    ]
+    print(f"{len(arquivos) - len(pendentes)} arquivos sem alteracoes (manifesto)")
+
+    if not pendentes:
+        print(cache_classificacao.resumo())
+        print(cache_embeddings.resumo())
+        print("Ingestao de apostilas concluida!")
+        return
+
+    # ---- 2. Classificacao em lote (so o trecho inicial) ----
+    metadatas = {}
+    textos_txt = {}
+    a_classificar = []
+    falhas = 0
+    inicio = time.perf_counter()
+    for path in pendentes:
+        if path.suffix.lower() != ".pdf":
+            textos_txt[path] = path.read_text(encoding="utf-8")
+
+        if registros[path]:
+            # Ja classificado antes (ex: ChromaDB recriado) — reaproveita
+            metadatas[path] = registros[path]["metadata"]
+            continue
 
-    for i, path in enumerate(arquivos, 1):
         if path.suffix.lower() == ".pdf":
-            _ingerir_pdf(path, i, len(arquivos))
+            try:
+                texto, lidas = extrair_trecho_pdf(path, TAMANHO_TRECHO)
+            except Exception as e:
+                print(f"  {path.name}: ERRO ao ler — {type(e).__name__}: {e}")
+                falhas += 1
+                continue
+            print(f"  {path.name}: trecho de {lidas} pagina(s)")
+            if not texto.strip():
+                print(f"AVISO: {path.name} sem texto extraivel (pode ser escaneado)")
+                metadatas[path] = _montar_metadata(
+                    path,
+                    {"tema": "nao identificado", "autor": "desconhecido", "palavras_chave": []},
+                )
+                continue
         else:
-            _ingerir_txt(path, i, len(arquivos))
+            texto = textos_txt[path]
+            if not texto.strip():
+                print(f"AVISO: {path.name} vazio — pulando")
+                manifesto.registrar(path, status=VAZIO)
+                continue
+
+        a_classificar.append((path, texto))
+
+    if a_classificar:
+        print(f"Classificando {len(a_classificar)} documentos com LLM...")
+        resultados = classificar_documentos([texto for _, texto in a_classificar])
+        for (path, _), metadata_llm in zip(a_classificar, resultados):
+            if metadata_llm is None:
+                falhas += 1
+                continue
+            print(f"  {path.name} -> tema: {metadata_llm.get('tema')}, autor: {metadata_llm.get('autor')}")
+            metadatas[path] = _montar_metadata(path, metadata_llm)
+            # Grava a classificacao antes de ingerir: se o add_content
+            # falhar, a proxima rodada nao paga o LLM de novo
+            manifesto.registrar(path, metadatas[path], status=PENDENTE)
+    print(f"Classificacao concluida em {time.perf_counter() - inicio:.2f}s\n")
+
+    # ---- 3. Extracao completa: so o que vai entrar no ChromaDB ----
+    a_extrair = []
+    for path in pendentes:
+        if path.suffix.lower() != ".pdf" or path not in metadatas:
+            continue
+        if _ja_no_chromadb(path):
+            # O add_content pularia mesmo — nem decodifica o PDF
+            print(f"  {path.name}: ja esta no ChromaDB — so atualiza o manifesto")
+            manifesto.registrar(path, metadatas[path], nome=path.name)
+            del metadatas[path]
+            continue
+        a_extrair.append(path)
+
+    paginas_pdf = {}
+    if a_extrair:
+        print(f"Extraindo texto completo de {len(a_extrair)} PDFs em paralelo...")
+        inicio = time.perf_counter()
+        for pdf, paginas, segundos, erro in extrair_paginas_pdfs(a_extrair, workers=workers):
+            if erro:
+                print(f"  {pdf.name}: ERRO ({segundos:.2f}s) — {erro}")
+                falhas += 1
+                del metadatas[pdf]
+                continue
+            print(f"  {pdf.name}: {len(paginas)} paginas em {segundos:.2f}s")
+            paginas_pdf[pdf] = paginas
+        print(f"Extracao concluida em {time.perf_counter() - inicio:.2f}s\n")
+
+    # ---- 4. Ingestao no ChromaDB, na ordem dos arquivos ----
+    a_ingerir = [path for path in pendentes if path in metadatas]
+    for i, path in enumerate(a_ingerir, 1):
+        if path.suffix.lower() == ".pdf":
+            _ingerir_pdf(path, i, len(a_ingerir), metadatas[path], paginas_pdf[path])
+        else:
+            _ingerir_txt(path, i, len(a_ingerir), metadatas[path], textos_txt[path])
 
+    if falhas:
+        print(f"{falhas} arquivos com erro — serao tentados de novo na proxima execucao")
+
+    print(cache_classificacao.resumo())
+    print(cache_embeddings.resumo())
+    print(vector_db.estatisticas.resumo())
+    print(indice_lsh.resumo())
     print("Ingestao de apostilas concluida!")
 
 
@@ -307,6 +421,10 @@ def ingerir_transcricoes():
 
         print(f"[{i}/{len(txts)}] Processando: {txt_path.name} (autor: {autor})")
 
+        if manifesto.concluido(txt_path):
+            print(f"  Sem alteracoes desde a ultima ingestao — pulando\n")
+            continue
+
         metadata = {
             "tipo": "transcricao",
             "autor": autor,
@@ -318,6 +436,7 @@ def ingerir_transcricoes():
             metadata=metadata,
             skip_if_exists=True,
         )
+        manifesto.registrar(txt_path, metadata, nome=txt_path.name)
 
         print(f"  OK!\n")
 
@@ -0,0 +1,268 @@
+# ============================================================
+# manifest.py — Manifesto de Ingestao (o que ja foi processado)
+# ============================================================
+# Guarda, para cada arquivo fonte (PDF, TXT, JSON de transcricao
+# ou do YouTube), o hash do conteudo, o tamanho, o mtime, os
+# metadados de classificacao e o status da ingestao.
+#
+# Consultado ANTES de qualquer parse ou chamada a OpenAI: se o
+# arquivo nao mudou desde a ultima ingestao, o pipeline pula
+# direto. Um restart "quente" nao le PDF nem chama o GPT.
+#
+# Cada registro guarda tambem o nome do documento no ChromaDB: quando
+# o representante de uma quase-duplicata sai do ChromaDB, as copias
+# voltam para "pendente" por esse nome (reabrir).
+#
+# O manifesto fica vinculado a colecao do ChromaDB. Se a colecao
+# for recriada (ex: pasta data/chromadb apagada), todos os
+# registros voltam para "pendente" — os metadados continuam
+# salvos, entao a reindexacao nao precisa reclassificar nada.
+#
+# Saida:
+#   data/manifesto.db — SQLite com uma linha por arquivo
+# ============================================================
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+# Status possiveis de um arquivo no manifesto
+INGERIDO = "ingerido"   # Ja esta no ChromaDB
+PENDENTE = "pendente"   # Metadados salvos, mas precisa (re)ingerir
+VAZIO = "vazio"         # Arquivo sem texto — nada a ingerir
+
+# Status que permitem pular o arquivo por completo
+STATUS_CONCLUIDOS = (INGERIDO, VAZIO)
+
+
+def hash_arquivo(caminho: Path) -> str:
+    """Calcula o sha256 do arquivo lendo em blocos de 1MB."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class Manifesto:
+    """
+    Registro persistente dos arquivos ja ingeridos.
+
+    A chave e o caminho do arquivo. Para decidir se o arquivo mudou,
+    compara primeiro tamanho + mtime (sem ler o arquivo). So quando
+    o mtime muda (ex: git checkout) recalcula o hash do conteudo.
+
+    Args:
+        db_path: Caminho do arquivo SQLite
+        colecao: Funcao que retorna o ID da colecao do ChromaDB.
+            Chamada uma vez, na primeira consulta.
+    """
+
+    def __init__(self, db_path: Path, colecao: Callable[[], str] | None = None):
+        self.db_path = Path(db_path)
+        self._colecao = colecao
+        self._vinculado = False
+        self._lock = threading.Lock()
+
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fontes (
+                    caminho TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    metadata TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    atualizado_em REAL NOT NULL
+                )
+                """
+            )
+            # Manifestos criados antes da coluna nome
+            colunas = {row[1] for row in conn.execute("PRAGMA table_info(fontes)")}
+            if "nome" not in colunas:
+                conn.execute("ALTER TABLE fontes ADD COLUMN nome TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fontes_nome ON fontes (nome)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS config (chave TEXT PRIMARY KEY, valor TEXT)"
+            )
+
+    @contextmanager
+    def _conectar(self):
+        # Uma conexao por operacao — seguro entre threads e entre
+        # os workers do uvicorn (cada um e um processo separado)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _vincular_colecao(self):
+        """Invalida o manifesto se a colecao do ChromaDB mudou."""
+        with self._lock:
+            if self._vinculado:
+                return
+            self._vinculado = True
+            if self._colecao is None:
+                return
+
+            try:
+                atual = self._colecao()
+            except Exception as e:
+                print(f"  AVISO: nao foi possivel identificar a colecao ({e})")
+                return
+
+            with self._conectar() as conn:
+                row = conn.execute(
+                    "SELECT valor FROM config WHERE chave = 'colecao'"
+                ).fetchone()
+                if row and row[0] == atual:
+                    return
+                if row:
+                    print("  Colecao do ChromaDB mudou — manifesto marcado como pendente")
+                    conn.execute(
+                        "UPDATE fontes SET status = ? WHERE status = ?",
+                        (PENDENTE, INGERIDO),
+                    )
+                conn.execute(
+                    "INSERT OR REPLACE INTO config (chave, valor) VALUES ('colecao', ?)",
+                    (atual,),
+                )
+
+    @staticmethod
+    def _chave(caminho: Path) -> str:
+        return Path(caminho).resolve().as_posix()
+
+    def consultar(self, caminho: Path) -> dict | None:
+        """
+        Retorna o registro do arquivo se ele NAO mudou desde o registro.
+
+        Returns:
+            dict com sha256, metadata e status — ou None se o arquivo
+            e novo, mudou, ou nao existe mais
+        """
+        self._vincular_colecao()
+        caminho = Path(caminho)
+
+        with self._conectar() as conn:
+            row = conn.execute(
+                "SELECT sha256, tamanho, mtime_ns, metadata, status "
+                "FROM fontes WHERE caminho = ?",
+                (self._chave(caminho),),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        sha256, tamanho, mtime_ns, metadata, status = row
+        try:
+            stat = caminho.stat()
+        except FileNotFoundError:
+            return None
+
+        if stat.st_size != tamanho:
+            return None
+
+        if stat.st_mtime_ns != mtime_ns:
+            # Mesmo tamanho mas mtime diferente — confirma pelo conteudo
+            if hash_arquivo(caminho) != sha256:
+                return None
+            with self._conectar() as conn:
+                conn.execute(
+                    "UPDATE fontes SET mtime_ns = ? WHERE caminho = ?",
+                    (stat.st_mtime_ns, self._chave(caminho)),
+                )
+
+        return {
+            "sha256": sha256,
+            "metadata": json.loads(metadata),
+            "status": status,
+        }
+
+    def concluido(self, caminho: Path) -> bool:
+        """True se o arquivo nao mudou e ja foi ingerido (ou e vazio)."""
+        registro = self.consultar(caminho)
+        return registro is not None and registro["status"] in STATUS_CONCLUIDOS
+
+    def registrar(
+        self,
+        caminho: Path,
+        metadata: dict | None = None,
+        status: str = INGERIDO,
+        sha256: str | None = None,
+        nome: str | None = None,
+    ):
+        """
+        Grava (ou atualiza) o registro de um arquivo.
+
+        Args:
+            caminho: Arquivo fonte
+            metadata: Metadados de classificacao usados na ingestao
+            status: INGERIDO, PENDENTE ou VAZIO
+            sha256: Hash ja calculado (evita reler o arquivo)
+            nome: Nome do documento no ChromaDB (se omitido, fica o
+                que ja estava registrado)
+        """
+        self._vincular_colecao()
+        caminho = Path(caminho)
+        stat = caminho.stat()
+        sha256 = sha256 or hash_arquivo(caminho)
+
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                INSERT INTO fontes
+                    (caminho, sha256, tamanho, mtime_ns, metadata, status, atualizado_em, nome)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(caminho) DO UPDATE SET
+                    sha256 = excluded.sha256,
+                    tamanho = excluded.tamanho,
+                    mtime_ns = excluded.mtime_ns,
+                    metadata = excluded.metadata,
+                    status = excluded.status,
+                    atualizado_em = excluded.atualizado_em,
+                    nome = COALESCE(excluded.nome, fontes.nome)
+                """,
+                (
+                    self._chave(caminho),
+                    sha256,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    json.dumps(metadata or {}, ensure_ascii=False),
+                    status,
+                    time.time(),
+                    nome,
+                ),
+            )
+
+    def reabrir(self, nomes: list[str]) -> int:
+        """
+        Volta para PENDENTE os arquivos desses documentos do ChromaDB
+        (ex: copias cujo representante saiu — dedup.IndiceLSH), para a
+        proxima rodada ingerir de novo.
+
+        Returns:
+            Quantos registros voltaram
+        """
+        if not nomes:
+            return 0
+        with self._conectar() as conn:
+            cursor = conn.execute(
+                f"UPDATE fontes SET status = ?, atualizado_em = ? "
+                f"WHERE nome IN ({','.join('?' * len(nomes))})",
+                (PENDENTE, time.time(), *nomes),
+            )
+        return cursor.rowcount
+
+    def remover(self, caminho: Path):
+        """Remove o registro de um arquivo (ex: arquivo apagado)."""
+        with self._conectar() as conn:
+            conn.execute(
+                "DELETE FROM fontes WHERE caminho = ?", (self._chave(caminho),)
+            )
@@ -0,0 +1,162 @@
+# ============================================================
+# pdf_extract.py — Extracao de texto de PDFs (em paralelo)
+# ============================================================
+# Extrair texto com pypdf e trabalho puro de CPU — os PDFs dos
+# cursos (varios MB cada) dominam o tempo da ingestao.
+#
+# O classificador so precisa do trecho inicial: iterar_paginas_pdf
+# decodifica pagina a pagina e extrair_trecho_pdf para assim que
+# junta caracteres suficientes (uma ou duas paginas por arquivo).
+#
+# A extracao completa (extrair_paginas_pdfs) fica para o chunking,
+# so dos PDFs que realmente vao entrar no ChromaDB. As paginas vao
+# direto para o readers.PaginasPDFReader — o PDFReader nao reabre
+# o arquivo.
+#
+# Este modulo NAO importa o agent.py de proposito: os workers do
+# ProcessPoolExecutor importam so o pypdf, sem subir ChromaDB,
+# embedder, AgentOS etc. em cada processo.
+#
+# Uso:
+#   from pdf_extract import extrair_paginas_pdfs
+#   for caminho, paginas, segundos, erro in extrair_paginas_pdfs(pdfs, workers=4):
+#       ...
+# ============================================================
+
+import multiprocessing
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Numero padrao de workers (sobrescreva com INGEST_WORKERS=N)
+WORKERS_PADRAO = int(os.getenv("INGEST_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+
+def iterar_paginas_pdf(caminho_pdf: Path) -> Iterator[str]:
+    """
+    Gera o texto de cada pagina de um PDF, sob demanda.
+
+    O pypdf so decodifica a pagina quando o gerador chega nela —
+    quem parar de iterar cedo nao paga pelas paginas seguintes.
+
+    Args:
+        caminho_pdf: Path do arquivo PDF
+
+    Yields:
+        Texto de cada pagina (string vazia se a pagina nao tem texto)
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(caminho_pdf))
+    for pagina in reader.pages:
+        yield pagina.extract_text() or ""
+
+
+def extrair_paginas_pdf(caminho_pdf: Path) -> list[str]:
+    """
+    Extrai o texto de todas as paginas de um PDF usando pypdf.
+
+    Args:
+        caminho_pdf: Path do arquivo PDF
+
+    Returns:
+        Lista com o texto de cada pagina (string vazia se a pagina nao tem texto)
+    """
+    return list(iterar_paginas_pdf(caminho_pdf))
+
+
+def extrair_trecho_pdf(caminho_pdf: Path, limite: int) -> tuple[str, int]:
+    """
+    Extrai so o comeco do texto de um PDF, parando na primeira pagina
+    que completa `limite` caracteres.
+
+    O trecho e exatamente juntar_paginas(todas)[:limite] — o mesmo que
+    o classificador recortaria do texto completo (e a mesma chave no
+    cache de classificacao).
+
+    Args:
+        caminho_pdf: Path do arquivo PDF
+        limite: Quantidade de caracteres necessaria
+
+    Returns:
+        (trecho, paginas_lidas) — trecho vazio significa que o PDF
+        inteiro nao tem texto extraivel
+    """
+    paginas = []
+    tamanho = 0
+    for texto in iterar_paginas_pdf(caminho_pdf):
+        paginas.append(texto)
+        tamanho += len(texto)
+        if tamanho >= limite:
+            break
+    return juntar_paginas(paginas)[:limite], len(paginas)
+
+
+def extrair_texto_pdf(caminho_pdf: Path) -> str:
+    """
+    Extrai o texto bruto de um PDF usando pypdf.
+
+    Args:
+        caminho_pdf: Path do arquivo PDF
+
+    Returns:
+        Texto extraido do PDF
+    """
+    return juntar_paginas(extrair_paginas_pdf(caminho_pdf))
+
+
+def juntar_paginas(paginas: list[str]) -> str:
+    """Texto corrido do documento (mesmo formato de extrair_texto_pdf)."""
+    return "".join(paginas)
+
+
+def _extrair_com_tempo(caminho_pdf: Path) -> tuple[list[str], float, str | None]:
+    """
+    Roda no worker: extrai as paginas e mede quanto tempo levou.
+    Erros viram string para um PDF corrompido nao derrubar o lote todo.
+    """
+    inicio = time.perf_counter()
+    try:
+        paginas, erro = extrair_paginas_pdf(caminho_pdf), None
+    except Exception as e:
+        paginas, erro = [], f"{type(e).__name__}: {e}"
+    return paginas, time.perf_counter() - inicio, erro
+
+
+def extrair_paginas_pdfs(
+    caminhos: list[Path],
+    workers: int | None = None,
+) -> list[tuple[Path, list[str], float, str | None]]:
+    """
+    Extrai as paginas de varios PDFs em paralelo (um processo por worker).
+
+    A ordem do resultado e SEMPRE a ordem de entrada, independente de
+    qual PDF terminou primeiro — logs e metadados ficam deterministicos.
+
+    Args:
+        caminhos: Lista de PDFs
+        workers: Numero de processos (padrao: WORKERS_PADRAO)
+
+    Returns:
+        Lista de (caminho, paginas, segundos, erro) na mesma ordem de
+        `caminhos` — erro e None quando a extracao deu certo
+    """
+    workers = workers or WORKERS_PADRAO
+
+    # 1 worker ou 1 arquivo: nao vale o custo de subir processos
+    if workers <= 1 or len(caminhos) <= 1:
+        return [(c, *_extrair_com_tempo(c)) for c in caminhos]
+
+    # "spawn" em vez de "fork": a ingestao roda numa thread do servidor,
+    # e fork com varias threads vivas pode travar o processo filho
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(caminhos)),
+        mp_context=contexto,
+    ) as pool:
+        # map() devolve os resultados na ordem de entrada
+        resultados = list(pool.map(_extrair_com_tempo, caminhos))
+
+    return [(c, *resultado) for c, resultado in zip(caminhos, resultados)]
@@ -9,8 +9,36 @@
 # tom, energia, linguajar, bordoes, estrutura, ritmo,
 # analogias, emocao, hooks e CTAs.
 #
+# Dois modos (PROFILE_MODE ou --modo):
+# - unico: todas as transcricoes num prompt so (o tamanho cresce
+#   com o catalogo do creator)
+# - mapreduce: notas de estilo por video, em paralelo e em cache
+#   pelo hash da transcricao (classificacoes.db); uma chamada final
+#   consolida as notas no perfil. Video novo so paga as notas dele.
+# - auto (padrao): unico enquanto as transcricoes cabem em
+#   PROFILE_TOKEN_BUDGET tokens, mapreduce depois disso
+#
+# Nenhum prompt passa de PROFILE_TOKEN_BUDGET: video maior e
+# dividido em partes, nota maior que meio orcamento e cortada e
+# notas demais sao juntadas em rodadas antes da consolidacao.
+# A excecao e o modo unico forcado (PROFILE_MODE=unico ou --modo
+# unico): ele manda todas as transcricoes mesmo passando do
+# orcamento (so avisa) — e o que o bench_perfis.py mede.
+#
+# O perfil guarda o hash das transcricoes de que foi feito
+# ("hash_transcricoes"). Sem --force, um perfil existente so e
+# atualizado se ha transcricao nova ou alterada: o perfil atual +
+# SO as novas vao num prompt de atualizacao, e so o documento
+# perfil-<autor> e reindexado.
+#
+# Os creators andam em paralelo (PROFILE_CONCURRENCY threads): cada
+# um so grava o JSON (atomico); o ChromaDB e sincronizado no fim,
+# numa passada so, e sai uma tabela de tempo por creator.
+#
+# Comparacao de tempo e tokens: benchmarks/bench_perfis.py
+#
 # Uso:
-#   python profiles.py
+#   python profiles.py [--force] [--modo unico|mapreduce|auto]
 #
 # Saida:
 #   data/profiles/<autor>.json — perfil completo
@@ -18,12 +46,20 @@
 # ============================================================
 
 import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from openai import OpenAI
 from dotenv import load_dotenv
 
-from agent import knowledge_base, VIDEOS_DIR, DB_DIR
+from agent import knowledge_base, vector_db, cache_classificacao, VIDEOS_DIR, DB_DIR
+from classifier import UsoLLM, classificar_lote
+from embedding_batch import contar_tokens
+from sync_plan import adicionar_texto, aplicar, fonte_texto, hash_texto, planejar
 
 load_dotenv()
 
@@ -33,16 +69,36 @@ load_dotenv()
 PROFILES_DIR = DB_DIR / "profiles"
 PROFILES_DIR.mkdir(parents=True, exist_ok=True)
 
+MODELO_PERFIL = "gpt-4.1-mini"
+
+MODOS = ("auto", "unico", "mapreduce")
+MODO_PADRAO = os.getenv("PROFILE_MODE", "auto")
+
+# Maximo de tokens de material (transcricoes ou notas) num prompt
+ORCAMENTO_TOKENS = int(os.getenv("PROFILE_TOKEN_BUDGET", "60000"))
+
+# Creators gerados ao mesmo tempo (cada um pode ter CLASSIFIER_CONCURRENCY
+# chamadas de notas em paralelo no modo mapreduce)
+CONCORRENCIA_PERFIS = int(os.getenv("PROFILE_CONCURRENCY", "4"))
+
+# Creators rodam em threads: uma linha de log por vez
+_trava_log = threading.Lock()
+
+# Campo do JSON do perfil: {video: sha256 da transcricao} usadas nele
+CAMPO_TRANSCRICOES = "hash_transcricoes"
+
 
 # ============================================================
 # PROMPT DE ANALISE — Extrai o DNA completo do creator
 # ============================================================
 
-PROMPT_ANALISE = """Voce e um especialista em analise de estilo de comunicacao. Sua missao e criar o PERFIL DE CLONAGEM completo de um creator a partir das transcricoes dos videos dele.
+CABECALHO_ANALISE = """Voce e um especialista em analise de estilo de comunicacao. Sua missao e criar o PERFIL DE CLONAGEM completo de um creator a partir das transcricoes dos videos dele.
 
-Analise TODAS as transcricoes abaixo e extraia um perfil DETALHADO e PRATICO que permita a qualquer pessoa escrever EXATAMENTE como esse creator fala.
+Analise TODAS as transcricoes abaixo e extraia um perfil DETALHADO e PRATICO que permita a qualquer pessoa escrever EXATAMENTE como esse creator fala."""
 
-## O QUE ANALISAR (10 pontos de clonagem)
+# Os 10 pontos de clonagem — usados na analise direta, nas notas por
+# video e na consolidacao (modo mapreduce)
+PONTOS_CLONAGEM = """## O QUE ANALISAR (10 pontos de clonagem)
 
 Para cada ponto, de:
 - Uma descricao clara do padrao
@@ -87,9 +143,10 @@ Qual o padrao de gancho que ele usa pra prender atencao?
 
 ### 10. ESTILO DE CTA (FECHAMENTO)
 Como ele encerra? Pede pra seguir? Faz convite? Deixa reflexao?
-Qual o padrao de chamada pra acao?
+Qual o padrao de chamada pra acao?"""
 
-## FORMATO DE SAIDA
+# Schema do perfil salvo em data/profiles/<autor>.json
+FORMATO_PERFIL = """## FORMATO DE SAIDA
 
 Retorne um JSON com esta estrutura exata:
 {
@@ -154,55 +211,324 @@ IMPORTANTE:
 - As regras devem ser PRATICAS: "Comece frases com...", "Use a expressao X quando...", "Nunca use Y..."
 - Responda APENAS com o JSON, sem explicacoes antes ou depois"""
 
+PROMPT_ANALISE = f"{CABECALHO_ANALISE}\n\n{PONTOS_CLONAGEM}\n\n{FORMATO_PERFIL}"
+
+
+# ============================================================
+# PROMPTS DO MAPREDUCE — Notas por video + consolidacao
+# ============================================================
+
+PROMPT_NOTAS = f"""Voce e um especialista em analise de estilo de comunicacao. Voce vai receber a transcricao de UM video de um creator — ou as notas de estilo ja extraidas de varios videos dele. Extraia NOTAS DE ESTILO que depois serao consolidadas no perfil de clonagem completo do creator.
+
+{PONTOS_CLONAGEM}
+
+## FORMATO DE SAIDA
+
+Retorne um JSON com uma chave para cada um dos 10 pontos:
+{{
+  "tom_de_voz": {{"observacoes": ["padrao observado"], "exemplos": ["trecho real"]}},
+  "energia": {{"observacoes": ["..."], "exemplos": ["..."]}},
+  "linguajar": {{"observacoes": ["..."], "girias_e_expressoes": ["..."], "exemplos": ["..."]}},
+  "bordoes": {{"observacoes": ["..."], "lista": ["bordao"], "exemplos": ["..."]}},
+  "estrutura": {{"observacoes": ["..."], "exemplos": ["..."]}},
+  "ritmo": {{"observacoes": ["..."], "exemplos": ["..."]}},
+  "analogias": {{"observacoes": ["..."], "exemplos": ["..."]}},
+  "emocao": {{"observacoes": ["..."], "exemplos": ["..."]}},
+  "hooks": {{"observacoes": ["..."], "exemplos": ["..."]}},
+  "cta": {{"observacoes": ["..."], "exemplos": ["..."]}}
+}}
+
+IMPORTANTE:
+- Exemplos sao trechos REAIS copiados do material, curtos (ate 2 frases)
+- No maximo 3 observacoes e 3 exemplos por ponto — fique com os mais marcantes
+- Se o material ja sao notas de varios videos, junte as repetidas e priorize o que aparece em mais videos
+- Ponto sem evidencia no material: listas vazias
+- Responda APENAS com o JSON, sem explicacoes antes ou depois"""
+
+INSTRUCAO_NOTAS = "Extraia as notas de estilo deste video:"
+INSTRUCAO_JUNTAR = "Junte estas notas de estilo de varios videos em uma so:"
+
+PROMPT_REDUCAO = f"""Voce e um especialista em analise de estilo de comunicacao. Sua missao e criar o PERFIL DE CLONAGEM completo de um creator a partir das NOTAS DE ESTILO extraidas de cada video dele (observacoes e trechos reais, uma entrada por video).
+
+Consolide as notas num perfil DETALHADO e PRATICO que permita a qualquer pessoa escrever EXATAMENTE como esse creator fala. Padroes que aparecem em varios videos pesam mais; os exemplos saem dos trechos das notas.
+
+{PONTOS_CLONAGEM}
+
+{FORMATO_PERFIL}"""
+
+
+# ============================================================
+# PROMPT DE ATUALIZACAO — Perfil atual + videos novos
+# ============================================================
+
+PROMPT_ATUALIZACAO = f"""Voce e um especialista em analise de estilo de comunicacao. Voce vai receber o PERFIL DE CLONAGEM atual de um creator (JSON) e material de videos NOVOS dele — as transcricoes ou as notas de estilo extraidas de cada video.
+
+Atualize o perfil com o que os videos novos mostram:
+- Mantenha o que continua valido — o perfil atual veio de muitos outros videos
+- Acrescente bordoes, girias, exemplos e regras novos que aparecem no material
+- Ajuste descricoes e regras so quando o material novo mostrar um padrao diferente
+- Mantenha no maximo 3 exemplos por ponto, trocando os mais fracos por trechos novos melhores
+
+{PONTOS_CLONAGEM}
+
+{FORMATO_PERFIL}
+
+Retorne o perfil COMPLETO (todos os pontos), nao so o que mudou."""
+
 
 # ============================================================
 # COLETAR TRANSCRICOES — Le todos os JSONs de um creator
 # ============================================================
 
-def coletar_transcricoes(autor_dir: Path) -> str:
+def _log(autor: str, mensagem: str):
+    """Linha de log de um creator, sem misturar com as das outras threads."""
+    with _trava_log:
+        print(f"  [{autor}] {mensagem}", flush=True)
+
+
+def listar_transcricoes(autor_dir: Path) -> list[tuple[str, str]]:
     """
-    Le todas as transcricoes JSON de um creator e junta em um texto so.
-    Separa cada video com marcadores para o GPT entender.
+    Le todas as transcricoes JSON de um creator.
+    Pula as marcadas como duplicata (campo "duplicata_de").
+
+    Returns:
+        Lista de (nome do video, transcricao), em ordem de nome
     """
-    textos = []
+    videos = []
     for json_path in sorted(autor_dir.glob("*.json")):
         dados = json.loads(json_path.read_text(encoding="utf-8"))
         texto = dados.get("transcricao", "")
-        if texto.strip():
-            textos.append(f"--- VIDEO: {json_path.stem} ---\n{texto}")
+        # Copias do mesmo video (dedup.py) entrariam duplicadas no prompt
+        if texto.strip() and not dados.get("duplicata_de"):
+            videos.append((json_path.stem, texto))
+    return videos
 
-    return "\n\n".join(textos)
+
+def juntar_transcricoes(videos: list[tuple[str, str]]) -> str:
+    return "\n\n".join(f"--- VIDEO: {nome} ---\n{texto}" for nome, texto in videos)
 
 
 # ============================================================
 # GERAR PERFIL — Envia transcricoes pro GPT e recebe o perfil
 # ============================================================
 
-def gerar_perfil(autor: str, transcricoes: str) -> dict:
-    """
-    Envia todas as transcricoes de um creator para o GPT
-    e recebe o perfil de clonagem completo em JSON.
-    """
+def _chamar_gpt(prompt_sistema: str, mensagem: str, uso: UsoLLM | None = None) -> dict:
     client = OpenAI()
 
     response = client.chat.completions.create(
-        model="gpt-4.1-mini",
+        model=MODELO_PERFIL,
         response_format={"type": "json_object"},
         messages=[
-            {"role": "system", "content": PROMPT_ANALISE},
-            {
-                "role": "user",
-                "content": (
-                    f"Crie o perfil de clonagem completo do creator: {autor}\n\n"
-                    f"Transcricoes:\n\n{transcricoes}"
-                ),
-            },
+            {"role": "system", "content": prompt_sistema},
+            {"role": "user", "content": mensagem},
         ],
     )
+    if uso:
+        uso.registrar(response.usage)
 
     return json.loads(response.choices[0].message.content)
 
 
+def gerar_perfil(autor: str, transcricoes: str, uso: UsoLLM | None = None) -> dict:
+    """
+    Envia todas as transcricoes de um creator para o GPT
+    e recebe o perfil de clonagem completo em JSON (modo unico).
+    """
+    return _chamar_gpt(
+        PROMPT_ANALISE,
+        f"Crie o perfil de clonagem completo do creator: {autor}\n\n"
+        f"Transcricoes:\n\n{transcricoes}",
+        uso,
+    )
+
+
+def _dividir(texto: str, partes: int) -> list[str]:
+    """Divide o texto em `partes` pedacos de tamanho parecido, sem cortar palavras."""
+    palavras = texto.split()
+    passo = math.ceil(len(palavras) / partes)
+    return [" ".join(palavras[i:i + passo]) for i in range(0, len(palavras), passo)]
+
+
+def _notas_json(notas: list[dict]) -> str:
+    return json.dumps(notas, ensure_ascii=False, separators=(",", ":"))
+
+
+def extrair_notas(autor: str, videos: list[tuple[str, str]], uso: UsoLLM | None = None) -> list[dict]:
+    """
+    MAP: notas de estilo de cada video, em paralelo (motor do
+    classifier.py) e em cache pelo hash da transcricao.
+
+    Video acima de ORCAMENTO_TOKENS vira partes ("nome (parte 1/3)").
+
+    Returns:
+        Lista de notas, cada uma com a chave "video"
+    """
+    nomes, textos = [], []
+    for nome, texto in videos:
+        partes = math.ceil(contar_tokens(texto) / ORCAMENTO_TOKENS)
+        if partes <= 1:
+            nomes.append(nome)
+            textos.append(texto)
+            continue
+        for numero, pedaco in enumerate(_dividir(texto, partes), 1):
+            nomes.append(f"{nome} (parte {numero}/{partes})")
+            textos.append(pedaco)
+
+    resultados = classificar_lote(
+        textos, PROMPT_NOTAS, INSTRUCAO_NOTAS,
+        cache=cache_classificacao, modelo=MODELO_PERFIL, tamanho_trecho=None, uso=uso,
+    )
+
+    notas = []
+    for nome, resultado in zip(nomes, resultados):
+        if resultado is None:
+            _log(autor, f"AVISO: sem notas para {nome} — fica fora do perfil")
+            continue
+        notas.append({"video": nome, **resultado})
+    return notas
+
+
+def _aparar_nota(autor: str, nota: dict, limite: int) -> dict:
+    """
+    Corta uma nota cujo JSON passa de `limite` tokens: o conteudo
+    (tudo menos "video") vira texto e perde o final ate caber.
+    """
+    tokens = contar_tokens(_notas_json([nota]))
+    if tokens <= limite:
+        return nota
+    _log(autor, f"AVISO: notas de {nota['video']} com {tokens} tokens — cortando para {limite}")
+    resto = _notas_json([{k: v for k, v in nota.items() if k != "video"}])
+    aparada = nota
+    while tokens > limite and resto:
+        resto = resto[:int(len(resto) * limite / tokens * 0.9)]
+        aparada = {"video": nota["video"], "notas": f"{resto} [cortado]"}
+        tokens = contar_tokens(_notas_json([aparada]))
+    return aparada
+
+
+def _caber_no_orcamento(autor: str, notas: list[dict], uso: UsoLLM | None = None) -> list[dict]:
+    """
+    Junta as notas em rodadas ate o JSON delas caber em
+    ORCAMENTO_TOKENS: cada lote que cabe no orcamento vira uma nota so.
+
+    Nenhuma nota passa de meio orcamento (_aparar_nota): duas sempre
+    cabem num lote, entao toda rodada junta notas e o laco termina.
+    """
+    # Folga para os colchetes e a virgula entre duas notas
+    limite = ORCAMENTO_TOKENS // 2 - 8
+    notas = [_aparar_nota(autor, nota, limite) for nota in notas]
+    while len(notas) > 1 and contar_tokens(_notas_json(notas)) > ORCAMENTO_TOKENS:
+        lotes, atual = [], []
+        for nota in notas:
+            if atual and contar_tokens(_notas_json(atual + [nota])) > ORCAMENTO_TOKENS:
+                lotes.append(atual)
+                atual = []
+            atual.append(nota)
+        lotes.append(atual)
+        _log(autor, f"{len(notas)} notas passam do orcamento — juntando em {len(lotes)}")
+
+        juntar = [lote for lote in lotes if len(lote) > 1]
+        resultados = classificar_lote(
+            [_notas_json(lote) for lote in juntar], PROMPT_NOTAS, INSTRUCAO_JUNTAR,
+            cache=cache_classificacao, modelo=MODELO_PERFIL, tamanho_trecho=None, uso=uso,
+        )
+        if any(resultado is None for resultado in resultados):
+            raise RuntimeError("Falha ao juntar as notas de estilo")
+
+        juntadas = iter(resultados)
+        notas = [
+            _aparar_nota(autor, {"video": ", ".join(n["video"] for n in lote), **next(juntadas)}, limite)
+            if len(lote) > 1 else lote[0]
+            for lote in lotes
+        ]
+    return notas
+
+
+def gerar_perfil_mapreduce(autor: str, videos: list[tuple[str, str]], uso: UsoLLM | None = None) -> dict:
+    """
+    Perfil em duas etapas: notas por video (extrair_notas) e uma
+    chamada que consolida as notas no schema do perfil.
+    """
+    notas = extrair_notas(autor, videos, uso)
+    if not notas:
+        raise RuntimeError(f"Nenhuma nota de estilo extraida para {autor}")
+    notas = _caber_no_orcamento(autor, notas, uso)
+
+    return _chamar_gpt(
+        PROMPT_REDUCAO,
+        f"Crie o perfil de clonagem completo do creator: {autor}\n\n"
+        f"Notas de estilo por video:\n\n{_notas_json(notas)}",
+        uso,
+    )
+
+
+def atualizar_perfil(
+    autor: str, perfil: dict, novos: list[tuple[str, str]], uso: UsoLLM | None = None,
+) -> dict:
+    """
+    Atualiza um perfil existente so com as transcricoes novas (uma
+    chamada). Se elas passam de ORCAMENTO_TOKENS, vao as notas de
+    estilo de cada uma (extrair_notas, em cache) no lugar do texto.
+
+    Args:
+        perfil: Perfil atual (sem o CAMPO_TRANSCRICOES)
+        novos: Videos que o perfil ainda nao viu (nome, transcricao)
+    """
+    material = juntar_transcricoes(novos)
+    rotulo = "Transcricoes dos videos novos"
+    if contar_tokens(material) > ORCAMENTO_TOKENS:
+        material = _notas_json(_caber_no_orcamento(autor, extrair_notas(autor, novos, uso), uso))
+        rotulo = "Notas de estilo dos videos novos"
+
+    return _chamar_gpt(
+        PROMPT_ATUALIZACAO,
+        f"Atualize o perfil de clonagem do creator: {autor}\n\n"
+        f"Perfil atual:\n\n{json.dumps(perfil, ensure_ascii=False)}\n\n"
+        f"{rotulo}:\n\n{material}",
+        uso,
+    )
+
+
+def escolher_modo(videos: list[tuple[str, str]], modo: str | None = None) -> str:
+    """
+    "unico" ou "mapreduce". No "auto", unico enquanto todas as
+    transcricoes juntas cabem em ORCAMENTO_TOKENS.
+    """
+    modo = (modo or MODO_PADRAO).lower()
+    if modo not in MODOS:
+        raise ValueError(f"PROFILE_MODE invalido: {modo!r} (use um de {', '.join(MODOS)})")
+    if modo != "auto":
+        return modo
+    tokens = contar_tokens(juntar_transcricoes(videos))
+    return "unico" if tokens <= ORCAMENTO_TOKENS else "mapreduce"
+
+
+def gerar_perfil_creator(
+    autor: str, videos: list[tuple[str, str]], modo: str | None = None, uso: UsoLLM | None = None,
+) -> dict:
+    """
+    Gera o perfil no modo escolhido (ver escolher_modo).
+
+    Args:
+        autor: Nome do creator
+        videos: Retorno de listar_transcricoes()
+        modo: "auto", "unico" ou "mapreduce" (padrao: PROFILE_MODE)
+        uso: Soma chamadas e tokens gastos
+    """
+    modo = escolher_modo(videos, modo)
+    _log(autor, f"Modo: {modo}")
+    if modo == "unico":
+        transcricoes = juntar_transcricoes(videos)
+        if contar_tokens(transcricoes) > ORCAMENTO_TOKENS:
+            # So com --modo unico forcado: vai inteiro, de proposito
+            _log(
+                autor,
+                f"AVISO: modo unico forcado — o prompt passa de {ORCAMENTO_TOKENS} tokens (PROFILE_TOKEN_BUDGET)",
+            )
+        return gerar_perfil(autor, transcricoes, uso)
+    return gerar_perfil_mapreduce(autor, videos, uso)
+
+
 # ============================================================
 # FORMATAR PERFIL PARA TEXTO — Converte JSON em texto legivel
 # para embeddings melhores no ChromaDB
@@ -277,74 +603,166 @@ def perfil_para_texto(perfil: dict) -> str:
 # SALVAR E INGERIR — Salva JSON + texto no ChromaDB
 # ============================================================
 
-def salvar_perfil(autor: str, perfil: dict, force: bool = False) -> bool:
-    """
-    Salva o perfil em JSON e ingere no ChromaDB.
+def hashes_transcricoes(videos: list[tuple[str, str]]) -> dict[str, str]:
+    """Registro do CAMPO_TRANSCRICOES: {video: sha256 da transcricao}."""
+    return {nome: hash_texto(texto) for nome, texto in videos}
 
-    Args:
-        autor: Nome do creator
-        perfil: Dict com o perfil completo
-        force: Se True, regenera mesmo se ja existe
 
-    Returns:
-        True se salvou/ingeriu, False se ja existia
+def gravar_perfil_json(autor: str, perfil: dict) -> Path:
+    """
+    Grava o JSON do perfil de forma atomica: escreve num .tmp e
+    renomeia. Outro creator (ou o sincronizar_perfis) nunca le um
+    perfil pela metade.
     """
     json_path = PROFILES_DIR / f"{autor}.json"
+    temporario = json_path.with_name(json_path.name + ".tmp")
+    temporario.write_text(
+        json.dumps(perfil, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    os.replace(temporario, json_path)
+    return json_path
+
+
+def refrescar_perfil(autor: str, json_path: Path, videos: list[tuple[str, str]], uso: UsoLLM | None = None) -> bool:
+    """
+    Perfil existente: atualiza so com as transcricoes que ele ainda
+    nao viu (hash novo ou alterado). Perfil antigo, sem o registro
+    das transcricoes, adota as atuais como base (sem chamar o GPT).
+    So grava o JSON — o ChromaDB fica para o sincronizar_perfis.
 
-    if json_path.exists() and not force:
-        print(f"  Perfil ja existe. Use force=True para regenerar.")
-        # Garante que esta no ChromaDB
-        texto = perfil_para_texto(
-            json.loads(json_path.read_text(encoding="utf-8"))
+    Returns:
+        True se o perfil foi atualizado
+    """
+    perfil = json.loads(json_path.read_text(encoding="utf-8"))
+    registro = perfil.pop(CAMPO_TRANSCRICOES, None)
+    hashes = hashes_transcricoes(videos)
+
+    if registro is None:
+        _log(
+            autor,
+            f"Perfil sem registro das transcricoes — adotando as {len(videos)} "
+            f"atuais como base (para refazer com todas: --force)",
         )
+        gravar_perfil_json(autor, {**perfil, CAMPO_TRANSCRICOES: hashes})
+        return False
+
+    novos = [(nome, texto) for nome, texto in videos if registro.get(nome) != hashes[nome]]
+    if not novos:
+        if registro != hashes:
+            # So sairam videos: o registro acompanha, o perfil fica
+            gravar_perfil_json(autor, {**perfil, CAMPO_TRANSCRICOES: hashes})
+        _log(autor, "Perfil em dia — pulando")
+        return False
+
+    _log(autor, f"{len(novos)} transcricoes novas — atualizando o perfil...")
+    perfil = atualizar_perfil(autor, perfil, novos, uso)
+    perfil[CAMPO_TRANSCRICOES] = hashes
+    gravar_perfil_json(autor, perfil)
+    return True
+
+
+def sincronizar_perfis():
+    """
+    Deixa o ChromaDB igual aos perfis em disco (data/profiles/*.json):
+    uma leitura em massa da colecao e so o delta vira escrita (ver
+    sync_plan.py).
+    """
+    fontes = []
+    for json_path in sorted(PROFILES_DIR.glob("*.json")):
+        autor = json_path.stem
+        texto = perfil_para_texto(json.loads(json_path.read_text(encoding="utf-8")))
         metadata = {
             "tipo": "perfil",
             "autor": autor,
             "arquivo": json_path.name,
         }
-        knowledge_base.add_content(
-            text_content=texto,
-            name=f"perfil-{autor}",
-            metadata=metadata,
-            skip_if_exists=True,
-        )
-        return False
+        fontes.append(fonte_texto(f"perfil-{autor}", texto, metadata))
 
-    # Salva JSON
-    json_path.write_text(
-        json.dumps(perfil, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
-    print(f"  Salvo em: {json_path}")
-
-    # Converte para texto e ingere no ChromaDB
-    texto = perfil_para_texto(perfil)
-    metadata = {
-        "tipo": "perfil",
-        "autor": autor,
-        "arquivo": json_path.name,
-    }
-    knowledge_base.add_content(
-        text_content=texto,
-        name=f"perfil-{autor}",
-        metadata=metadata,
-        skip_if_exists=not force,
-    )
-    print(f"  Adicionado ao ChromaDB")
+    plano = planejar(vector_db, "perfil", fontes)
+    print(plano.resumo())
+    aplicar(plano, vector_db, lambda fonte: adicionar_texto(knowledge_base, fonte))
 
-    return True
+
+# ============================================================
+# CREATOR — Gera ou atualiza um perfil (numa thread do main)
+# ============================================================
+
+def processar_creator(autor_dir: Path, force: bool = False, modo: str | None = None) -> dict:
+    """
+    Gera (ou atualiza) o perfil de um creator. So grava o JSON — o
+    ChromaDB e sincronizado depois, de uma vez, pelo main().
+
+    Returns:
+        {autor, acao, modo, segundos, uso} — acao: gerado, atualizado,
+        em dia, sem transcricoes ou erro
+    """
+    autor = autor_dir.name
+    json_path = PROFILES_DIR / f"{autor}.json"
+    resultado = {"autor": autor, "acao": "em dia", "modo": "-", "uso": UsoLLM()}
+    inicio = time.perf_counter()
+
+    try:
+        videos = listar_transcricoes(autor_dir)
+        if not videos:
+            _log(autor, "Nenhuma transcricao encontrada — pulando")
+            resultado["acao"] = "sem transcricoes"
+
+        # Ja tem perfil: so as transcricoes novas
+        elif json_path.exists() and not force:
+            if refrescar_perfil(autor, json_path, videos, resultado["uso"]):
+                resultado.update(acao="atualizado", modo="atualizacao")
+
+        else:
+            caracteres = sum(len(texto) for _, texto in videos)
+            _log(autor, f"{len(videos)} videos, {caracteres} caracteres — analisando estilo com GPT...")
+            resultado["modo"] = escolher_modo(videos, modo)
+            perfil = gerar_perfil_creator(autor, videos, resultado["modo"], resultado["uso"])
+            perfil[CAMPO_TRANSCRICOES] = hashes_transcricoes(videos)
+            gravar_perfil_json(autor, perfil)
+            _log(autor, f"Resumo: {perfil.get('resumo_estilo', '')[:100]}...")
+            resultado["acao"] = "gerado"
+
+    except Exception as e:
+        # Um creator com erro nao derruba os outros
+        _log(autor, f"ERRO: {e}")
+        resultado["acao"] = "erro"
+
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def tabela_tempos(resultados: list[dict], parede: float) -> str:
+    """Tempo, chamadas e tokens por creator, e o ganho do paralelismo."""
+    linhas = [
+        f"  {'Creator':<24} {'Acao':<16} {'Modo':<11} {'Tempo':>8} {'Chamadas':>8} {'Tokens ent/sai':>16}"
+    ]
+    for r in resultados:
+        uso = r["uso"]
+        tokens = f"{uso.tokens_entrada}/{uso.tokens_saida}"
+        linhas.append(
+            f"  {r['autor'][:24]:<24} {r['acao']:<16} {r['modo']:<11} "
+            f"{r['segundos']:>7.1f}s {uso.chamadas:>8} {tokens:>16}"
+        )
+    soma = sum(r["segundos"] for r in resultados)
+    linhas.append(f"  Parede: {parede:.1f}s (soma dos creators: {soma:.1f}s)")
+    return "\n".join(linhas)
 
 
 # ============================================================
 # MAIN
 # ============================================================
 
-def main(force: bool = False):
+def main(force: bool = False, modo: str | None = None):
     """
-    Gera perfis de estilo para todos os creators.
+    Gera perfis de estilo para todos os creators, varios ao mesmo
+    tempo (PROFILE_CONCURRENCY).
 
     Args:
         force: Se True, regenera todos os perfis (mesmo os existentes)
+            do zero; sem ele, perfil existente so recebe as
+            transcricoes novas (refrescar_perfil)
+        modo: "auto", "unico" ou "mapreduce" (padrao: PROFILE_MODE)
     """
     print("=" * 50)
     print("  CopyWriter — Geracao de Perfis de Creators")
@@ -361,52 +779,42 @@ def main(force: bool = False):
         print("Nenhum creator encontrado em videos/")
         return
 
-    print(f"Encontrados {len(autores)} creators\n")
-
-    total_gerados = 0
-
-    for autor_dir in autores:
-        autor = autor_dir.name
-        json_path = PROFILES_DIR / f"{autor}.json"
+    trabalhadores = max(1, min(CONCORRENCIA_PERFIS, len(autores)))
+    print(f"Encontrados {len(autores)} creators — {trabalhadores} em paralelo\n")
 
-        print(f"[{autor}]")
+    cache_classificacao.zerar_contadores()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=trabalhadores) as pool:
+        resultados = list(pool.map(lambda autor_dir: processar_creator(autor_dir, force, modo), autores))
+    parede = time.perf_counter() - inicio
 
-        # Verifica se ja tem perfil
-        if json_path.exists() and not force:
-            print(f"  Perfil ja existe — garantindo ChromaDB...")
-            perfil = json.loads(json_path.read_text(encoding="utf-8"))
-            salvar_perfil(autor, perfil, force=False)
-            print()
-            continue
-
-        # Coleta transcricoes
-        transcricoes = coletar_transcricoes(autor_dir)
-        if not transcricoes.strip():
-            print(f"  Nenhuma transcricao encontrada — pulando")
-            print()
-            continue
-
-        print(f"  Transcricoes: {len(transcricoes)} caracteres")
-        print(f"  Analisando estilo com GPT...")
-
-        # Gera perfil
-        perfil = gerar_perfil(autor, transcricoes)
-        resumo = perfil.get("resumo_estilo", "")
-        print(f"  Resumo: {resumo[:100]}...")
+    # Perfis em disco x ChromaDB: uma leitura em massa e so os perfis
+    # gerados/atualizados (ou editados a mao) sao reindexados
+    print()
+    sincronizar_perfis()
 
-        # Salva e ingere
-        salvar_perfil(autor, perfil, force=True)
-        total_gerados += 1
-        print()
+    uso = UsoLLM()
+    for r in resultados:
+        uso.somar(r["uso"])
+    gerados = sum(1 for r in resultados if r["acao"] == "gerado")
+    atualizados = sum(1 for r in resultados if r["acao"] == "atualizado")
 
-    print(f"{'=' * 50}")
-    print(f"  Concluido: {total_gerados} perfis gerados")
+    print(f"\n{'=' * 50}")
+    print(tabela_tempos(resultados, parede))
+    print()
+    print(f"  Concluido: {gerados} perfis gerados, {atualizados} atualizados")
+    print(f"  {uso.resumo()}")
+    print(f"  Notas por video — {cache_classificacao.resumo()}")
     print(f"{'=' * 50}")
 
 
 if __name__ == "__main__":
-    import sys
-    force = "--force" in sys.argv
-    if force:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera os perfis de estilo dos creators")
+    parser.add_argument("--force", action="store_true", help="Regenera todos os perfis")
+    parser.add_argument("--modo", choices=MODOS, help="Padrao: PROFILE_MODE ou auto")
+    args = parser.parse_args()
+    if args.force:
         print("Modo FORCE: regenerando todos os perfis\n")
-    main(force=force)
+    main(force=args.force, modo=args.modo)
@@ -0,0 +1,161 @@
+# ============================================================
+# ratelimit.py — Limitador de taxa (token bucket)
+# ============================================================
+# Segura as chamadas para nao passar do limite de requisicoes
+# por minuto da API (ex: Whisper). Thread-safe: varias threads
+# de transcricao compartilham o mesmo limitador.
+#
+# LimiteAdaptativo e para servidores sem limite publicado (ex:
+# YouTube): acelera enquanto as respostas vem boas e freia quando
+# o servidor bloqueia.
+#
+# Uso:
+#   limite = LimiteTaxa(por_minuto=50)
+#   limite.aguardar()   # bloqueia ate ter uma vaga
+#   client.audio.transcriptions.create(...)
+#
+#   limite = LimiteAdaptativo(por_minuto=60)
+#   limite.aguardar()
+#   try: baixar(...); limite.sucesso()
+#   except Bloqueio: limite.bloqueado()
+# ============================================================
+
+import threading
+import time
+
+
+class LimiteTaxa:
+    """
+    Token bucket: enche `por_minuto` fichas por minuto, ate `rajada`.
+    Cada chamada gasta uma ficha; sem ficha, espera.
+
+    Args:
+        por_minuto: Requisicoes por minuto permitidas
+        rajada: Fichas acumuladas no maximo (padrao: por_minuto / 6,
+            ou seja, ate 10 segundos de folga de uma vez)
+    """
+
+    def __init__(self, por_minuto: float, rajada: int | None = None):
+        self.por_minuto = por_minuto
+        self.rajada = rajada or max(1, int(por_minuto / 6))
+        self._fichas = float(self.rajada)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def _encher(self):
+        agora = time.monotonic()
+        self._fichas = min(
+            self.rajada,
+            self._fichas + (agora - self._ultimo) * self.por_minuto / 60,
+        )
+        self._ultimo = agora
+
+    def aguardar(self) -> float:
+        """
+        Bloqueia ate haver uma ficha e a consome.
+
+        Returns:
+            Segundos que ficou esperando
+        """
+        esperou = 0.0
+        while True:
+            with self._trava:
+                self._encher()
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return esperou
+                espera = (1 - self._fichas) * 60 / self.por_minuto
+            time.sleep(espera)
+            esperou += espera
+
+
+class LimiteAdaptativo(LimiteTaxa):
+    """
+    Token bucket que se ajusta ao servidor (aumento aditivo, corte
+    multiplicativo — como o controle de congestionamento do TCP):
+
+    - cada resposta boa soma `passo` req/min a taxa, ate `maximo`
+    - um bloqueio (429, "too many requests") corta a taxa pela metade,
+      ate `minimo`, e segura todas as threads por `pausa` segundos.
+      Bloqueios seguidos dobram a pausa (ate PAUSA_MAX_S); um sucesso
+      volta a pausa ao inicio
+
+    Bloqueios que chegam durante a pausa (as requisicoes que ja
+    estavam no ar) contam uma vez so.
+
+    Args:
+        por_minuto: Taxa inicial
+        minimo: Taxa minima (padrao: por_minuto / 10)
+        maximo: Taxa maxima (padrao: 4x por_minuto)
+        passo: Aumento por sucesso (padrao: por_minuto / 10)
+        pausa: Pausa depois do primeiro bloqueio, em segundos
+        rajada: Como no LimiteTaxa
+    """
+
+    PAUSA_MAX_S = 600.0
+
+    def __init__(
+        self,
+        por_minuto: float,
+        minimo: float | None = None,
+        maximo: float | None = None,
+        passo: float | None = None,
+        pausa: float = 30.0,
+        rajada: int | None = None,
+    ):
+        super().__init__(por_minuto, rajada)
+        self.minimo = minimo or max(1.0, por_minuto / 10)
+        self.maximo = maximo or por_minuto * 4
+        self.passo = passo or por_minuto / 10
+        self.pausa_inicial = pausa
+        self._pausa = pausa
+        self._pausado_ate = 0.0
+        self.zerar_contadores()
+
+    def zerar_contadores(self):
+        self.sucessos = 0
+        self.bloqueios = 0
+
+    def aguardar(self) -> float:
+        esperou = 0.0
+        while True:
+            with self._trava:
+                resta = self._pausado_ate - time.monotonic()
+            if resta <= 0:
+                break
+            time.sleep(resta)
+            esperou += resta
+        return esperou + super().aguardar()
+
+    def sucesso(self):
+        """Resposta boa: acelera."""
+        with self._trava:
+            self._encher()
+            self.sucessos += 1
+            self.por_minuto = min(self.maximo, self.por_minuto + self.passo)
+            self._pausa = self.pausa_inicial
+
+    def bloqueado(self, pausa: float | None = None) -> float:
+        """
+        O servidor bloqueou: freia e pausa todo mundo.
+
+        Args:
+            pausa: Segundos pedidos pelo servidor (ex: retry-after);
+                padrao: a pausa atual do backoff
+
+        Returns:
+            Segundos ate o fim da pausa
+        """
+        with self._trava:
+            agora = time.monotonic()
+            self.bloqueios += 1
+            if agora < self._pausado_ate:
+                return self._pausado_ate - agora
+
+            self._encher()
+            self.por_minuto = max(self.minimo, self.por_minuto / 2)
+            self._fichas = 0.0
+            espera = pausa or self._pausa
+            self._pausado_ate = agora + espera
+            self._pausa = min(self.PAUSA_MAX_S, self._pausa * 2)
+            return espera
@@ -0,0 +1,106 @@
+# ============================================================
+# readers.py — Readers customizados para o knowledge base
+# ============================================================
+# Readers do agno que recebem o conteudo JA EXTRAIDO, para que
+# cada arquivo seja decodificado uma unica vez no pipeline de
+# ingestao (o mesmo texto alimenta o classificador e o chunker).
+# ============================================================
+
+from pathlib import Path
+from typing import IO, Any
+
+from agno.knowledge.document.base import Document
+from agno.knowledge.reader.base import Reader
+from agno.knowledge.reader.pdf_reader import (
+    PDFReader,
+    _clean_page_numbers,
+    _sanitize_pdf_text,
+)
+
+from chunking import janelas_de_snippets
+
+
+class PaginasPDFReader(PDFReader):
+    """
+    PDFReader que usa paginas ja extraidas em vez de reabrir o PDF.
+
+    Gera exatamente os mesmos documentos que o PDFReader (sanitizacao,
+    marcadores de pagina e chunking), so que sem o segundo parse.
+
+    Uso:
+        paginas = extrair_paginas_pdf(caminho)
+        knowledge_base.add_content(
+            path=str(caminho),
+            reader=PaginasPDFReader(paginas, chunking_strategy=criar_chunking(embedder)),
+        )
+
+    Args:
+        paginas: Texto de cada pagina, na ordem (ver pdf_extract.py)
+    """
+
+    def __init__(self, paginas: list[str], **kwargs):
+        super().__init__(**kwargs)
+        self.paginas = paginas
+
+    def read(
+        self,
+        pdf: str | Path | IO[Any] | None = None,
+        name: str | None = None,
+        password: str | None = None,
+    ) -> list[Document]:
+        doc_name = self._get_doc_name(pdf or "pdf_file", name)
+
+        # Copia: _clean_page_numbers altera a lista no lugar
+        paginas = list(self.paginas)
+        if self.sanitize_content:
+            paginas = [_sanitize_pdf_text(pagina) for pagina in paginas]
+
+        paginas, shift = _clean_page_numbers(
+            page_content_list=paginas,
+            page_start_numbering_format=self.page_start_numbering_format,
+            page_end_numbering_format=self.page_end_numbering_format,
+        )
+        return self._create_documents(paginas, doc_name, True, shift)
+
+
+class SnippetsReader(Reader):
+    """
+    Reader das transcricoes do YouTube a partir das legendas com tempo.
+
+    Cada chunk e uma janela de snippets (chunking.janelas_de_snippets)
+    com start_s/end_s na metadata — a busca devolve o trecho do video,
+    nao um bloco de legenda sem pontuacao. O texto passado ao
+    add_content (a transcricao corrida) e ignorado.
+
+    Uso:
+        knowledge_base.add_content(
+            text_content=texto,
+            name=f"youtube-{video_id}",
+            reader=SnippetsReader(dados["snippets"]),
+        )
+
+    Args:
+        snippets: [{text, start, duration}] como salvos no JSON do video
+    """
+
+    def __init__(self, snippets: list[dict], **kwargs):
+        super().__init__(**kwargs)
+        self.snippets = snippets
+
+    def read(self, obj: Any = None, name: str | None = None) -> list[Document]:
+        documentos = []
+        for numero, janela in enumerate(janelas_de_snippets(self.snippets), 1):
+            documentos.append(
+                Document(
+                    id=f"{name}_{numero}",
+                    name=name,
+                    meta_data={
+                        "chunk": numero,
+                        "chunk_size": len(janela["texto"]),
+                        "start_s": round(janela["start_s"], 1),
+                        "end_s": round(janela["end_s"], 1),
+                    },
+                    content=janela["texto"],
+                )
+            )
+        return documentos
@@ -0,0 +1,188 @@
+# ============================================================
+# sync_plan.py — Plano de sincronizacao fontes x ChromaDB
+# ============================================================
+# Transcricoes, YouTube e perfis sao textos (JSON em disco) que
+# entram no ChromaDB por add_content(text_content=...). O hash que
+# o agno usa no skip_if_exists e so do NOME — texto alterado com o
+# mesmo nome nunca era reindexado, e cada "garantir ChromaDB" era
+# uma consulta por documento.
+#
+# Aqui:
+# 1. Uma leitura em massa dos metadados da colecao (por tipo):
+#    nome -> fonte_hash (sha256 do texto indexado)
+# 2. Diff contra as fontes em disco:
+#    novo      -> nome nao indexado
+#    alterado  -> indexado com outro fonte_hash (ou sem fonte_hash,
+#                 indexado antes deste modulo)
+#    obsoleto  -> indexado com fonte_hash, sem fonte em disco
+#    inalterado
+# 3. So o delta vira delete/insert.
+#
+# Documentos sem fonte_hash que nao batem com nenhuma fonte (ex:
+# TXT ingerido pelo caminho) nao sao apagados — nao foram indexados
+# por aqui.
+#
+# Uso:
+#   fontes = [{"nome": ..., "texto": ..., "metadata": {...}}, ...]
+#   plano = planejar(vector_db, "perfil", fontes)
+#   print(plano.resumo())
+#   aplicar(plano, vector_db, lambda fonte: adicionar_texto(knowledge_base, fonte))
+# ============================================================
+
+import hashlib
+from typing import Callable
+
+# Campo de metadata com o sha256 do texto que foi indexado
+CAMPO_HASH = "fonte_hash"
+
+
+def hash_texto(texto: str) -> str:
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def fonte_texto(nome: str, texto: str, metadata: dict, **extras) -> dict:
+    """
+    Fonte de texto para o planejador.
+
+    Args:
+        nome: Nome do documento no ChromaDB
+        texto: Texto a indexar
+        metadata: Metadados (o fonte_hash e acrescentado aqui)
+        **extras: Guardados na fonte para quem aplica (ex: caminho do JSON)
+    """
+    return {
+        "nome": nome,
+        "texto": texto,
+        "metadata": {**metadata, CAMPO_HASH: hash_texto(texto)},
+        **extras,
+    }
+
+
+def ler_indexados(vector_db, tipo: str) -> dict[str, str | None]:
+    """
+    Nomes ja indexados de um tipo, numa unica leitura da colecao.
+
+    Returns:
+        {nome: fonte_hash} — None se o documento nao tem fonte_hash
+        ou se os chunks dele discordam (indexacao pela metade)
+    """
+    colecao = vector_db.client.get_collection(vector_db.collection_name)
+    metadatas = colecao.get(where={"tipo": tipo}, include=["metadatas"])["metadatas"] or []
+
+    indexados = {}
+    for metadata in metadatas:
+        nome = metadata.get("name")
+        if nome is None:
+            continue
+        valor = metadata.get(CAMPO_HASH)
+        if nome in indexados and indexados[nome] != valor:
+            valor = None
+        indexados[nome] = valor
+    return indexados
+
+
+class PlanoSincronizacao:
+    """
+    Delta entre as fontes em disco e o ChromaDB.
+
+    Atributos:
+        tipo: Tipo de documento (metadata "tipo")
+        novos, alterados: Fontes a (re)indexar
+        obsoletos: Nomes a apagar
+        inalterados: Quantas fontes ja estao em dia
+    """
+
+    def __init__(self, tipo: str, novos: list[dict], alterados: list[dict], obsoletos: list[str], inalterados: int):
+        self.tipo = tipo
+        self.novos = novos
+        self.alterados = alterados
+        self.obsoletos = obsoletos
+        self.inalterados = inalterados
+
+    @property
+    def vazio(self) -> bool:
+        return not (self.novos or self.alterados or self.obsoletos)
+
+    def resumo(self) -> str:
+        return (
+            f"Sincronizacao ({self.tipo}): {len(self.novos)} novos, {len(self.alterados)} alterados, "
+            f"{len(self.obsoletos)} obsoletos, {self.inalterados} inalterados"
+        )
+
+
+def planejar(vector_db, tipo: str, fontes: list[dict]) -> PlanoSincronizacao:
+    """
+    Compara as fontes (ver fonte_texto) com o que esta indexado.
+
+    Args:
+        vector_db: ChromaDb do agno
+        tipo: Metadata "tipo" dos documentos dessas fontes
+        fontes: TODAS as fontes validas em disco — o que estiver
+            indexado e nao aparecer aqui e obsoleto
+    """
+    indexados = ler_indexados(vector_db, tipo)
+
+    novos, alterados = [], []
+    inalterados = 0
+    nomes = set()
+    for fonte in fontes:
+        nomes.add(fonte["nome"])
+        if fonte["nome"] not in indexados:
+            novos.append(fonte)
+        elif indexados[fonte["nome"]] != fonte["metadata"][CAMPO_HASH]:
+            alterados.append(fonte)
+        else:
+            inalterados += 1
+
+    obsoletos = sorted(
+        nome for nome, valor in indexados.items()
+        if nome not in nomes and valor is not None
+    )
+    return PlanoSincronizacao(tipo, novos, alterados, obsoletos, inalterados)
+
+
+def aplicar(plano: PlanoSincronizacao, vector_db, ingerir: Callable[[dict], None]):
+    """
+    Executa o delta: apaga obsoletos, troca alterados, insere novos.
+
+    Args:
+        ingerir: Insere uma fonte (ex: adicionar_texto, ou um passo
+            com dedup antes)
+    """
+    for nome in plano.obsoletos:
+        print(f"  Removendo do ChromaDB (sem fonte em disco): {nome}")
+        vector_db.delete_by_name(nome)
+    for fonte in plano.alterados:
+        print(f"  Reindexando (texto alterado): {fonte['nome']}")
+        vector_db.delete_by_name(fonte["nome"])
+        ingerir(fonte)
+    for fonte in plano.novos:
+        print(f"  Indexando: {fonte['nome']}")
+        ingerir(fonte)
+
+
+def adicionar_texto(knowledge_base, fonte: dict, substituir: bool = False, reader=None) -> bool:
+    """
+    add_content de uma fonte (com o fonte_hash na metadata).
+
+    Args:
+        substituir: Apaga antes os chunks com o mesmo nome — o
+            skip_if_exists do agno so olha o nome, nao o texto
+        reader: Reader do agno no lugar do de texto (ex:
+            readers.SnippetsReader)
+
+    Returns:
+        True se a fonte ficou com chunks no ChromaDB — False se todos
+        foram descartados (ex: quase-duplicatas no ChromaDbEmLote);
+        quem chama marca VAZIO no manifesto para nao tentar de novo
+    """
+    if substituir:
+        knowledge_base.vector_db.delete_by_name(fonte["nome"])
+    knowledge_base.add_content(
+        text_content=fonte["texto"],
+        name=fonte["nome"],
+        metadata=fonte["metadata"],
+        reader=reader,
+        skip_if_exists=True,
+    )
+    return knowledge_base.vector_db.name_exists(fonte["nome"])
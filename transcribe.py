@@ -13,95 +13,297 @@
 #   "transcricao": "texto transcrito..."
 # }
 #
+# Os videos novos sao transcritos em paralelo: ate
+# TRANSCRIBE_WORKERS uploads simultaneos para o Whisper, limitados
+# a WHISPER_RPM requisicoes por minuto, e ate FFMPEG_WORKERS
+# processos ffmpeg extraindo audio (ver audio.py).
+#
+# Videos longos (lives, podcasts) sao cortados nos silencios em
+# segmentos de ate TRANSCRIBE_SEGMENT_SECONDS, transcritos em
+# paralelo e juntados em ordem — o video inteiro leva mais ou
+# menos o tempo de um segmento.
+#
+# TRANSCRIBE_COMPRESS decide quando mandar so o audio (MP3 16 kHz
+# mono) em vez do MP4: "always" (padrao), "over_threshold" (so
+# acima de 24MB) ou "never". O audio extraido fica em cache por
+# hash do video (data/audio_cache), para retentativas nao rodarem
+# o ffmpeg de novo.
+#
+# O motor de transcricao e plugavel (whisper_backends.py): Whisper
+# da API ("openai", padrao) ou faster-whisper local na CPU ("local").
+#
+# Cada video e um job no diario (transcription_jobs.py): erros
+# transitorios (429, rede) voltam com backoff exponencial e uma
+# rodada interrompida pode ser retomada sem re-varrer as pastas.
+#
+# Copias do mesmo video (mesmo arquivo ou mesmo audio) nao vao
+# para o Whisper, e transcricoes iguais ou quase iguais nao sao
+# indexadas (dedup.py) — a copia ganha "duplicata_de" no JSON.
+#
 # Uso:
 #   python transcribe.py
+#   python transcribe.py --backend local
+#   python transcribe.py --resume     # so jobs pendentes/falhos
+#   python transcribe.py --status     # fila, vazao, falhas por creator
 # ============================================================
 
 import json
+import os
 import subprocess
-import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-from openai import OpenAI
+import openai
 from dotenv import load_dotenv
 
-from agent import knowledge_base, VIDEOS_DIR, DB_DIR
+from agent import knowledge_base, vector_db, manifesto, VIDEOS_DIR, DB_DIR
+from audio import (
+    CACHE_AUDIO_MB,
+    SEGMENTO_MAX_S,
+    CacheAudio,
+    audio_extraido,
+    detectar_silencios,
+    duracao_audio,
+    juntar_textos,
+    planejar_cortes,
+    tamanho_audio_mb,
+)
+from dedup import (
+    EconomiaDedup,
+    IndiceImpressoes,
+    duplicatas_transcricoes,
+    impressao_audio,
+    minutos_estimados,
+    parece_copia,
+)
+from manifest import VAZIO, hash_arquivo
+from ratelimit import LimiteTaxa
+from sync_plan import adicionar_texto, aplicar, fonte_texto, planejar
+from transcription_jobs import ABANDONADO, CONCLUIDO, JornalTranscricao
+from whisper_backends import BACKEND_PADRAO, BackendOpenAI, BackendTranscricao, criar_backend
 
 load_dotenv()
 
+# Quando extrair o audio antes do upload
+POLITICAS_COMPRESSAO = ("always", "over_threshold", "never")
+POLITICA_COMPRESSAO = os.getenv("TRANSCRIBE_COMPRESS", "always")
 
-def _encontrar_ffmpeg() -> str:
-    """Encontra o executavel do ffmpeg (PATH ou winget)."""
-    import shutil
-    ff = shutil.which("ffmpeg")
-    if ff:
-        return ff
-    # Procura na pasta do winget (Windows)
-    winget_dir = Path.home() / "AppData/Local/Microsoft/WinGet/Packages"
-    if winget_dir.exists():
-        for p in winget_dir.rglob("ffmpeg.exe"):
-            return str(p)
-    raise FileNotFoundError("ffmpeg nao encontrado")
-
-
-def _extrair_audio(caminho_video: Path) -> Path:
-    """
-    Extrai o audio de um video MP4 para MP3 comprimido usando ffmpeg.
-    Retorna o caminho do arquivo MP3 temporario.
-    Um video de 100MB vira ~3-5MB de audio.
-    """
-    ffmpeg = _encontrar_ffmpeg()
-    audio_path = Path(tempfile.mktemp(suffix=".mp3"))
-    subprocess.run(
-        [
-            ffmpeg, "-i", str(caminho_video),
-            "-vn",              # sem video
-            "-acodec", "libmp3lame",
-            "-ab", "64k",       # bitrate baixo (suficiente pra voz)
-            "-ar", "16000",     # sample rate 16kHz (ideal pro Whisper)
-            "-ac", "1",         # mono
-            "-y",               # sobrescreve se existir
-            str(audio_path),
-        ],
-        capture_output=True,
-        check=True,
-    )
-    return audio_path
+# Acima disso (MB) o MP4 nao passa no Whisper (limite de 25MB)
+LIMITE_UPLOAD_MB = 24
+
+# Uploads simultaneos para o Whisper
+WORKERS_PADRAO = int(os.getenv("TRANSCRIBE_WORKERS", "4"))
+
+# Segmentos do mesmo video transcritos ao mesmo tempo
+SEGMENTOS_PADRAO = int(os.getenv("TRANSCRIBE_SEGMENT_WORKERS", "4"))
+
+# Limite de requisicoes por minuto do Whisper (compartilhado pelas threads)
+limite_whisper = LimiteTaxa(por_minuto=float(os.getenv("WHISPER_RPM", "50")))
+
+# Audio extraido por hash do video (AUDIO_CACHE_MB=0 desliga)
+cache_audio = CacheAudio(DB_DIR / "audio_cache") if CACHE_AUDIO_MB > 0 else None
+
+# Diario de jobs: estado, tentativas e erros de cada video
+jornal = JornalTranscricao(DB_DIR / "transcricoes.db")
+
+# Impressoes de audio dos videos ja vistos (dedup antes do Whisper)
+indice_impressoes = IndiceImpressoes(DB_DIR / "duplicatas.db")
+economia_dedup = EconomiaDedup()
+
+# Erros que valem nova tentativa (APITimeoutError herda de APIConnectionError)
+ERROS_TRANSITORIOS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Backoff ate este tamanho (s) espera na propria rodada; maior que
+# isso, o video fica para a proxima (--resume)
+ESPERA_MAX_NA_RODADA = 120
+
+
+class EstatisticasUpload:
+    """Bytes enviados ao Whisper x tamanho dos videos (thread-safe)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        self.uploads = 0
+        self.bytes_enviados = 0
+        self.bytes_videos = 0
 
+    def registrar_video(self, caminho_video: Path):
+        with self._trava:
+            self.bytes_videos += caminho_video.stat().st_size
 
-def transcrever_video(caminho_video: Path) -> str:
+    def registrar_upload(self, megabytes: float):
+        with self._trava:
+            self.uploads += 1
+            self.bytes_enviados += int(megabytes * 1024 * 1024)
+
+    def resumo(self) -> str:
+        enviados = self.bytes_enviados / (1024 * 1024)
+        videos = self.bytes_videos / (1024 * 1024)
+        reducao = (1 - enviados / videos) * 100 if videos else 0.0
+        return (
+            f"Upload: {enviados:.1f}MB em {self.uploads} envios "
+            f"(videos somam {videos:.1f}MB, {reducao:.0f}% a menos)"
+        )
+
+
+estatisticas_upload = EstatisticasUpload()
+
+
+def criar_backend_transcricao(nome: str | None = None) -> BackendTranscricao:
     """
-    Transcreve um arquivo de video usando Whisper da OpenAI.
-    Se o arquivo for maior que 24MB, extrai o audio primeiro com ffmpeg.
+    Cria o backend de transcricao (padrao: TRANSCRIBE_BACKEND).
+    O da OpenAI usa o limitador WHISPER_RPM e TRANSCRIBE_WORKERS
+    uploads simultaneos; o local, um processo por nucleo.
     """
-    client = OpenAI()
-    tamanho_mb = caminho_video.stat().st_size / (1024 * 1024)
+    nome = nome or BACKEND_PADRAO
+    if nome == BackendOpenAI.nome:
+        return criar_backend(nome, limite=limite_whisper, concorrencia=WORKERS_PADRAO)
+    return criar_backend(nome)
+
+
+def _enviar_whisper(backend: BackendTranscricao, audio) -> str:
+    """
+    Transcreve um audio no backend, contando os bytes enviados
+    quando o backend e remoto.
 
-    arquivo_enviar = caminho_video
-    audio_temp = None
+    Args:
+        backend: Motor de transcricao
+        audio: Path de um arquivo ou buffer binario (modo pipe)
+    """
+    if backend.pela_rede:
+        estatisticas_upload.registrar_upload(tamanho_audio_mb(audio))
+    return backend.transcrever(audio)
+
+
+def _transcrever_segmento(backend: BackendTranscricao, caminho_video: Path, inicio: float, fim: float) -> str:
+    """Extrai um trecho do audio e transcreve."""
+    with audio_extraido(caminho_video, inicio, fim) as audio:
+        return _enviar_whisper(backend, audio)
+
+
+def _transcrever_em_segmentos(
+    backend: BackendTranscricao,
+    caminho_video: Path,
+    cortes: list[tuple[float, float]],
+) -> str:
+    """
+    Transcreve os segmentos em paralelo e junta os textos em ordem,
+    sem as repeticoes das emendas.
+    """
+    nome = caminho_video.name
+    print(f"  [{nome}] {len(cortes)} segmentos — transcrevendo em paralelo...")
+    with ThreadPoolExecutor(max_workers=min(SEGMENTOS_PADRAO, len(cortes))) as pool:
+        textos = list(pool.map(
+            lambda corte: _transcrever_segmento(backend, caminho_video, *corte),
+            cortes,
+        ))
+    return juntar_textos(textos)
+
+
+def _deve_comprimir(tamanho_mb: float) -> bool:
+    """Aplica a TRANSCRIBE_COMPRESS ao tamanho do video."""
+    if POLITICA_COMPRESSAO not in POLITICAS_COMPRESSAO:
+        raise ValueError(
+            f"TRANSCRIBE_COMPRESS invalido: {POLITICA_COMPRESSAO} "
+            f"(use {', '.join(POLITICAS_COMPRESSAO)})"
+        )
+    if POLITICA_COMPRESSAO == "always":
+        return True
+    if POLITICA_COMPRESSAO == "over_threshold":
+        return tamanho_mb > LIMITE_UPLOAD_MB
+    return False
+
+
+def _transcrever_audio(
+    backend: BackendTranscricao,
+    caminho_video: Path,
+    sha256: str | None = None,
+) -> str:
+    """
+    Extrai o audio (ou pega do cache) e transcreve — em segmentos
+    paralelos se passar de TRANSCRIBE_SEGMENT_SECONDS.
+    """
+    nome = caminho_video.name
+
+    # Com cache: extrai o MP3 uma vez e trabalha em cima dele
+    # (silencedetect e cortes num MP3 pequeno sao rapidos)
+    origem = cache_audio.obter(caminho_video, sha256) if cache_audio else caminho_video
+
+    # Duracao pelo cabecalho primeiro: o silencedetect decodifica o
+    # audio inteiro e so e preciso quando ha mais de um segmento
+    duracao = duracao_audio(origem)
+    cortes = [(0.0, duracao)]
+    if not duracao or duracao > SEGMENTO_MAX_S:
+        duracao, silencios = detectar_silencios(origem)
+        cortes = planejar_cortes(duracao, silencios)
+    if len(cortes) > 1:
+        return _transcrever_em_segmentos(backend, origem, cortes)
+
+    if origem != caminho_video:
+        print(f"  [{nome}] Audio: {tamanho_audio_mb(origem):.1f}MB — transcrevendo ({backend.nome})...")
+        return _enviar_whisper(backend, origem)
+
+    with audio_extraido(caminho_video) as audio:
+        print(f"  [{nome}] Audio extraido: {tamanho_audio_mb(audio):.1f}MB")
+        print(f"  [{nome}] Transcrevendo ({backend.nome})...")
+        return _enviar_whisper(backend, audio)
+
+
+def transcrever_video(
+    caminho_video: Path,
+    backend: BackendTranscricao,
+    sha256: str | None = None,
+) -> str:
+    """
+    Transcreve um arquivo de video com o backend (Whisper da OpenAI
+    ou local).
+    Conforme TRANSCRIBE_COMPRESS, extrai o audio primeiro com ffmpeg
+    (MP3 16 kHz mono, bem menor que o MP4); se o audio passar de
+    TRANSCRIBE_SEGMENT_SECONDS, corta nos silencios e transcreve os
+    segmentos em paralelo. Sem ffmpeg, envia o MP4 direto.
+
+    Args:
+        caminho_video: Video a transcrever
+        backend: Motor de transcricao
+        sha256: Hash do video, se ja calculado (chave do cache de audio)
+    """
+    nome = caminho_video.name
+    tamanho_mb = caminho_video.stat().st_size / (1024 * 1024)
 
-    if tamanho_mb > 24:
-        print(f"  Arquivo grande ({tamanho_mb:.1f}MB) — extraindo audio...")
+    if _deve_comprimir(tamanho_mb):
+        print(f"  [{nome}] {tamanho_mb:.1f}MB — extraindo audio...")
         try:
-            audio_temp = _extrair_audio(caminho_video)
-            tamanho_audio = audio_temp.stat().st_size / (1024 * 1024)
-            print(f"  Audio extraido: {tamanho_audio:.1f}MB")
-            arquivo_enviar = audio_temp
+            return _transcrever_audio(backend, caminho_video, sha256)
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"  AVISO: ffmpeg nao disponivel ({e}), enviando MP4 direto...")
+            print(f"  [{nome}] AVISO: ffmpeg nao disponivel ({e}), enviando MP4 direto...")
 
-    print(f"  Transcrevendo com Whisper...")
-    try:
-        with open(arquivo_enviar, "rb") as f:
-            transcription = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-                language="pt",
-            )
-        return transcription.text
-    finally:
-        if audio_temp and audio_temp.exists():
-            audio_temp.unlink()
+    print(f"  [{nome}] Transcrevendo ({backend.nome})...")
+    return _enviar_whisper(backend, caminho_video)
+
+
+def _gravar_json(caminho: Path, dados: dict):
+    """
+    Grava o JSON de forma atomica: escreve num .tmp e renomeia.
+    Se o processo morrer no meio, nao fica JSON pela metade (que o
+    main() trataria como "ja transcrito").
+    """
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    temporario.write_text(
+        json.dumps(dados, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    os.replace(temporario, caminho)
 
 
 def salvar_transcricao(texto: str, autor: str, nome_arquivo: str):
@@ -121,10 +323,7 @@ def salvar_transcricao(texto: str, autor: str, nome_arquivo: str):
         "arquivo_original": nome_arquivo,
         "transcricao": texto,
     }
-    json_path.write_text(
-        json.dumps(dados, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    _gravar_json(json_path, dados)
     print(f"  Salvo em: {json_path.name}")
 
     # ---- Adiciona ao ChromaDB com metadata ----
@@ -135,12 +334,13 @@ def salvar_transcricao(texto: str, autor: str, nome_arquivo: str):
     }
 
     print(f"  Adicionando ao ChromaDB...")
-    knowledge_base.add_content(
-        text_content=texto,
-        name=f"{autor} - {stem}",
-        metadata=metadata,
-        skip_if_exists=True,
-    )
+    # Substitui: o video pode ter sido transcrito de novo com o mesmo nome
+    fonte = fonte_texto(f"{autor} - {stem}", texto, metadata)
+    if adicionar_texto(knowledge_base, fonte, substituir=True):
+        manifesto.registrar(json_path, fonte["metadata"], nome=fonte["nome"])
+    else:
+        print(f"  Todos os chunks sao quase-duplicatas — nao indexado")
+        manifesto.registrar(json_path, fonte["metadata"], status=VAZIO, nome=fonte["nome"])
 
 
 def converter_txt_para_json(txt_path: Path, autor: str):
@@ -161,34 +361,123 @@ def converter_txt_para_json(txt_path: Path, autor: str):
         "arquivo_original": f"{stem}.mp4",
         "transcricao": texto,
     }
-    json_path.write_text(
-        json.dumps(dados, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    _gravar_json(json_path, dados)
     print(f"  Convertido {txt_path.name} -> {json_path.name}")
     return texto
 
 
-def main():
-    print("=" * 50)
-    print("  CopyWriter — Transcricao de Videos")
-    print("=" * 50)
-    print()
+def _deduplicar_transcricoes(autores: list[Path]):
+    """
+    Marca as transcricoes iguais ou quase iguais de cada creator:
+    a copia ganha "duplicata_de", sai do ChromaDB (se ja estava) e
+    fica como VAZIO no manifesto — nao e indexada nem vai pro perfil.
+    """
+    for pasta_autor in sorted(autores):
+        autor = pasta_autor.name
+        for duplicata, canonica, similaridade in duplicatas_transcricoes(pasta_autor):
+            dados = json.loads(duplicata.read_text(encoding="utf-8"))
+            dados["duplicata_de"] = canonica.name
+            dados["similaridade"] = round(similaridade, 3)
+            _gravar_json(duplicata, dados)
+
+            # Chunks da copia que ja estavam indexados
+            vector_db.delete_by_name(f"{autor} - {duplicata.stem}")
+            manifesto.registrar(
+                duplicata,
+                {"tipo": "transcricao", "autor": autor, "arquivo": duplicata.name},
+                status=VAZIO,
+            )
+            economia_dedup.registrar_transcricao(dados.get("transcricao", ""))
+            print(f"[{autor}] {duplicata.name} — duplicata de {canonica.name} ({similaridade:.0%})")
 
-    if not VIDEOS_DIR.exists():
-        print("Pasta videos/ nao encontrada!")
-        return
 
-    # Percorre cada pasta de autor
-    autores = [p for p in VIDEOS_DIR.iterdir() if p.is_dir()]
+def _canonico_pronto(canonico: Path, job: dict | None) -> bool | None:
+    """
+    O video canonico ja tem a transcricao para a copia apontar?
 
-    if not autores:
-        print("Nenhuma pasta de autor encontrada em videos/")
-        return
+    Returns:
+        True se o job dele esta concluido (ou e anterior ao diario) e o
+        JSON existe; False se ainda vai ser transcrito (a copia espera);
+        None se nao vai ter transcricao (job abandonado, ou sem job e
+        sem JSON) — a copia segue como video proprio
+    """
+    json_canonico = canonico.with_suffix(".json")
+    if job is None:
+        return True if json_canonico.exists() else None
+    if job["estado"] == ABANDONADO:
+        return None
+    return job["estado"] == CONCLUIDO and json_canonico.exists()
+
+
+def _video_duplicado(autor: str, video_path: Path, sha256: str) -> tuple[Path, float, float, bool] | None:
+    """
+    Procura outro video do mesmo creator com o mesmo conteudo:
+    primeiro o mesmo arquivo (sha256 no diario), depois o mesmo audio
+    (impressao, precisa do ffmpeg). Videos novos entram no indice.
 
+    So vale como canonico o video que ja foi (ou ainda vai ser)
+    transcrito — ver _canonico_pronto.
+
+    Returns:
+        (video canonico, similaridade, minutos de audio, pronto) ou
+        None. Com pronto=False o canonico ainda nao foi transcrito: a
+        copia nao e marcada, fica para a proxima rodada
+    """
+    job = jornal.consultar(sha256)
+    if job and job["autor"] == autor:
+        canonico = Path(job["caminho"])
+        if canonico != video_path and canonico.exists():
+            pronto = _canonico_pronto(canonico, job)
+            if pronto is not None:
+                minutos = 0.0
+                if pronto:
+                    dados = json.loads(canonico.with_suffix(".json").read_text(encoding="utf-8"))
+                    minutos = minutos_estimados(dados.get("transcricao", ""))
+                return canonico, 1.0, minutos, pronto
+
+    try:
+        impressao = impressao_audio(video_path)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None  # sem ffmpeg (ou sem audio): fica so o sha256
+
+    achado = indice_impressoes.procurar(autor, impressao, ignorar_sha256=sha256)
+    if achado:
+        canonico, similaridade, sha256_canonico = achado
+        pronto = _canonico_pronto(canonico, jornal.consultar(sha256_canonico))
+        if pronto is not None:
+            return canonico, similaridade, impressao[1] / 60, pronto
+    indice_impressoes.salvar(sha256, autor, video_path, impressao)
+    return None
+
+
+def _marcar_video_duplicado(autor: str, video_path: Path, canonico: Path, similaridade: float):
+    """Grava o JSON da copia apontando para o canonico, sem transcricao."""
+    json_path = video_path.with_suffix(".json")
+    metadata = {"tipo": "transcricao", "autor": autor, "arquivo": json_path.name}
+    _gravar_json(json_path, {
+        "autor": autor,
+        "tipo": "transcricao",
+        "arquivo_original": video_path.name,
+        "duplicata_de": canonico.with_suffix(".json").name,
+        "similaridade": round(similaridade, 3),
+        "transcricao": "",
+    })
+    manifesto.registrar(json_path, metadata, status=VAZIO)
+
+
+def _varrer_videos(autores: list[Path]) -> tuple[int, int, list[tuple[str, Path, str]]]:
+    """
+    Percorre as pastas dos creators: converte os .txt antigos para
+    .json e enfileira no diario os videos sem transcricao.
+
+    Returns:
+        (total de videos, ja transcritos, pendentes como (autor, video, sha256))
+    """
     total_videos = 0
     total_transcritos = 0
+    pendentes = []
 
+    # ---- 1. Varredura: o que ja foi transcrito ----
     for pasta_autor in sorted(autores):
         autor = pasta_autor.name
         videos = list(pasta_autor.glob("*.mp4"))
@@ -199,7 +488,9 @@ def main():
 
         print(f"\n--- {autor} ({len(videos)} videos) ---\n")
 
-        for i, video_path in enumerate(sorted(videos), 1):
+        # Originais antes das copias "(1)": o primeiro visto vira o canonico
+        videos.sort(key=lambda v: (parece_copia(v.name), v.name))
+        for i, video_path in enumerate(videos, 1):
             total_videos += 1
             nome = video_path.name
             stem = video_path.stem
@@ -209,59 +500,282 @@ def main():
             txt_path = pasta_autor / f"{stem}.txt"
 
             if json_path.exists():
-                # Ja tem JSON — so garante que esta no ChromaDB
+                # Ja tem JSON — o ChromaDB e conferido depois, em massa
+                # (sincronizar_transcricoes)
                 print(f"[{i}/{len(videos)}] {nome} — ja transcrito (JSON), pulando")
-                dados = json.loads(json_path.read_text(encoding="utf-8"))
-                texto = dados.get("transcricao", "")
-                if texto.strip():
-                    metadata = {
-                        "tipo": "transcricao",
-                        "autor": autor,
-                        "arquivo": json_path.name,
-                    }
-                    knowledge_base.add_content(
-                        text_content=texto,
-                        name=f"{autor} - {stem}",
-                        metadata=metadata,
-                        skip_if_exists=True,
-                    )
                 total_transcritos += 1
                 continue
 
             if txt_path.exists():
-                # Tem .txt mas nao .json — converte para JSON
+                # Tem .txt mas nao .json — converte para JSON (indexado
+                # pelo sincronizar_transcricoes)
                 print(f"[{i}/{len(videos)}] {nome} — convertendo TXT para JSON")
-                texto = converter_txt_para_json(txt_path, autor)
-                if texto and texto.strip():
-                    metadata = {
-                        "tipo": "transcricao",
-                        "autor": autor,
-                        "arquivo": f"{stem}.json",
-                    }
-                    knowledge_base.add_content(
-                        text_content=texto,
-                        name=f"{autor} - {stem}",
-                        metadata=metadata,
-                        skip_if_exists=True,
-                    )
+                converter_txt_para_json(txt_path, autor)
                 total_transcritos += 1
                 continue
 
-            # Nenhuma transcricao existe — transcrever
-            print(f"[{i}/{len(videos)}] {nome}")
+            # Nenhuma transcricao existe — copia de outro video?
+            sha256 = hash_arquivo(video_path)
+            duplicata = _video_duplicado(autor, video_path, sha256)
+            if duplicata:
+                canonico, similaridade, minutos, pronto = duplicata
+                if not pronto:
+                    print(
+                        f"[{i}/{len(videos)}] {nome} — copia de {canonico.name} "
+                        f"({similaridade:.0%}), aguardando a transcricao dele"
+                    )
+                    continue
+                _marcar_video_duplicado(autor, video_path, canonico, similaridade)
+                economia_dedup.registrar_video(minutos)
+                print(
+                    f"[{i}/{len(videos)}] {nome} — copia de {canonico.name} "
+                    f"({similaridade:.0%}), pulando"
+                )
+                continue
 
-            try:
-                texto = transcrever_video(video_path)
-                salvar_transcricao(texto, autor, nome)
-                total_transcritos += 1
-                print(f"  OK!")
-            except Exception as e:
-                print(f"  ERRO: {e}")
+            # Vai para a fila (e para o diario)
+            job = jornal.enfileirar(sha256, video_path, autor, video_path.stat().st_size)
+            if not jornal.pode_tentar(job):
+                if job["estado"] == ABANDONADO:
+                    print(f"[{i}/{len(videos)}] {nome} — abandonado ({job['erro_tipo']}), pulando")
+                else:
+                    faltam = job["proxima_tentativa"] - time.time()
+                    print(f"[{i}/{len(videos)}] {nome} — em backoff ({faltam:.0f}s), pulando")
+                continue
+            print(f"[{i}/{len(videos)}] {nome} — na fila para transcrever")
+            pendentes.append((autor, video_path, sha256))
+
+    return total_videos, total_transcritos, pendentes
+
+
+def fontes_transcricoes(autores: list[Path]) -> list[dict]:
+    """
+    Transcricoes validas em disco (JSONs dos creators, sem as
+    duplicatas e as vazias), como fontes do sync_plan.py. As que
+    ficam de fora vao como VAZIO para o manifesto; as ja marcadas
+    VAZIO (JSON sem alteracao) nem sao lidas.
+    """
+    fontes = []
+    for pasta_autor in sorted(autores):
+        autor = pasta_autor.name
+        for json_path in sorted(pasta_autor.glob("*.json")):
+            registro = manifesto.consultar(json_path)
+            if registro and registro["status"] == VAZIO:
+                continue
+            dados = json.loads(json_path.read_text(encoding="utf-8"))
+            texto = dados.get("transcricao", "")
+            metadata = {
+                "tipo": "transcricao",
+                "autor": autor,
+                "arquivo": json_path.name,
+            }
+            if dados.get("duplicata_de") or not texto.strip():
+                manifesto.registrar(json_path, metadata, status=VAZIO)
+                continue
+            fontes.append(fonte_texto(f"{autor} - {json_path.stem}", texto, metadata, caminho=json_path))
+    return fontes
+
+
+def sincronizar_transcricoes(autores: list[Path]):
+    """
+    Deixa o ChromaDB igual as transcricoes em disco: uma leitura em
+    massa da colecao e so o delta (novas, alteradas, obsoletas) vira
+    escrita (ver sync_plan.py).
+    """
+    plano = planejar(vector_db, "transcricao", fontes_transcricoes(autores))
+    print(plano.resumo())
+
+    def ingerir(fonte: dict):
+        if adicionar_texto(knowledge_base, fonte):
+            manifesto.registrar(fonte["caminho"], fonte["metadata"], nome=fonte["nome"])
+        else:
+            print(f"  Todos os chunks sao quase-duplicatas — nao indexado: {fonte['nome']}")
+            manifesto.registrar(fonte["caminho"], fonte["metadata"], status=VAZIO, nome=fonte["nome"])
+
+    aplicar(plano, vector_db, ingerir)
+
+
+def _pendentes_do_diario() -> list[tuple[str, Path, str]]:
+    """
+    Jobs retomaveis do diario (--resume), sem varrer as pastas.
+    Pula videos que sumiram ou que ja ganharam JSON por fora.
+    """
+    pendentes = []
+    for job in jornal.retomaveis():
+        video_path = Path(job["caminho"])
+        if not video_path.exists():
+            print(f"{video_path.name} — video nao existe mais, pulando")
+            continue
+        if video_path.with_suffix(".json").exists():
+            jornal.concluir(job["sha256"], job["segundos"] or 0.0)
+            continue
+        print(f"[{job['autor']}] {video_path.name} — {job['estado']} ({job['tentativas']} tentativas)")
+        pendentes.append((job["autor"], video_path, job["sha256"]))
+    return pendentes
+
+
+def erro_transitorio(erro: Exception) -> bool:
+    """429, rede, timeout e 5xx valem nova tentativa; o resto nao."""
+    return isinstance(erro, ERROS_TRANSITORIOS)
+
+
+def _processar_job(
+    video_path: Path,
+    sha256: str,
+    motor: BackendTranscricao,
+) -> tuple[str, float]:
+    """
+    Roda no pool: transcreve registrando cada tentativa no diario.
+    Erro transitorio com backoff curto (ate ESPERA_MAX_NA_RODADA)
+    tenta de novo aqui mesmo; backoff longo fica para a proxima
+    rodada.
+
+    Returns:
+        (texto, segundos da tentativa que deu certo)
+    """
+    estatisticas_upload.registrar_video(video_path)
+    while True:
+        tentativa = jornal.iniciar(sha256)
+        inicio = time.perf_counter()
+        try:
+            texto = transcrever_video(video_path, motor, sha256)
+            return texto, time.perf_counter() - inicio
+        except Exception as e:
+            espera = jornal.falhar(sha256, e, erro_transitorio(e))
+            if espera is None or espera > ESPERA_MAX_NA_RODADA:
+                raise
+            print(
+                f"  [{video_path.name}] {type(e).__name__} na tentativa {tentativa} — "
+                f"tentando de novo em {espera:.0f}s"
+            )
+            time.sleep(espera)
+
+
+def main(workers: int | None = None, backend: str | None = None, retomar: bool = False):
+    """
+    Transcreve os videos novos de todos os creators.
+
+    Etapas:
+    0. Dedup — marca as transcricoes duplicadas de cada creator
+    1. Varredura — pula os videos que ja tem .json ou .txt e
+       enfileira o resto no diario de jobs (respeitando backoff e
+       abandonados); copias de videos ja vistos nao vao para a fila.
+       Depois, o ChromaDB e sincronizado com os JSONs em massa
+       (sincronizar_transcricoes)
+    2. Transcricao em paralelo — ffmpeg + backend em um pool de
+       threads (na OpenAI, limitado por WHISPER_RPM)
+    3. Conforme cada video termina, salva o JSON e ingere no
+       ChromaDB (na thread principal, uma escrita por vez)
+
+    Args:
+        workers: Videos simultaneos (padrao: o do backend —
+            TRANSCRIBE_WORKERS na OpenAI, um por nucleo no local)
+        backend: "openai" ou "local" (padrao: TRANSCRIBE_BACKEND)
+        retomar: Pula a varredura e processa so os jobs pendentes,
+            interrompidos ou com backoff vencido do diario
+    """
+    print("=" * 50)
+    print("  CopyWriter — Transcricao de Videos")
+    print("=" * 50)
+    print()
+
+    if not VIDEOS_DIR.exists():
+        print("Pasta videos/ nao encontrada!")
+        return
+
+    # Percorre cada pasta de autor
+    autores = [p for p in VIDEOS_DIR.iterdir() if p.is_dir()]
+
+    if not autores:
+        print("Nenhuma pasta de autor encontrada em videos/")
+        return
+
+    economia_dedup.zerar()
+    if retomar:
+        # Sem varredura: so os jobs pendentes/falhos do diario
+        print("Retomando os jobs do diario...\n")
+        pendentes = _pendentes_do_diario()
+        total_videos, total_transcritos = len(pendentes), 0
+    else:
+        _deduplicar_transcricoes(autores)
+        total_videos, total_transcritos, pendentes = _varrer_videos(autores)
+        sincronizar_transcricoes(autores)
+
+    # ---- 2 e 3. Transcricao em paralelo, ingestao conforme termina ----
+    falhas = []
+    megabytes = 0.0
+    estatisticas_upload.zerar()
+    if cache_audio:
+        cache_audio.zerar_contadores()
+    inicio = time.perf_counter()
+
+    if pendentes:
+        motor = criar_backend_transcricao(backend)
+        workers = workers or motor.concorrencia
+        print(
+            f"\nTranscrevendo {len(pendentes)} videos "
+            f"({workers} em paralelo, backend {motor.nome})...\n"
+        )
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futuros = {
+                    pool.submit(_processar_job, video_path, sha256, motor): (autor, video_path, sha256)
+                    for autor, video_path, sha256 in pendentes
+                }
+                for futuro in as_completed(futuros):
+                    autor, video_path, sha256 = futuros[futuro]
+                    print(f"[{autor}] {video_path.name}")
+                    try:
+                        # Falhas da transcricao ja estao no diario. Se o
+                        # salvar falhar, o job fica "rodando" e o --resume
+                        # pega de novo
+                        texto, duracao = futuro.result()
+                        salvar_transcricao(texto, autor, video_path.name)
+                        jornal.concluir(sha256, duracao)
+                        total_transcritos += 1
+                        megabytes += video_path.stat().st_size / (1024 * 1024)
+                        print(f"  OK!")
+                    except Exception as e:
+                        falhas.append((autor, video_path.name, f"{type(e).__name__}: {e}"))
+                        print(f"  ERRO: {e}")
+        finally:
+            motor.fechar()
+
+    segundos = time.perf_counter() - inicio
 
     print(f"\n{'=' * 50}")
     print(f"  Concluido: {total_transcritos}/{total_videos} videos transcritos")
+    if pendentes:
+        novos = len(pendentes) - len(falhas)
+        print(
+            f"  Novos: {novos} em {segundos:.1f}s "
+            f"({novos / segundos * 60:.1f} videos/min, {megabytes / segundos:.2f} MB/s)"
+        )
+        if estatisticas_upload.uploads:
+            print(f"  {estatisticas_upload.resumo()}")
+        if cache_audio:
+            print(f"  {cache_audio.resumo()}")
+    if economia_dedup.videos or economia_dedup.transcricoes:
+        print(f"  {economia_dedup.resumo()}")
+    if falhas:
+        print(f"  Falhas ({len(falhas)}):")
+        for autor, nome, erro in falhas:
+            print(f"    - {autor}/{nome}: {erro}")
+        print("  Detalhes: python transcribe.py --status | retomar: --resume")
     print(f"{'=' * 50}")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Transcreve os videos novos")
+    parser.add_argument("--backend", choices=["openai", "local"], help="Padrao: TRANSCRIBE_BACKEND ou openai")
+    parser.add_argument("--workers", type=int, help="Videos simultaneos")
+    parser.add_argument("--resume", action="store_true", help="So os jobs pendentes/falhos do diario, sem varrer as pastas")
+    parser.add_argument("--status", action="store_true", help="Mostra a fila, a vazao e as falhas por creator")
+    args = parser.parse_args()
+    if args.status:
+        print(jornal.relatorio())
+    else:
+        main(workers=args.workers, backend=args.backend, retomar=args.resume)
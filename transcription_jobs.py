@@ -0,0 +1,263 @@
+# ============================================================
+# transcription_jobs.py — Diario de jobs da transcricao
+# ============================================================
+# Uma linha por video (chave: sha256 do conteudo) com o estado do
+# job, tentativas, ultimo erro, duracao e bytes. O transcribe.py
+# consulta e atualiza o diario a cada passo:
+#
+#   pendente -> rodando -> concluido
+#                       -> falhou     (erro transitorio: 429, rede,
+#                                      5xx; tenta de novo depois de
+#                                      um backoff exponencial)
+#                       -> abandonado (erro permanente ou tentativas
+#                                      esgotadas)
+#
+# Se o processo morrer no meio, os jobs "rodando" sao retomados na
+# proxima rodada (python transcribe.py --resume), sem re-varrer
+# todas as pastas.
+#
+# Saida:
+#   data/transcricoes.db — SQLite com uma linha por video
+# ============================================================
+
+import os
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Estados de um job
+PENDENTE = "pendente"       # Na fila, ainda nao tentado
+RODANDO = "rodando"         # Em andamento (ou processo morreu no meio)
+CONCLUIDO = "concluido"     # Transcrito e salvo
+FALHOU = "falhou"           # Erro transitorio — tenta de novo apos o backoff
+ABANDONADO = "abandonado"   # Erro permanente ou tentativas esgotadas
+
+# Estados que uma nova rodada pode pegar
+ESTADOS_RETOMAVEIS = (PENDENTE, RODANDO, FALHOU)
+
+MAX_TENTATIVAS = int(os.getenv("TRANSCRIBE_MAX_ATTEMPTS", "5"))
+
+# Backoff: BACKOFF_BASE_S, 2x, 4x... ate BACKOFF_MAX_S (com +-20% de jitter)
+BACKOFF_BASE_S = float(os.getenv("TRANSCRIBE_BACKOFF_S", "30"))
+BACKOFF_MAX_S = 3600.0
+
+
+def espera_backoff(tentativa: int) -> float:
+    """Segundos de espera depois da `tentativa`-esima falha transitoria."""
+    espera = min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (tentativa - 1))
+    return espera * random.uniform(0.8, 1.2)
+
+
+class JornalTranscricao:
+    """
+    Diario persistente dos jobs de transcricao.
+
+    Args:
+        db_path: Caminho do arquivo SQLite
+        max_tentativas: Tentativas por video antes de abandonar
+            (padrao: TRANSCRIBE_MAX_ATTEMPTS ou 5)
+    """
+
+    def __init__(self, db_path: Path, max_tentativas: int | None = None):
+        self.db_path = Path(db_path)
+        self.max_tentativas = max_tentativas or MAX_TENTATIVAS
+
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    sha256 TEXT PRIMARY KEY,
+                    caminho TEXT NOT NULL,
+                    autor TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    erro_tipo TEXT,
+                    ultimo_erro TEXT,
+                    proxima_tentativa REAL NOT NULL DEFAULT 0,
+                    segundos REAL,
+                    bytes INTEGER NOT NULL,
+                    iniciado_em REAL,
+                    concluido_em REAL,
+                    atualizado_em REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_estado ON jobs (estado)")
+
+    @contextmanager
+    def _conectar(self):
+        # Uma conexao por operacao — as threads de transcricao
+        # gravam no diario ao mesmo tempo
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---- Consulta ----
+
+    def consultar(self, sha256: str) -> dict | None:
+        with self._conectar() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE sha256 = ?", (sha256,)).fetchone()
+        return dict(row) if row else None
+
+    def pode_tentar(self, job: dict | None) -> bool:
+        """True se o job nao existe, esta na fila ou o backoff ja passou."""
+        if job is None:
+            return True
+        if job["estado"] not in ESTADOS_RETOMAVEIS:
+            return False
+        return job["proxima_tentativa"] <= time.time()
+
+    def retomaveis(self) -> list[dict]:
+        """Jobs pendentes, interrompidos ou com backoff vencido (--resume)."""
+        with self._conectar() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE estado IN ({','.join('?' * len(ESTADOS_RETOMAVEIS))}) "
+                "AND proxima_tentativa <= ? ORDER BY autor, caminho",
+                (*ESTADOS_RETOMAVEIS, time.time()),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    # ---- Transicoes ----
+
+    def enfileirar(self, sha256: str, caminho: Path, autor: str, tamanho: int) -> dict:
+        """
+        Registra o video na fila. Se ja existe, so atualiza caminho e
+        autor (o mesmo video pode ter mudado de pasta) — estado,
+        tentativas e backoff continuam. Um job concluido cujo JSON
+        sumiu volta para pendente.
+
+        Returns:
+            O job como ficou no diario
+        """
+        agora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                INSERT INTO jobs (sha256, caminho, autor, estado, bytes, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(sha256) DO UPDATE SET
+                    caminho = excluded.caminho,
+                    autor = excluded.autor,
+                    estado = CASE WHEN estado = ? THEN ? ELSE estado END,
+                    atualizado_em = excluded.atualizado_em
+                """,
+                (sha256, str(caminho), autor, PENDENTE, tamanho, agora, CONCLUIDO, PENDENTE),
+            )
+        return self.consultar(sha256)
+
+    def iniciar(self, sha256: str) -> int:
+        """Marca como rodando e conta a tentativa. Retorna o numero dela."""
+        agora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE jobs SET estado = ?, tentativas = tentativas + 1, "
+                "iniciado_em = ?, atualizado_em = ? WHERE sha256 = ?",
+                (RODANDO, agora, agora, sha256),
+            )
+            return conn.execute(
+                "SELECT tentativas FROM jobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()[0]
+
+    def concluir(self, sha256: str, segundos: float):
+        agora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE jobs SET estado = ?, segundos = ?, erro_tipo = NULL, ultimo_erro = NULL, "
+                "proxima_tentativa = 0, concluido_em = ?, atualizado_em = ? WHERE sha256 = ?",
+                (CONCLUIDO, segundos, agora, agora, sha256),
+            )
+
+    def falhar(self, sha256: str, erro: Exception, transitorio: bool) -> float | None:
+        """
+        Registra a falha da tentativa atual.
+
+        Args:
+            sha256: Job
+            erro: Excecao da tentativa
+            transitorio: True para 429, rede, 5xx — vale tentar de novo
+
+        Returns:
+            Segundos ate a proxima tentativa, ou None se o job foi abandonado
+        """
+        job = self.consultar(sha256)
+        tentativas = job["tentativas"] if job else self.max_tentativas
+
+        espera = None
+        estado = ABANDONADO
+        if transitorio and tentativas < self.max_tentativas:
+            espera = espera_backoff(tentativas)
+            estado = FALHOU
+
+        agora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                "UPDATE jobs SET estado = ?, erro_tipo = ?, ultimo_erro = ?, "
+                "proxima_tentativa = ?, atualizado_em = ? WHERE sha256 = ?",
+                (
+                    estado,
+                    type(erro).__name__,
+                    str(erro)[:500],
+                    agora + (espera or 0),
+                    agora,
+                    sha256,
+                ),
+            )
+        return espera
+
+    # ---- Relatorio ----
+
+    def relatorio(self, janela_horas: float = 24) -> str:
+        """
+        Estado da fila, vazao das ultimas `janela_horas` e falhas por
+        creator (para o transcribe.py --status).
+        """
+        desde = time.time() - janela_horas * 3600
+        with self._conectar() as conn:
+            por_estado = dict(
+                conn.execute("SELECT estado, COUNT(*) FROM jobs GROUP BY estado").fetchall()
+            )
+            vazao = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0), COALESCE(SUM(segundos), 0), "
+                "MIN(iniciado_em), MAX(concluido_em) "
+                "FROM jobs WHERE estado = ? AND concluido_em >= ?",
+                (CONCLUIDO, desde),
+            ).fetchone()
+            falhas = conn.execute(
+                "SELECT autor, estado, erro_tipo, COUNT(*), MAX(tentativas) FROM jobs "
+                "WHERE estado IN (?, ?) GROUP BY autor, estado, erro_tipo "
+                "ORDER BY autor, estado, COUNT(*) DESC",
+                (FALHOU, ABANDONADO),
+            ).fetchall()
+
+        linhas = ["Jobs de transcricao:"]
+        for estado in (PENDENTE, RODANDO, CONCLUIDO, FALHOU, ABANDONADO):
+            linhas.append(f"  {estado:<11} {por_estado.get(estado, 0)}")
+
+        videos, total_bytes, segundos_jobs, primeiro, ultimo = vazao
+        linhas.append(f"\nVazao (ultimas {janela_horas:.0f}h):")
+        if videos:
+            parede = max(ultimo - primeiro, 1e-9)
+            megabytes = total_bytes / (1024 * 1024)
+            linhas.append(
+                f"  {videos} videos, {megabytes:.1f}MB em {parede / 60:.1f} min de parede "
+                f"({videos / parede * 3600:.1f} videos/h, {megabytes / parede * 60:.1f} MB/min)"
+            )
+            linhas.append(f"  Media por video: {segundos_jobs / videos:.1f}s")
+        else:
+            linhas.append("  nenhum video concluido")
+
+        linhas.append("\nFalhas por creator:")
+        if not falhas:
+            linhas.append("  nenhuma")
+        for autor, estado, erro_tipo, quantidade, tentativas in falhas:
+            linhas.append(
+                f"  {autor:<24} {estado:<11} {erro_tipo or '?':<24} "
+                f"{quantidade} videos (ate {tentativas} tentativas)"
+            )
+        return "\n".join(linhas)
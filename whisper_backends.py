@@ -0,0 +1,216 @@
+# ============================================================
+# whisper_backends.py — Motores de transcricao (API ou local)
+# ============================================================
+# O transcribe.py fala com um "backend" em vez de chamar a OpenAI
+# direto. Dois disponiveis:
+#
+# - openai: Whisper da API (whisper-1). Paga por minuto, limitado
+#   por WHISPER_RPM.
+# - local:  faster-whisper (CTranslate2, int8) na CPU, sem rede e
+#   sem custo. Roda num pool de processos do tamanho dos nucleos
+#   (LOCAL_WHISPER_WORKERS), cada um com o modelo carregado uma vez.
+#   Dependencia opcional: uv pip install faster-whisper
+#
+# Modulo leve (NAO importa o agent.py): os processos do pool local
+# importam este arquivo.
+#
+# Uso:
+#   backend = criar_backend("local")
+#   texto = backend.transcrever(Path("audio.mp3"))
+#   backend.fechar()
+# ============================================================
+
+import multiprocessing
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ratelimit import LimiteTaxa
+
+BACKEND_PADRAO = os.getenv("TRANSCRIBE_BACKEND", "openai")
+
+IDIOMA = "pt"
+
+# Backend local: modelo, quantizacao e numero de processos
+MODELO_LOCAL = os.getenv("LOCAL_WHISPER_MODEL", "small")
+COMPUTE_TYPE_LOCAL = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+PROCESSOS_LOCAL = int(os.getenv("LOCAL_WHISPER_WORKERS", "0")) or (os.cpu_count() or 1)
+
+
+class BackendTranscricao(ABC):
+    """
+    Interface dos backends (abstrata: subclasse sem transcrever nao
+    instancia).
+
+    Atributos:
+        nome: Nome usado no --backend / TRANSCRIBE_BACKEND
+        concorrencia: Quantas transcricoes simultaneas fazem sentido
+        pela_rede: True se o audio e enviado (conta bytes de upload)
+    """
+
+    nome = ""
+    concorrencia = 1
+    pela_rede = False
+
+    @abstractmethod
+    def transcrever(self, audio) -> str:
+        """
+        Transcreve um audio.
+
+        Args:
+            audio: Path de um arquivo (MP4, MP3...) ou buffer binario
+                com MP3 (modo pipe do audio.py)
+
+        Returns:
+            Texto transcrito
+        """
+
+    def fechar(self):
+        """Libera recursos (processos, conexoes)."""
+
+
+# ============================================================
+# OPENAI — Whisper da API
+# ============================================================
+
+class BackendOpenAI(BackendTranscricao):
+    """
+    Whisper da OpenAI (whisper-1).
+
+    Args:
+        limite: Limitador de taxa compartilhado (WHISPER_RPM)
+        concorrencia: Uploads simultaneos sugeridos
+    """
+
+    nome = "openai"
+    pela_rede = True
+
+    def __init__(self, limite: LimiteTaxa | None = None, concorrencia: int = 4):
+        from openai import OpenAI
+
+        self.client = OpenAI()
+        self.limite = limite
+        self.concorrencia = concorrencia
+
+    def transcrever(self, audio) -> str:
+        if self.limite:
+            self.limite.aguardar()
+        if isinstance(audio, Path):
+            with open(audio, "rb") as f:
+                transcription = self.client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=f,
+                    language=IDIOMA,
+                )
+        else:
+            # O nome diz o formato ao Whisper — o buffer nao tem extensao
+            transcription = self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=("audio.mp3", audio),
+                language=IDIOMA,
+            )
+        return transcription.text
+
+
+# ============================================================
+# LOCAL — faster-whisper num pool de processos
+# ============================================================
+
+# Modelo carregado em cada processo do pool (pelo _iniciar_processo)
+_modelo = None
+
+
+def _iniciar_processo(modelo: str, compute_type: str, threads: int):
+    """Carrega o modelo uma vez por processo."""
+    global _modelo
+    from faster_whisper import WhisperModel
+
+    _modelo = WhisperModel(
+        modelo,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=threads,
+    )
+
+
+def _transcrever_no_processo(audio: str | bytes) -> str:
+    """Roda dentro do processo do pool. `audio` e um caminho ou os bytes do MP3."""
+    import io
+
+    entrada = io.BytesIO(audio) if isinstance(audio, bytes) else audio
+    segmentos, _ = _modelo.transcribe(entrada, language=IDIOMA)
+    return " ".join(s.text.strip() for s in segmentos).strip()
+
+
+class BackendLocal(BackendTranscricao):
+    """
+    Whisper local (faster-whisper / CTranslate2) na CPU.
+
+    Um processo por nucleo, cada um com sua copia do modelo e
+    cpu_threads dividido entre eles — varios videos andam juntos
+    sem brigar pelos mesmos nucleos.
+
+    Args:
+        modelo: Tamanho do modelo (tiny, base, small, medium...)
+        compute_type: Quantizacao do CTranslate2 (int8 e o mais rapido na CPU)
+        processos: Tamanho do pool (padrao: LOCAL_WHISPER_WORKERS ou CPUs)
+    """
+
+    nome = "local"
+
+    def __init__(
+        self,
+        modelo: str = MODELO_LOCAL,
+        compute_type: str = COMPUTE_TYPE_LOCAL,
+        processos: int | None = None,
+    ):
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(
+                "Backend local precisa do faster-whisper: uv pip install faster-whisper"
+            ) from e
+
+        self.concorrencia = processos or PROCESSOS_LOCAL
+        threads = max(1, (os.cpu_count() or 1) // self.concorrencia)
+        # "spawn" em vez de "fork": a transcricao roda em threads
+        # (e as vezes dentro do servidor), fork com threads vivas trava
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.concorrencia,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar_processo,
+            initargs=(modelo, compute_type, threads),
+        )
+
+    def transcrever(self, audio) -> str:
+        # Buffer nao atravessa processos: manda os bytes
+        entrada = str(audio) if isinstance(audio, Path) else audio.read()
+        return self._pool.submit(_transcrever_no_processo, entrada).result()
+
+    def fechar(self):
+        self._pool.shutdown()
+
+
+# ============================================================
+# FABRICA
+# ============================================================
+
+BACKENDS = {
+    BackendOpenAI.nome: BackendOpenAI,
+    BackendLocal.nome: BackendLocal,
+}
+
+
+def criar_backend(nome: str | None = None, **kwargs) -> BackendTranscricao:
+    """
+    Cria o backend pelo nome (padrao: TRANSCRIBE_BACKEND ou "openai").
+
+    Args:
+        nome: "openai" ou "local"
+        **kwargs: Repassados ao construtor do backend
+    """
+    nome = nome or BACKEND_PADRAO
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de transcricao invalido: {nome} (use {', '.join(BACKENDS)})")
+    return BACKENDS[nome](**kwargs)
@@ -8,28 +8,67 @@
 # Nao precisa de API key do YouTube — a lib extrai legendas
 # publicas diretamente.
 #
+# As transcricoes novas baixam em paralelo (YOUTUBE_WORKERS threads)
+# sob um limitador adaptativo (ratelimit.LimiteAdaptativo): comeca
+# em YOUTUBE_RPM req/min, acelera enquanto o YouTube responde bem e
+# freia (com pausa) quando ele bloqueia.
+#
+# URLs que falharam (sem legenda, video privado, URL invalida...)
+# ficam num cache negativo com motivo e validade, consultado antes
+# de qualquer chamada de rede — o boot do servidor nao tenta de
+# novo as mesmas URLs mortas.
+#
 # Uso:
 #   python youtube_ingest.py
+#   python youtube_ingest.py --falhas                 # lista o cache negativo
+#   python youtube_ingest.py --limpar-falhas [IDs]    # tudo, ou so esses
 #
 # Entrada:
 #   youtube_urls.txt — uma URL por linha, comentarios com #
 #
+# Cada video vira chunks por janela de tempo das legendas (ver
+# chunking.janelas_de_snippets), com start_s/end_s na metadata.
+#
 # Saida:
-#   data/youtube/<video_id>.json — transcricao + metadados
+#   data/youtube/<video_id>.json — transcricao, legendas com tempo
+#       (snippets) e metadados
+#   data/youtube/falhas.db — cache negativo
 #   ChromaDB — embeddings com metadata tipo="youtube"
 # ============================================================
 
+import argparse
 import json
+import os
 import re
+import sqlite3
 import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-from openai import OpenAI
+import requests
 from dotenv import load_dotenv
-from youtube_transcript_api import YouTubeTranscriptApi
-
-from agent import knowledge_base, BASE_DIR, DB_DIR
+from youtube_transcript_api import (
+    AgeRestricted,
+    InvalidVideoId,
+    NoTranscriptFound,
+    RequestBlocked,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+    YouTubeRequestFailed,
+    YouTubeTranscriptApi,
+)
+
+from agent import (
+    knowledge_base, vector_db, manifesto, cache_classificacao, indice_lsh, BASE_DIR, DB_DIR,
+)
+from classifier import classificar_lote
+from manifest import VAZIO
+from ratelimit import LimiteAdaptativo
+from readers import SnippetsReader
+from sync_plan import CAMPO_HASH, adicionar_texto, aplicar, fonte_texto, planejar
 
 load_dotenv()
 
@@ -41,6 +80,166 @@ YOUTUBE_DIR.mkdir(parents=True, exist_ok=True)
 
 URLS_FILE = BASE_DIR / "youtube_urls.txt"
 
+# ============================================================
+# DOWNLOAD — Concorrencia e limitador adaptativo
+# ============================================================
+WORKERS_YOUTUBE = int(os.getenv("YOUTUBE_WORKERS", "4"))
+RPM_YOUTUBE = float(os.getenv("YOUTUBE_RPM", "60"))
+
+# Tentativas por video quando o YouTube bloqueia
+TENTATIVAS_BLOQUEIO = 4
+
+# Sinais de "devagar": 429/IP bloqueado, 5xx, falha de rede
+ERROS_BLOQUEIO = (RequestBlocked, YouTubeRequestFailed, requests.RequestException)
+
+limite_youtube = LimiteAdaptativo(por_minuto=RPM_YOUTUBE, rajada=WORKERS_YOUTUBE)
+
+
+# ============================================================
+# CACHE NEGATIVO — URLs que ja falharam
+# ============================================================
+
+# Motivos de falha e por quanto tempo a URL fica sem ser tentada
+# (None = ate alguem limpar com --limpar-falhas)
+SEM_LEGENDA = "sem_legenda"     # Legendas desativadas, nenhuma transcricao, texto vazio
+INDISPONIVEL = "indisponivel"   # Privado, removido, restrito por idade, ID invalido
+BLOQUEADO = "bloqueado"         # YouTube bloqueou todas as tentativas
+URL_INVALIDA = "url_invalida"   # Nao deu para extrair o video ID
+ERRO = "erro"                   # Qualquer outra falha
+
+VALIDADE_S = {
+    SEM_LEGENDA: 7 * 86400,     # Legendas automaticas podem aparecer depois
+    INDISPONIVEL: 30 * 86400,
+    BLOQUEADO: 3600,
+    URL_INVALIDA: None,         # So muda se alguem editar a URL
+    ERRO: 86400,
+}
+
+MOTIVOS_POR_ERRO = (
+    ((TranscriptsDisabled, NoTranscriptFound), SEM_LEGENDA),
+    ((VideoUnavailable, VideoUnplayable, AgeRestricted, InvalidVideoId), INDISPONIVEL),
+)
+
+
+class SemTranscricao(Exception):
+    """O video nao tem transcricao que sirva (ver `motivo`)."""
+
+    def __init__(self, motivo: str, detalhe: str = ""):
+        super().__init__(detalhe or motivo)
+        self.motivo = motivo
+        self.detalhe = detalhe
+
+
+def motivo_da_falha(erro: Exception) -> str:
+    """Motivo do cache negativo para uma excecao do youtube-transcript-api."""
+    for tipos, motivo in MOTIVOS_POR_ERRO:
+        if isinstance(erro, tipos):
+            return motivo
+    return ERRO
+
+
+class CacheNegativo:
+    """
+    URLs do YouTube que falharam, com motivo e validade.
+
+    Args:
+        db_path: Caminho do arquivo SQLite
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.zerar_contadores()
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS falhas (
+                    chave TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    motivo TEXT NOT NULL,
+                    detalhe TEXT NOT NULL DEFAULT '',
+                    tentativas INTEGER NOT NULL DEFAULT 1,
+                    criado_em REAL NOT NULL,
+                    expira_em REAL
+                )
+                """
+            )
+
+    @contextmanager
+    def _conectar(self):
+        # Uma conexao por operacao — as threads do download gravam juntas
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def zerar_contadores(self):
+        self.pulados = 0
+        self.registrados = 0
+
+    def resumo(self) -> str:
+        return (
+            f"Cache negativo: {self.pulados} URLs puladas, "
+            f"{self.registrados} novas falhas registradas"
+        )
+
+    def consultar(self, chave: str) -> dict | None:
+        """Falha ainda valida para o video ID (ou URL), ou None."""
+        with self._conectar() as conn:
+            row = conn.execute(
+                "SELECT * FROM falhas WHERE chave = ? AND (expira_em IS NULL OR expira_em > ?)",
+                (chave, time.time()),
+            ).fetchone()
+        if row:
+            self.pulados += 1
+        return dict(row) if row else None
+
+    def registrar(self, chave: str, url: str, motivo: str, detalhe: str = ""):
+        """Grava (ou renova) a falha. A validade vem do motivo (VALIDADE_S)."""
+        agora = time.time()
+        validade = VALIDADE_S.get(motivo, VALIDADE_S[ERRO])
+        with self._conectar() as conn:
+            conn.execute(
+                """
+                INSERT INTO falhas (chave, url, motivo, detalhe, criado_em, expira_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    url = excluded.url,
+                    motivo = excluded.motivo,
+                    detalhe = excluded.detalhe,
+                    tentativas = tentativas + 1,
+                    expira_em = excluded.expira_em
+                """,
+                (
+                    chave, url, motivo, detalhe[:300], agora,
+                    agora + validade if validade is not None else None,
+                ),
+            )
+        self.registrados += 1
+
+    def listar(self) -> list[dict]:
+        """Todas as entradas (inclusive as vencidas), por motivo."""
+        with self._conectar() as conn:
+            rows = conn.execute("SELECT * FROM falhas ORDER BY motivo, chave").fetchall()
+        return [dict(r) for r in rows]
+
+    def limpar(self, chaves: list[str] | None = None) -> int:
+        """Apaga as entradas dadas (ou todas). Retorna quantas saiu."""
+        with self._conectar() as conn:
+            if chaves:
+                cursor = conn.execute(
+                    f"DELETE FROM falhas WHERE chave IN ({','.join('?' * len(chaves))})",
+                    chaves,
+                )
+            else:
+                cursor = conn.execute("DELETE FROM falhas")
+            return cursor.rowcount
+
+
+cache_negativo = CacheNegativo(YOUTUBE_DIR / "falhas.db")
+
 
 # ============================================================
 # EXTRAIR VIDEO ID — Suporta varios formatos de URL do YouTube
@@ -66,9 +265,11 @@ def extrair_video_id(url: str) -> str | None:
     if match:
         return match.group(1)
 
-    # Formatos youtube.com
+    # Formatos youtube.com (linha sem esquema — "nao e url",
+    # "www.youtube.com/..." — nao tem hostname: invalida)
     parsed = urlparse(url)
-    if "youtube.com" in parsed.hostname or "youtube" in parsed.hostname:
+    host = parsed.hostname or ""
+    if "youtube" in host:
         # /watch?v=VIDEO_ID
         if parsed.path == "/watch":
             qs = parse_qs(parsed.query)
@@ -95,17 +296,27 @@ def baixar_transcricao(video_id: str) -> dict | None:
     tenta qualquer idioma disponivel.
 
     Returns:
-        dict com {texto, idioma, idioma_codigo} ou None se falhar
+        dict com {texto, idioma, idioma_codigo, snippets} — snippets
+        sao as legendas com tempo: [{text, start, duration}]
+
+    Raises:
+        ERROS_BLOQUEIO: o YouTube bloqueou ou nao respondeu — vale
+            tentar de novo mais devagar (ver baixar_com_limite)
+        SemTranscricao: nao ha transcricao que sirva (com o motivo
+            para o cache negativo)
     """
     api = YouTubeTranscriptApi()
 
     result = None
+    ultimo_erro = None
 
     # Tenta fetch direto com idiomas preferenciais
     try:
         result = api.fetch(video_id, languages=["pt", "pt-BR", "en"])
-    except Exception:
-        pass
+    except ERROS_BLOQUEIO:
+        raise
+    except Exception as e:
+        ultimo_erro = e
 
     # Fallback: lista as transcricoes disponiveis e busca a primeira
     if result is None:
@@ -115,30 +326,146 @@ def baixar_transcricao(video_id: str) -> dict | None:
                 try:
                     result = transcript.fetch()
                     break
-                except Exception:
+                except ERROS_BLOQUEIO:
+                    raise
+                except Exception as e:
+                    ultimo_erro = e
                     continue
-        except Exception:
-            return None
+        except ERROS_BLOQUEIO:
+            raise
+        except Exception as e:
+            ultimo_erro = e
 
     if result is None:
-        return None
+        if ultimo_erro is None:
+            raise SemTranscricao(SEM_LEGENDA, "nenhuma transcricao listada")
+        raise SemTranscricao(motivo_da_falha(ultimo_erro), type(ultimo_erro).__name__)
 
     # Junta todos os snippets em texto corrido
     texto = " ".join(
         s.text.replace("\n", " ") for s in result.snippets
     )
+    if not texto.strip():
+        raise SemTranscricao(SEM_LEGENDA, "transcricao vazia")
 
     return {
         "texto": texto,
         "idioma": result.language,
         "idioma_codigo": result.language_code,
+        "snippets": result.to_raw_data(),
     }
 
 
+def baixar_com_limite(video_id: str, url: str = "") -> dict | None:
+    """
+    baixar_transcricao sob o limitador adaptativo: espera a vez e,
+    se o YouTube bloquear, freia todo mundo e tenta de novo (ate
+    TENTATIVAS_BLOQUEIO vezes). Falhas vao para o cache negativo.
+
+    Returns:
+        Como baixar_transcricao, ou None se nao ha transcricao ou se
+        os bloqueios nao passaram
+    """
+    for tentativa in range(1, TENTATIVAS_BLOQUEIO + 1):
+        limite_youtube.aguardar()
+        try:
+            resultado = baixar_transcricao(video_id)
+        except SemTranscricao as e:
+            limite_youtube.sucesso()
+            cache_negativo.registrar(video_id, url, e.motivo, e.detalhe)
+            return None
+        except ERROS_BLOQUEIO as e:
+            pausa = limite_youtube.bloqueado()
+            print(
+                f"  {video_id}: bloqueado ({type(e).__name__}, tentativa {tentativa}) — "
+                f"taxa {limite_youtube.por_minuto:.0f}/min, pausa de {pausa:.0f}s"
+            )
+            continue
+        except Exception as e:
+            # Uma URL estranha nao derruba o download das outras
+            cache_negativo.registrar(video_id, url, motivo_da_falha(e), type(e).__name__)
+            return None
+        # "Sem legenda" tambem e resposta boa: o YouTube atendeu
+        limite_youtube.sucesso()
+        return resultado
+
+    print(f"  {video_id}: ERRO — bloqueado {TENTATIVAS_BLOQUEIO} vezes, fica para a proxima")
+    cache_negativo.registrar(video_id, url, BLOQUEADO, f"{TENTATIVAS_BLOQUEIO} tentativas")
+    return None
+
+
+def baixar_transcricoes(
+    video_ids: list[str],
+    workers: int | None = None,
+    urls: dict[str, str] | None = None,
+) -> dict[str, dict | None]:
+    """
+    Baixa varias transcricoes em paralelo, todas dividindo o
+    limite_youtube. Imprime a vazao efetiva (URLs/min) no final.
+
+    Args:
+        video_ids: IDs a baixar
+        workers: Threads (padrao: YOUTUBE_WORKERS ou 4)
+        urls: URL original de cada ID (para o cache negativo)
+
+    Returns:
+        {video_id: resultado de baixar_transcricao ou None}
+    """
+    workers = workers or WORKERS_YOUTUBE
+    limite_youtube.zerar_contadores()
+    resultados = {}
+    inicio = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futuros = {
+            pool.submit(baixar_com_limite, video_id, (urls or {}).get(video_id, "")): video_id
+            for video_id in video_ids
+        }
+        for feitos, futuro in enumerate(as_completed(futuros), 1):
+            video_id = futuros[futuro]
+            resultados[video_id] = futuro.result()
+            situacao = "ok" if resultados[video_id] else "sem transcricao"
+            print(f"  [{feitos}/{len(video_ids)}] {video_id}: {situacao}")
+
+    segundos = time.perf_counter() - inicio
+    print(
+        f"Download: {len(video_ids)} URLs em {segundos:.1f}s "
+        f"({len(video_ids) / max(segundos, 1e-9) * 60:.1f} URLs/min, {workers} threads), "
+        f"{limite_youtube.bloqueios} bloqueios, taxa final {limite_youtube.por_minuto:.0f} req/min"
+    )
+    return resultados
+
+
 # ============================================================
 # CLASSIFICAR CONTEUDO — GPT-4o-mini extrai tema e keywords
 # ============================================================
 
+# As chamadas rodam em lote e em paralelo (ver classifier.py).
+
+PROMPT_CLASSIFICADOR = (
+    "Voce e um classificador de conteudo. "
+    "Analise o trecho de transcricao e retorne um JSON com:\n"
+    '- "tema": tema principal (ex: "programacao mental", "autoestima")\n'
+    '- "palavras_chave": lista com 3-5 palavras-chave relevantes\n'
+    "Responda APENAS com o JSON, sem explicacoes."
+)
+
+INSTRUCAO_CLASSIFICADOR = "Classifique esta transcricao:"
+
+
+def classificar_conteudos(textos: list[str]) -> list[dict | None]:
+    """
+    Classifica varias transcricoes de uma vez (chamadas em paralelo).
+
+    Returns:
+        Lista de {tema, palavras_chave} na mesma ordem dos textos —
+        None para as que falharam
+    """
+    return classificar_lote(
+        textos, PROMPT_CLASSIFICADOR, INSTRUCAO_CLASSIFICADOR, cache=cache_classificacao
+    )
+
+
 def classificar_conteudo(texto: str) -> dict:
     """
     Usa GPT-4o-mini para extrair metadados da transcricao.
@@ -146,31 +473,10 @@ def classificar_conteudo(texto: str) -> dict:
     Envia os primeiros 2000 caracteres (economiza tokens).
     Retorna: {tema, palavras_chave}
     """
-    client = OpenAI()
-    trecho = texto[:2000]
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        response_format={"type": "json_object"},
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "Voce e um classificador de conteudo. "
-                    "Analise o trecho de transcricao e retorne um JSON com:\n"
-                    '- "tema": tema principal (ex: "programacao mental", "autoestima")\n'
-                    '- "palavras_chave": lista com 3-5 palavras-chave relevantes\n'
-                    "Responda APENAS com o JSON, sem explicacoes."
-                ),
-            },
-            {
-                "role": "user",
-                "content": f"Classifique esta transcricao:\n\n{trecho}",
-            },
-        ],
-    )
-
-    return json.loads(response.choices[0].message.content)
+    resultado = classificar_conteudos([texto])[0]
+    if resultado is None:
+        raise RuntimeError("Falha ao classificar a transcricao")
+    return resultado
 
 
 # ============================================================
@@ -196,70 +502,200 @@ def ler_urls() -> list[str]:
     return urls
 
 
+# ============================================================
+# QUASE-DUPLICATAS — Palestra que ja entrou por outra fonte
+# ============================================================
+
+def ingerir_se_inedito(
+    json_path: Path, video_id: str, texto: str, metadata: dict, snippets: list[dict] | None = None,
+) -> bool:
+    """
+    Ingere a transcricao no ChromaDB, a menos que seja quase igual a
+    um documento ja ingerido (apostila, outro video — dedup.IndiceLSH).
+    A quase-duplicata fica como VAZIO no manifesto.
+
+    Args:
+        snippets: Legendas com tempo — com elas os chunks sao janelas
+            de tempo (SnippetsReader); sem elas (JSON antigo), o
+            texto corrido vai pelo chunker de texto
+
+    Returns:
+        True se foi ingerida
+    """
+    fonte = fonte_texto(f"youtube-{video_id}", texto, metadata)
+    achado = indice_lsh.verificar_documento(fonte["nome"], texto)
+    if achado:
+        representante, similaridade = achado
+        print(f"  Quase duplicata de {representante} ({similaridade:.0%}) — nao indexado")
+        # Chunks de uma ingestao anterior, antes do indice existir
+        vector_db.delete_by_name(fonte["nome"])
+        manifesto.registrar(json_path, metadata, status=VAZIO, nome=fonte["nome"])
+        return False
+
+    reader = SnippetsReader(snippets) if snippets else None
+    if not adicionar_texto(knowledge_base, fonte, reader=reader):
+        print(f"  Todos os chunks sao quase-duplicatas — nao indexado")
+        manifesto.registrar(json_path, metadata, status=VAZIO, nome=fonte["nome"])
+        return False
+
+    manifesto.registrar(json_path, fonte["metadata"], nome=fonte["nome"])
+    return True
+
+
+def fontes_youtube() -> list[dict]:
+    """
+    Transcricoes ja baixadas (data/youtube/*.json), como fontes do
+    sync_plan.py. Quase-duplicatas ja marcadas (VAZIO no manifesto,
+    JSON sem alteracao) ficam de fora.
+    """
+    fontes = []
+    for json_path in sorted(YOUTUBE_DIR.glob("*.json")):
+        registro = manifesto.consultar(json_path)
+        if registro and registro["status"] == VAZIO:
+            continue
+        dados = json.loads(json_path.read_text(encoding="utf-8"))
+        texto = dados.get("transcricao", "")
+        if not texto.strip():
+            continue
+        palavras_chave = dados.get("palavras_chave", "")
+        metadata = {
+            "tipo": "youtube",
+            "tema": dados.get("tema", ""),
+            "palavras_chave": ", ".join(palavras_chave) if isinstance(palavras_chave, list) else str(palavras_chave),
+            "url": dados.get("url", ""),
+            "arquivo": json_path.name,
+        }
+        video_id = dados.get("video_id") or json_path.stem
+        fontes.append(fonte_texto(
+            f"youtube-{video_id}", texto, metadata,
+            caminho=json_path, video_id=video_id, snippets=dados.get("snippets"),
+        ))
+    return fontes
+
+
+def sincronizar_youtube():
+    """
+    Deixa o ChromaDB igual aos JSONs ja baixados: uma leitura em massa
+    da colecao e so o delta vira escrita (ver sync_plan.py). As
+    quase-duplicatas continuam de fora (ingerir_se_inedito).
+    """
+    plano = planejar(vector_db, "youtube", fontes_youtube())
+    print(plano.resumo())
+
+    def ingerir(fonte: dict):
+        metadata = {k: v for k, v in fonte["metadata"].items() if k != CAMPO_HASH}
+        ingerir_se_inedito(fonte["caminho"], fonte["video_id"], fonte["texto"], metadata, fonte["snippets"])
+
+    aplicar(plano, vector_db, ingerir)
+
+
 # ============================================================
 # PROCESSAR URL — Fluxo completo para um video
 # ============================================================
 
-def processar_url(url: str) -> bool:
+def preparar_url(url: str) -> tuple[str, Path] | None:
     """
-    Processa uma URL do YouTube:
+    Etapas 1-2 de uma URL do YouTube (sem baixar nada):
     1. Extrai video ID
-    2. Verifica se ja foi processado
-    3. Baixa transcricao
-    4. Classifica conteudo com LLM
-    5. Salva JSON
-    6. Ingere no ChromaDB
+    2. Verifica se ja foi processado ou se ja falhou antes (cache
+       negativo)
 
     Returns:
-        True se processou, False se pulou ou falhou
+        (video_id, json_path) se a transcricao precisa ser baixada —
+        None se pulou ou a URL e invalida
     """
     # 1. Extrair video ID
     video_id = extrair_video_id(url)
     if not video_id:
         print(f"  ERRO: URL invalida — {url}")
-        return False
+        if not cache_negativo.consultar(url):
+            cache_negativo.registrar(url, url, URL_INVALIDA)
+        return None
 
-    # 2. Verificar se ja foi processado
+    # 2. Verificar se ja foi processado (o ChromaDB dos JSONs ja
+    # baixados e conferido em massa — sincronizar_youtube)
     json_path = YOUTUBE_DIR / f"{video_id}.json"
     if json_path.exists():
-        # Ja processado — garante que esta no ChromaDB
-        print(f"  Ja processado, garantindo ChromaDB...")
-        dados = json.loads(json_path.read_text(encoding="utf-8"))
-        texto = dados.get("transcricao", "")
-        if texto.strip():
-            metadata = {
-                "tipo": "youtube",
-                "tema": dados.get("tema", ""),
-                "palavras_chave": dados.get("palavras_chave", ""),
-                "url": url,
-                "arquivo": json_path.name,
-            }
-            knowledge_base.add_content(
-                text_content=texto,
-                name=f"youtube-{video_id}",
-                metadata=metadata,
-                skip_if_exists=True,
-            )
-        return False
+        print(f"  Ja processado, pulando")
+        return None
 
-    # 3. Baixar transcricao
-    print(f"  Baixando transcricao...")
-    resultado = baixar_transcricao(video_id)
+    # Falhou numa rodada anterior e a validade ainda nao venceu
+    falha = cache_negativo.consultar(video_id)
+    if falha:
+        quando = "sem prazo" if falha["expira_em"] is None else (
+            "ate " + time.strftime("%d/%m %H:%M", time.localtime(falha["expira_em"]))
+        )
+        print(f"  Falhou antes ({falha['motivo']}), pulando {quando} — --limpar-falhas {video_id}")
+        return None
+
+    return video_id, json_path
+
+
+def montar_novo(url: str, video_id: str, json_path: Path, resultado: dict | None) -> dict | None:
+    """
+    Confere a transcricao baixada (etapa 3).
+
+    Returns:
+        dict {video_id, url, json_path, resultado} se ha transcricao
+        nova para classificar — None se falhou
+    """
     if not resultado:
         print(f"  ERRO: Nenhuma legenda disponivel")
-        return False
+        return None
 
     texto = resultado["texto"]
     if not texto.strip():
         print(f"  ERRO: Transcricao vazia")
-        return False
+        return None
 
     print(f"  Idioma: {resultado['idioma']} ({resultado['idioma_codigo']})")
     print(f"  Tamanho: {len(texto)} caracteres")
 
-    # 4. Classificar conteudo
-    print(f"  Classificando com LLM...")
-    classificacao = classificar_conteudo(texto)
+    return {
+        "video_id": video_id,
+        "url": url,
+        "json_path": json_path,
+        "resultado": resultado,
+    }
+
+
+def baixar_url(url: str) -> dict | None:
+    """
+    Etapas 1-3 de uma URL do YouTube:
+    1. Extrai video ID
+    2. Verifica se ja foi processado
+    3. Baixa transcricao
+
+    Returns:
+        dict {video_id, url, json_path, resultado} se ha transcricao
+        nova para classificar — None se pulou ou falhou
+    """
+    preparado = preparar_url(url)
+    if not preparado:
+        return None
+    video_id, json_path = preparado
+
+    # 3. Baixar transcricao
+    print(f"  Baixando transcricao...")
+    return montar_novo(url, video_id, json_path, baixar_com_limite(video_id, url))
+
+
+def salvar_e_ingerir(novo: dict, classificacao: dict):
+    """
+    Etapas 5-6 de uma URL do YouTube (depois de classificada):
+    5. Salva JSON
+    6. Ingere no ChromaDB
+
+    Args:
+        novo: Retorno de baixar_url()
+        classificacao: {tema, palavras_chave} do classificador
+    """
+    video_id = novo["video_id"]
+    url = novo["url"]
+    json_path = novo["json_path"]
+    resultado = novo["resultado"]
+    texto = resultado["texto"]
+
     tema = classificacao.get("tema", "")
     palavras_chave = classificacao.get("palavras_chave", [])
     print(f"  Tema: {tema}")
@@ -275,6 +711,7 @@ def processar_url(url: str) -> bool:
         "tema": tema,
         "palavras_chave": palavras_chave,
         "transcricao": texto,
+        "snippets": resultado.get("snippets", []),
     }
 
     json_path.write_text(
@@ -292,13 +729,33 @@ def processar_url(url: str) -> bool:
         "url": url,
         "arquivo": json_path.name,
     }
+    ingerir_se_inedito(json_path, video_id, texto, metadata, resultado.get("snippets"))
 
-    knowledge_base.add_content(
-        text_content=texto,
-        name=f"youtube-{video_id}",
-        metadata=metadata,
-        skip_if_exists=True,
-    )
+
+def processar_url(url: str) -> bool:
+    """
+    Processa uma URL do YouTube:
+    1. Extrai video ID
+    2. Verifica se ja foi processado
+    3. Baixa transcricao
+    4. Classifica conteudo com LLM
+    5. Salva JSON
+    6. Ingere no ChromaDB
+
+    Para varias URLs, o main() faz as mesmas etapas mas classifica
+    todas as transcricoes novas em um lote so.
+
+    Returns:
+        True se processou, False se pulou ou falhou
+    """
+    novo = baixar_url(url)
+    if not novo:
+        return False
+
+    # 4. Classificar conteudo
+    print(f"  Classificando com LLM...")
+    classificacao = classificar_conteudo(novo["resultado"]["texto"])
+    salvar_e_ingerir(novo, classificacao)
 
     return True
 
@@ -313,6 +770,14 @@ def main():
     print("=" * 50)
     print()
 
+    cache_classificacao.zerar_contadores()
+    cache_negativo.zerar_contadores()
+    indice_lsh.zerar_contadores()
+
+    # ---- JSONs ja baixados x ChromaDB (uma leitura em massa) ----
+    sincronizar_youtube()
+    print()
+
     urls = ler_urls()
 
     if not urls:
@@ -325,27 +790,90 @@ def main():
 
     print(f"Encontradas {len(urls)} URLs para processar\n")
 
-    total_processados = 0
-
+    # ---- O que ja foi processado (sem rede) ----
+    a_baixar = []
     for i, url in enumerate(urls, 1):
         video_id = extrair_video_id(url)
         label = video_id or url[:50]
         print(f"[{i}/{len(urls)}] {label}")
 
-        processou = processar_url(url)
-        if processou:
+        preparado = preparar_url(url)
+        if preparado and all(preparado[0] != v for _, v, _ in a_baixar):
+            a_baixar.append((url, *preparado))
+
+    # ---- Baixa as transcricoes novas em paralelo ----
+    novos = []
+    if a_baixar:
+        print(f"\nBaixando {len(a_baixar)} transcricoes...")
+        resultados = baixar_transcricoes(
+            [video_id for _, video_id, _ in a_baixar],
+            urls={video_id: url for url, video_id, _ in a_baixar},
+        )
+        print()
+        for url, video_id, json_path in a_baixar:
+            print(f"[{video_id}]")
+            novo = montar_novo(url, video_id, json_path, resultados[video_id])
+            if novo:
+                novos.append(novo)
+    print()
+
+    # ---- Classifica todas de uma vez (em paralelo) e salva ----
+    total_processados = 0
+    if novos:
+        print(f"Classificando {len(novos)} transcricoes com LLM...\n")
+        classificacoes = classificar_conteudos([n["resultado"]["texto"] for n in novos])
+
+        for novo, classificacao in zip(novos, classificacoes):
+            print(f"[{novo['video_id']}]")
+            if classificacao is None:
+                print(f"  ERRO: falha na classificacao — sera tentado de novo\n")
+                continue
+            salvar_e_ingerir(novo, classificacao)
             total_processados += 1
             print(f"  OK!\n")
-            # Delay entre requisicoes para nao ser bloqueado
-            if i < len(urls):
-                time.sleep(1)
-        else:
-            print()
 
     print(f"{'=' * 50}")
     print(f"  Concluido: {total_processados} novos videos processados")
+    print(f"  {cache_classificacao.resumo()}")
+    print(f"  {cache_negativo.resumo()}")
+    print(f"  {indice_lsh.resumo()}")
     print(f"{'=' * 50}")
 
 
+def listar_falhas():
+    """Imprime o cache negativo (--falhas)."""
+    falhas = cache_negativo.listar()
+    if not falhas:
+        print("Cache negativo vazio")
+        return
+    agora = time.time()
+    for falha in falhas:
+        if falha["expira_em"] is None:
+            validade = "sem prazo"
+        elif falha["expira_em"] <= agora:
+            validade = "vencida (tenta de novo)"
+        else:
+            validade = "ate " + time.strftime("%d/%m/%Y %H:%M", time.localtime(falha["expira_em"]))
+        print(
+            f"{falha['chave']:<14} {falha['motivo']:<13} {validade:<24} "
+            f"{falha['tentativas']}x  {falha['detalhe'] or falha['url']}"
+        )
+    print(f"\n{len(falhas)} entradas")
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Ingestao de transcricoes do YouTube")
+    parser.add_argument("--falhas", action="store_true", help="Lista o cache negativo e sai")
+    parser.add_argument(
+        "--limpar-falhas", nargs="*", metavar="ID",
+        help="Apaga do cache negativo os IDs (ou URLs) dados, ou tudo, e sai",
+    )
+    args = parser.parse_args()
+
+    if args.falhas:
+        listar_falhas()
+    elif args.limpar_falhas is not None:
+        removidas = cache_negativo.limpar(args.limpar_falhas or None)
+        print(f"{removidas} entradas removidas do cache negativo")
+    else:
+        main()